@@ -13,19 +13,23 @@ import logging
 import yaml
 import time
 import uuid
+import functools
 import hashlib
 import subprocess
 import random
 import re
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory, send_file, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import tempfile
 import traceback
 from utils.llm.ai_test_router_api import bp_ai_router
+from utils.smart_auto.ai_parse_api import bp_ai_parse, async_routes as ai_parse_async_routes
+from utils.smart_auto.asgi_app import create_asgi_app
+from utils.other_tools.lazy_import import lazy_module
 
 # 导入环境变量
 from dotenv import load_dotenv
@@ -35,7 +39,6 @@ load_dotenv()
 from utils.smart_auto.api_parser import APIParser, APIParserFactory
 from utils.smart_auto.test_generator import TestCaseGenerator, generate_test_cases
 from utils.smart_auto.coverage_scorer import CoverageScorer
-from utils.smart_auto.api_case_generator import APICaseGenerator
 from utils.smart_auto.dependency_analyzer import DependencyAnalyzer
 
 # 导入文档上传处理器
@@ -43,18 +46,23 @@ from utils.smart_auto.document_upload_handler import document_upload_handler
 
 # 导入飞书解析模块
 from utils.parse.feishu_parse import transform_feishu_url, download_json
-from utils.parse.ai import (
-    generate_openapi_yaml,
-    generate_api_relation_file,
-    generate_business_scene_file,
-    generate_file_fingerprint,
-    get_output_path,
-    process_url_with_ai,
-    _normalize_url,
-    _create_file_key_from_url
-)
+# 依赖 openai 的模块在第一次使用时导入，不影响服务冷启动
+parse_ai = lazy_module('utils.parse.ai')
+api_case_generator = lazy_module('utils.smart_auto.api_case_generator')
 from utils.parse.split_openai import integrate_with_upload_api
 from utils.parse.relation_to_group import integrate_with_group_api
+from utils.logging_tool.event_sink import EVENT_LOG_ENV, read_events, remove_events, events_to_cases
+from utils.smart_auto.test_results_store import TestResultsStore
+from utils.smart_auto.document_index import (
+    DocumentIndex, LazyDocuments, UPLOAD_DOC_TYPES, upload_doc_id, result_doc_id,
+    extract_upload_document, summarize_api_doc, summarize_test_cases
+)
+from utils.smart_auto.job_manager import JobManager, background_job
+from utils.other_tools.pytest_worker_pool import popen_pytest
+from utils.smart_auto.http_cache import init_http_cache, not_modified
+from utils.smart_auto.progress_stream import (
+    enable_progress, finish_run, progress_path, start_run, stream_events, summarize_progress, valid_run_id
+)
 import tempfile
 import traceback
 
@@ -75,7 +83,10 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 # 注册langchain实例
 app.register_blueprint(bp_ai_router)
+app.register_blueprint(bp_ai_parse)
 CORS(app)  # 启用跨域支持
+# 紧凑 JSON、ETag/304 和 gzip/brotli 响应压缩
+init_http_cache(app)
 
 # 配置
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB最大文件大小
@@ -84,6 +95,12 @@ app.config['MULTI_UPLOAD_FOLDER'] = 'multiuploads'
 app.config['RESULTS_FOLDER'] = 'uploads/results'
 app.config['TEST_CASES_FOLDER'] = 'test_cases'
 app.config['SUGGESTIONS_FOLDER'] = 'suggestions'
+app.config['RESULTS_DB'] = 'uploads/test_results.db'
+app.config['DOCS_INDEX_DB'] = 'uploads/document_index.db'
+app.config['JOBS_DB'] = 'uploads/jobs.db'
+# 后台任务同时运行的数量和排队上限
+app.config['JOB_MAX_WORKERS'] = int(os.getenv('JOB_MAX_WORKERS', '4'))
+app.config['JOB_MAX_PENDING'] = int(os.getenv('JOB_MAX_PENDING', '100'))
 
 # 确保必要的目录存在
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -91,9 +108,62 @@ os.makedirs(app.config['RESULTS_FOLDER'], exist_ok=True)
 os.makedirs(app.config['TEST_CASES_FOLDER'], exist_ok=True)
 os.makedirs(app.config['SUGGESTIONS_FOLDER'], exist_ok=True)
 
-# 全局变量存储解析结果
-api_docs = {}
-test_cases = {}
+# 历史测试结果索引，查询时按文件修改时间增量同步
+test_results_store = TestResultsStore(app.config['RESULTS_DB'], app.config['RESULTS_FOLDER'])
+
+# 文档元数据索引：启动时不读取文档内容，列表接口只读索引，文档内容按需加载
+document_index = DocumentIndex(app.config['DOCS_INDEX_DB'])
+document_index.register('api_doc', app.config['RESULTS_FOLDER'], ('.json',), result_doc_id, summarize=summarize_api_doc)
+document_index.register(
+    'test_cases', app.config['TEST_CASES_FOLDER'], ('.json',), lambda name: name[:-5], summarize=summarize_test_cases
+)
+for _doc_type, _doc_info in UPLOAD_DOC_TYPES.items():
+    document_index.register(
+        _doc_type,
+        os.path.join(app.config['UPLOAD_FOLDER'], _doc_type),
+        _doc_info['file_types'],
+        functools.partial(upload_doc_id, _doc_type),
+        extractor=functools.partial(extract_upload_document, _doc_type)
+    )
+
+# 长时间运行接口的后台任务，请求中带 async=true 时立即返回 job_id
+job_manager = JobManager(app.config['JOBS_DB'], app.config['JOB_MAX_WORKERS'], app.config['JOB_MAX_PENDING'])
+
+
+def with_progress(view):
+    """
+    开启测试进度推送：run_id 取请求中的 run_id、后台任务 id 或新生成的 id，已被使用的 run_id 返回 409；
+    接口中通过 enable_progress 为 pytest 子进程设置环境变量，返回后写入 run_finished 事件并在响应中带上 run_id
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        body = request.get_json(silent=True)
+        run_id = body.get('run_id') if isinstance(body, dict) else None
+        if not valid_run_id(run_id):
+            run_id = job_manager.current_job_id() or uuid.uuid4().hex
+        if not start_run(run_id):
+            return jsonify({
+                'success': False,
+                'error': 'run_id 已存在',
+                'message': f'run_id {run_id} 已被使用，请更换新的 run_id'
+            }), 409
+        g.progress_run_id = run_id
+        status_code = 500
+        try:
+            response = app.make_response(view(*args, **kwargs))
+            status_code = response.status_code
+            data = response.get_json(silent=True)
+            if isinstance(data, dict) and 'run_id' not in data:
+                data['run_id'] = run_id
+                response.set_data(json.dumps(data, ensure_ascii=False, default=str))
+            return response
+        finally:
+            finish_run(run_id, status_code=status_code)
+    return wrapper
+
+# 全局变量存储解析结果，API文档和测试用例从索引按需加载
+api_docs = LazyDocuments(document_index, 'api_doc')
+test_cases = LazyDocuments(document_index, 'test_cases')
 coverage_reports = {}
 suggestions = {}
 smart_test_results = {}
@@ -111,58 +181,6 @@ def clear_docs_list_cache():
     docs_list_cache = None
     docs_list_cache_time = None
 
-def load_saved_api_docs():
-    """加载已保存的API文档"""
-    global api_docs
-    results_dir = app.config['RESULTS_FOLDER']
-    
-    if not os.path.exists(results_dir):
-        return
-    
-    # 遍历结果目录中的所有JSON文件
-    for filename in os.listdir(results_dir):
-        if filename.endswith('.json'):
-            file_path = os.path.join(results_dir, filename)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    doc_data = json.load(f)
-                
-                # 检查是否是API文档数据
-                if 'api_data' in doc_data and ('filename' in doc_data or 'url' in doc_data):
-                    task_id = filename[:-5]  # 移除.json扩展名
-                    api_docs[task_id] = doc_data
-                    logger.info(f"已加载API文档: {task_id}")
-            except Exception as e:
-                logger.error(f"加载API文档失败 {filename}: {str(e)}")
-
-def load_saved_test_cases():
-    """加载已保存的测试用例"""
-    global test_cases
-    test_cases_dir = app.config['TEST_CASES_FOLDER']
-    
-    if not os.path.exists(test_cases_dir):
-        return
-    
-    # 遍历测试用例目录中的所有JSON文件
-    for filename in os.listdir(test_cases_dir):
-        if filename.endswith('.json'):
-            file_path = os.path.join(test_cases_dir, filename)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    case_data = json.load(f)
-                
-                # 检查是否是测试用例数据
-                if 'test_cases' in case_data:
-                    task_id = filename[:-5]  # 移除.json扩展名
-                    test_cases[task_id] = case_data
-                    logger.info(f"已加载测试用例: {task_id}")
-            except Exception as e:
-                logger.error(f"加载测试用例失败 {filename}: {str(e)}")
-
-# 在启动时加载已保存的数据
-load_saved_api_docs()
-load_saved_test_cases()
-
 # 错误处理
 @app.errorhandler(400)
 def bad_request(error):
@@ -206,6 +224,9 @@ def save_result(file_id: str, result: Dict[str, Any]):
     with open(result_path, 'w', encoding='utf-8') as f:
         json.dump(result, f, ensure_ascii=False, indent=2)
     logger.info(f"结果已保存到 {result_path}")
+    test_results_store.record_file(result_path)
+    test_results_store.record_dashboard(file_id, result)
+    document_index.record_file('api_doc', result_path, result)
     return result_path
 
 def load_result(task_id: str) -> Optional[Dict[str, Any]]:
@@ -302,7 +323,7 @@ def upload_document():
         # ========== 3. 生成关联关系文件（传入正确的文件路径列表） ==========
         relation_path = os.path.join(base_output_path, file_name_without_ext, "relation.json")  # 使用文件名作为目录
         try:
-            relation_data = generate_api_relation_file(openapi_file_paths, relation_path)
+            relation_data = parse_ai.generate_api_relation_file(openapi_file_paths, relation_path)
         except Exception as e:
             logger.error(f"生成关联关系文件失败: {str(e)}")
             return jsonify({
@@ -398,26 +419,26 @@ def parse_uploaded_document(file_id):
         with open(temp_json_path, 'w', encoding='utf-8') as f:
             json.dump(raw_data, f, ensure_ascii=False, indent=2)
         
-        fingerprint = generate_file_fingerprint([temp_json_path])
+        fingerprint = parse_ai.generate_file_fingerprint([temp_json_path])
         
         # 生成处理后的文件
         try:
             # 1. 生成OpenAPI文档 - 保存到openapi目录
-            openapi_output_path = get_output_path([temp_json_path], fingerprint, openapi_dir, "openapi")
-            yaml_content = generate_openapi_yaml([temp_json_path], openapi_output_path)
+            openapi_output_path = parse_ai.get_output_path([temp_json_path], fingerprint, openapi_dir, "openapi")
+            yaml_content = parse_ai.generate_openapi_yaml([temp_json_path], openapi_output_path)
             logger.info(f"成功生成OpenAPI YAML文档: {openapi_output_path}")
             
             # 将YAML内容转换为Python对象
             openapi_data = yaml.safe_load(yaml_content)
             
             # 2. 生成接口关联关系文件 - 保存到api_relation目录
-            relation_output_path = get_output_path([temp_json_path], fingerprint, relation_dir, "relation")
-            relation_data = generate_api_relation_file([temp_json_path], relation_output_path)
+            relation_output_path = parse_ai.get_output_path([temp_json_path], fingerprint, relation_dir, "relation")
+            relation_data = parse_ai.generate_api_relation_file([temp_json_path], relation_output_path)
             logger.info(f"成功生成接口关联关系文件: {relation_output_path}")
             
             # 3. 生成业务场景文件 - 保存到business_scene目录
-            scene_output_path = get_output_path([temp_json_path], fingerprint, scene_dir, "scene")
-            scene_data = generate_business_scene_file([temp_json_path], scene_output_path)
+            scene_output_path = parse_ai.get_output_path([temp_json_path], fingerprint, scene_dir, "scene")
+            scene_data = parse_ai.generate_business_scene_file([temp_json_path], scene_output_path)
             logger.info(f"成功生成业务场景文件: {scene_output_path}")
             
         except Exception as e:
@@ -933,96 +954,21 @@ def list_uploaded_documents():
 def list_all_documents():
     """获取uploads目录下的所有文档列表(openapi、relation、scene)"""
     try:
-        # 定义要扫描的目录
-        directories = {
-            'openapi': {
-                'path': os.path.join(app.config['UPLOAD_FOLDER'], 'openapi'),
-                'description': 'OpenAPI文档',
-                'file_types': ['.yaml', '.yml', '.json']
-            },
-            'relation': {
-                'path': os.path.join(app.config['UPLOAD_FOLDER'], 'relation'),
-                'description': '关系文档',
-                'file_types': ['.json', '.yaml', '.yml', '.txt']
-            },
-            'scene': {
-                'path': os.path.join(app.config['UPLOAD_FOLDER'], 'scene'),
-                'description': '场景文档',
-                'file_types': ['.json', '.yaml', '.yml', '.txt']
-            }
-        }
-        
         all_documents = {}
         
-        # 遍历每个目录
-        for dir_type, dir_info in directories.items():
-            documents = []
-            dir_path = dir_info['path']
-            
-            # 确保目录存在
-            if not os.path.exists(dir_path):
-                os.makedirs(dir_path, exist_ok=True)
-                all_documents[dir_type] = {
-                    'description': dir_info['description'],
-                    'documents': [],
-                    'count': 0
-                }
-                continue
-            
-            # 遍历目录中的文件
-            for filename in os.listdir(dir_path):
-                file_extension = os.path.splitext(filename)[1].lower()
-                if file_extension in dir_info['file_types']:
-                    file_path = os.path.join(dir_path, filename)
-                    
-                    # 获取文件信息
-                    stat = os.stat(file_path)
-                    
-                    # 提取文件ID
-                    file_id = filename
-                    if filename.startswith(f'{dir_type}_'):
-                        file_id = filename[len(f'{dir_type}_'):]  # 去掉类型前缀
-                    
-                    # 去掉文件扩展名
-                    if '.' in file_id:
-                        file_id = file_id.rsplit('.', 1)[0]
-                    
-                    # 尝试解析文件内容
-                    content_preview = ""
-                    item_count = 0
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            if file_extension == '.json':
-                                content = json.load(f)
-                                content_preview = json.dumps(content, ensure_ascii=False, indent=2)
-                                
-                                # 根据目录类型计算项目数量
-                                if dir_type == 'openapi' and 'paths' in content:
-                                    for path, path_item in content['paths'].items():
-                                        for method in path_item:
-                                            if method.upper() in ['GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS']:
-                                                item_count += 1
-                                elif dir_type in ['relation', 'scene']:
-                                    item_count = len(content) if isinstance(content, (list, dict)) else 0
-                            else:
-                                content = f.read()
-                                content_preview = content
-                                item_count = len(content.split('\n')) if content else 0
-                    except Exception as e:
-                        logger.warning(f"解析文件失败 {filename}: {str(e)}")
-                        content_preview = f"解析失败: {str(e)}"
-                    
-                    documents.append({
-                        'file_id': file_id,
-                        'file_name': filename,
-                        'file_size': stat.st_size,
-                        'upload_time': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                        'item_count': item_count,
-                        'content_preview': content_preview[:500] + ('...' if len(content_preview) > 500 else ''),
-                        'status': 'uploaded',
-                        'editable': True
-                    })
+        # 只读取索引中的元数据，文件变化时索引按修改时间增量更新
+        for dir_type, dir_info in UPLOAD_DOC_TYPES.items():
+            os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], dir_type), exist_ok=True)
+            documents = [{
+                'file_id': doc['doc_id'],
+                'file_name': doc['file_name'],
+                'file_size': doc['size'],
+                'upload_time': datetime.fromtimestamp(doc['mtime']).isoformat(),
+                'item_count': doc['item_count'],
+                'content_preview': doc['preview'] or '',
+                'status': 'uploaded',
+                'editable': True
+            } for doc in document_index.list(dir_type)]
             
             all_documents[dir_type] = {
                 'description': dir_info['description'],
@@ -1097,6 +1043,11 @@ def get_document_content(doc_type, file_id):
                 'success': False,
                 'error': '文件不存在'
             }), 404
+
+        # 文件未修改时直接返回 304
+        cached = not_modified(file_path)
+        if cached is not None:
+            return cached
         
         # 读取文件内容
         file_extension = os.path.splitext(file_name)[1].lower()
@@ -1251,14 +1202,18 @@ def update_document_content(doc_type, file_id):
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
         
+        document_index.record_file(doc_type, file_path)
+        
         # 如果是OpenAPI文档，更新内存中的解析结果
         if doc_type == 'openapi' and file_id in api_docs:
             try:
                 parser = APIParser(file_path)
                 api_data = parser.parse()
-                api_docs[file_id]['api_data'] = api_data
-                api_docs[file_id]['updated_at'] = datetime.now().isoformat()
-                save_result(file_id, api_docs[file_id])
+                doc = api_docs[file_id]
+                doc['api_data'] = api_data
+                doc['updated_at'] = datetime.now().isoformat()
+                api_docs[file_id] = doc
+                save_result(file_id, doc)
             except Exception as e:
                 logger.warning(f"更新OpenAPI文档解析结果失败: {str(e)}")
         
@@ -1327,9 +1282,9 @@ def generate_document_content(doc_type, file_id):
             
             # 根据文档类型生成内容
             if doc_type == 'relation':
-                result = generate_api_relation_file([temp_filepath], output_path)
+                result = parse_ai.generate_api_relation_file([temp_filepath], output_path)
             elif doc_type == 'scene':
-                result = generate_business_scene_file([temp_filepath], output_path)
+                result = parse_ai.generate_business_scene_file([temp_filepath], output_path)
             
             # 读取生成的内容
             with open(output_path, 'r', encoding='utf-8') as f:
@@ -1497,6 +1452,7 @@ def delete_document(doc_type, file_id):
         
         # 删除文件
         os.remove(file_path)
+        document_index.remove_path(file_path)
         
         # 删除所有相关的文件（json、relation、scene目录下的同名文件）
         related_dirs = ['json', 'relation', 'scene', 'test_case', 'test_code']
@@ -1523,13 +1479,15 @@ def delete_document(doc_type, file_id):
         # 如果是OpenAPI文档，从内存中删除解析结果
         if doc_type == 'openapi' and file_id in api_docs:
             del api_docs[file_id]
+            test_results_store.remove_dashboard_item('api_doc', file_id)
             # 清除文档列表缓存
             clear_docs_list_cache()
             
-            # 删除结果文件
-            result_path = os.path.join(app.config['RESULTS_FOLDER'], f"{file_id}.json")
-            if os.path.exists(result_path):
-                os.remove(result_path)
+            # 删除结果文件（save_result 保存为 results_<file_id>.json），否则索引刷新时文档会重新出现
+            for result_name in (f"{file_id}.json", f"results_{file_id}.json"):
+                result_path = os.path.join(app.config['RESULTS_FOLDER'], result_name)
+                if os.path.exists(result_path):
+                    os.remove(result_path)
         
         return jsonify({
             'success': True,
@@ -1560,49 +1518,16 @@ def list_openapi_documents():
                 'count': 0
             })
         
-        # 遍历openapi目录
-        for filename in os.listdir(openapi_dir):
-            if filename.endswith('.yaml') or filename.endswith('.yml') or filename.endswith('.json'):
-                file_path = os.path.join(openapi_dir, filename)
-                
-                # 获取文件信息
-                stat = os.stat(file_path)
-                
-                # 提取文件ID（去掉openapi_前缀）
-                file_id = filename
-                if filename.startswith('openapi_'):
-                    file_id = filename[8:]  # 去掉'openapi_'前缀
-                
-                # 去掉文件扩展名
-                if '.' in file_id:
-                    file_id = file_id.rsplit('.', 1)[0]
-                
-                # 尝试解析文件获取API数量
-                api_count = 0
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        if filename.endswith('.json'):
-                            content = json.load(f)
-                        else:
-                            content = yaml.safe_load(f)
-                        
-                        # 计算API数量
-                        if 'paths' in content:
-                            for path, path_item in content['paths'].items():
-                                for method in path_item:
-                                    if method.upper() in ['GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS']:
-                                        api_count += 1
-                except Exception as e:
-                    logger.warning(f"解析OpenAPI文件失败 {filename}: {str(e)}")
-                
-                documents.append({
-                    'file_id': file_id,
-                    'file_name': filename,
-                    'file_size': stat.st_size,
-                    'upload_time': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    'api_count': api_count,
-                    'status': 'uploaded'
-                })
+        # 接口数量从索引中读取，只有新增或修改过的文件才会重新解析
+        for doc in document_index.list('openapi'):
+            documents.append({
+                'file_id': doc['doc_id'],
+                'file_name': doc['file_name'],
+                'file_size': doc['size'],
+                'upload_time': datetime.fromtimestamp(doc['mtime']).isoformat(),
+                'api_count': doc['meta'].get('api_count', 0),
+                'status': 'uploaded'
+            })
         
         return jsonify({
             'success': True,
@@ -1636,6 +1561,7 @@ def delete_uploaded_document(file_id):
         
         # 删除文件
         os.remove(file_path)
+        document_index.remove_path(file_path)
         
         # 删除所有相关的文件（json、relation、scene目录下的同名文件）
         related_dirs = ['json', 'relation', 'scene', 'test_case', 'test_code']
@@ -1662,13 +1588,15 @@ def delete_uploaded_document(file_id):
         # 从内存中删除解析结果
         if file_id in api_docs:
             del api_docs[file_id]
+            test_results_store.remove_dashboard_item('api_doc', file_id)
             # 清除文档列表缓存
             clear_docs_list_cache()
         
-        # 删除结果文件
-        result_path = os.path.join(app.config['RESULTS_FOLDER'], f"{file_id}.json")
-        if os.path.exists(result_path):
-            os.remove(result_path)
+        # 删除结果文件（save_result 保存为 results_<file_id>.json），否则索引刷新时文档会重新出现
+        for result_name in (f"{file_id}.json", f"results_{file_id}.json"):
+            result_path = os.path.join(app.config['RESULTS_FOLDER'], result_name)
+            if os.path.exists(result_path):
+                os.remove(result_path)
         
         return jsonify({
             'success': True,
@@ -1727,6 +1655,8 @@ def parse_api_docs():
         return jsonify({'error': 'API文档解析失败', 'message': str(e)}), 500
 
 @app.route('/api/chain/run', methods=['POST'])
+@background_job(job_manager, app, 'chain_run')
+@with_progress
 def run_chain_test():
     """
     执行链式测试接口
@@ -1845,6 +1775,8 @@ def run_chain_test():
             env['PYTHONPATH'] = project_root_str
         
         logger.info(f"PYTHONPATH: {env['PYTHONPATH']}")
+        # 用例结果逐条写入进度文件，可通过 /api/runs/<run_id>/events 实时查看
+        enable_progress(env, g.progress_run_id, project_root)
         
         # 执行命令
         process = subprocess.Popen(
@@ -1855,6 +1787,7 @@ def run_chain_test():
             cwd=project_root,  # 确保工作目录是项目根目录
             env=env
         )
+        job_manager.track_process(process)
         
         # 等待执行完成（可以设置超时）
         timeout = request.json.get('timeout', 3600) if request.is_json else 3600  # 默认1小时
@@ -1925,7 +1858,7 @@ def run_chain_test():
                     
                     logger.info(f"汇总 pytest 收集命令: {' '.join(collect_cmd)}")
                     
-                    collect_process = subprocess.Popen(
+                    collect_process = popen_pytest(
                         collect_cmd,
                         stdout=subprocess.PIPE,
                         stderr=subprocess.PIPE,
@@ -1933,6 +1866,7 @@ def run_chain_test():
                         cwd=project_root,
                         env=env
                     )
+                    job_manager.track_process(collect_process)
                     collect_stdout, collect_stderr = collect_process.communicate(timeout=60)
                     logger.info(f"收集到的测试用例:\n{collect_stdout}")
                     
@@ -1954,7 +1888,7 @@ def run_chain_test():
                     logger.info(f"将执行 {len(existing_test_files)} 个测试文件")
                     
                     # 执行汇总 pytest
-                    pytest_process = subprocess.Popen(
+                    pytest_process = popen_pytest(
                         pytest_cmd,
                         stdout=subprocess.PIPE,
                         stderr=subprocess.PIPE,
@@ -1962,6 +1896,7 @@ def run_chain_test():
                         cwd=project_root,
                         env=env
                     )
+                    job_manager.track_process(pytest_process)
                     
                     pytest_stdout, pytest_stderr = pytest_process.communicate(timeout=timeout)
                     # 使用汇总的 pytest 输出
@@ -1982,20 +1917,22 @@ def run_chain_test():
                     logger.warning(f"执行汇总 pytest 失败: {str(e)}，使用原始输出")
                     logger.error(traceback.format_exc())
         
-        # 解析 pytest 执行结果（使用汇总的输出）
-        test_metrics = None
-        if aggregated_stdout:
+        # 优先使用进度事件汇总的结果，没有事件时再解析 pytest 输出
+        progress = summarize_progress(progress_path(g.progress_run_id))
+        test_metrics = progress['metrics'] if progress else None
+        if test_metrics is None and aggregated_stdout:
             try:
                 test_metrics = _parse_pytest_output(aggregated_stdout)
             except Exception as e:
                 logger.warning(f"解析 pytest 输出失败: {str(e)}")
         
-        # 解析失败的测试用例详情（使用汇总的输出）
-        failed_tests = []
-        try:
-            failed_tests = _extract_failed_tests(aggregated_stdout, aggregated_stderr)
-        except Exception as e:
-            logger.warning(f"提取失败测试用例详情失败: {str(e)}")
+        # 失败的测试用例详情
+        failed_tests = progress['failed_tests'] if progress else []
+        if not progress:
+            try:
+                failed_tests = _extract_failed_tests(aggregated_stdout, aggregated_stderr)
+            except Exception as e:
+                logger.warning(f"提取失败测试用例详情失败: {str(e)}")
         
         # 检查返回码
         # 如果生成了测试文件并执行了汇总 pytest，以汇总 pytest 的结果为准
@@ -2074,6 +2011,7 @@ def run_chain_test():
 
 
 @app.route('/api/chain/relation-run', methods=['POST'])
+@background_job(job_manager, app, 'chain_relation_run')
 def run_chain_relation():
     """
     对外接口：执行 relation 解析脚本
@@ -2151,6 +2089,7 @@ def run_chain_relation():
             cwd=project_root,
             env=env
         )
+        job_manager.track_process(process)
 
         try:
             stdout, stderr = process.communicate(timeout=timeout)
@@ -2528,7 +2467,7 @@ def fetch_feishu_document():
         
         try:
             # 生成指纹
-            fingerprint = generate_file_fingerprint([temp_json_path])
+            fingerprint = parse_ai.generate_file_fingerprint([temp_json_path])
             
             # 创建输出目录 - 使用uploads目录下的不同子目录
             openapi_dir = os.path.join(os.getcwd(), app.config['UPLOAD_FOLDER'], 'openapi')
@@ -2539,9 +2478,9 @@ def fetch_feishu_document():
             os.makedirs(scene_dir, exist_ok=True)
             
             # 1. 生成OpenAPI文档 - 保存到openapi目录
-            openapi_output_path = get_output_path([temp_json_path], fingerprint, openapi_dir, "openapi")
+            openapi_output_path = parse_ai.get_output_path([temp_json_path], fingerprint, openapi_dir, "openapi")
             try:
-                yaml_content = generate_openapi_yaml([temp_json_path], openapi_output_path)
+                yaml_content = parse_ai.generate_openapi_yaml([temp_json_path], openapi_output_path)
                 logger.info(f"成功生成OpenAPI YAML文档: {openapi_output_path}")
                 
                 # 将YAML内容转换为JSON格式返回给前端
@@ -2567,9 +2506,9 @@ def fetch_feishu_document():
                 logger.info("使用基本OpenAPI文档结构")
             
             # 2. 生成接口关联关系文件 - 保存到api_relation目录
-            relation_output_path = get_output_path([temp_json_path], fingerprint, relation_dir, "api_relation")
+            relation_output_path = parse_ai.get_output_path([temp_json_path], fingerprint, relation_dir, "api_relation")
             try:
-                relation_data = generate_api_relation_file([temp_json_path], relation_output_path)
+                relation_data = parse_ai.generate_api_relation_file([temp_json_path], relation_output_path)
                 logger.info(f"成功生成接口关联关系文件: {relation_output_path}")
             except Exception as e:
                 logger.error(f"生成接口关联关系文件失败: {str(e)}")
@@ -2586,9 +2525,9 @@ def fetch_feishu_document():
                 logger.info("使用基本接口关联关系结构")
             
             # 3. 生成业务场景文件 - 保存到business_scene目录
-            scene_output_path = get_output_path([temp_json_path], fingerprint, scene_dir, "business_scene")
+            scene_output_path = parse_ai.get_output_path([temp_json_path], fingerprint, scene_dir, "business_scene")
             try:
-                scene_data = generate_business_scene_file([temp_json_path], scene_output_path)
+                scene_data = parse_ai.generate_business_scene_file([temp_json_path], scene_output_path)
                 logger.info(f"成功生成业务场景文件: {scene_output_path}")
             except Exception as e:
                 logger.error(f"生成业务场景文件失败: {str(e)}")
@@ -2724,26 +2663,26 @@ def parse_api_docs_from_url():
             with open(temp_json_path, 'w', encoding='utf-8') as f:
                 json.dump(result['data'], f, ensure_ascii=False, indent=2)
             
-            fingerprint = generate_file_fingerprint([temp_json_path])
+            fingerprint = parse_ai.generate_file_fingerprint([temp_json_path])
             
             # 生成处理后的文件
             try:
                 # 1. 生成OpenAPI文档 - 保存到openapi目录
-                openapi_output_path = get_output_path([temp_json_path], fingerprint, openapi_dir, "openapi")
-                yaml_content = generate_openapi_yaml([temp_json_path], openapi_output_path)
+                openapi_output_path = parse_ai.get_output_path([temp_json_path], fingerprint, openapi_dir, "openapi")
+                yaml_content = parse_ai.generate_openapi_yaml([temp_json_path], openapi_output_path)
                 logger.info(f"成功生成OpenAPI YAML文档: {openapi_output_path}")
                 
                 # 将YAML内容转换为Python对象
                 openapi_data = yaml.safe_load(yaml_content)
                 
                 # 2. 生成接口关联关系文件 - 保存到api_relation目录
-                relation_output_path = get_output_path([temp_json_path], fingerprint, relation_dir, "api_relation")
-                relation_data = generate_api_relation_file([temp_json_path], relation_output_path)
+                relation_output_path = parse_ai.get_output_path([temp_json_path], fingerprint, relation_dir, "api_relation")
+                relation_data = parse_ai.generate_api_relation_file([temp_json_path], relation_output_path)
                 logger.info(f"成功生成接口关联关系文件: {relation_output_path}")
                 
                 # 3. 生成业务场景文件 - 保存到business_scene目录
-                scene_output_path = get_output_path([temp_json_path], fingerprint, scene_dir, "business_scene")
-                scene_data = generate_business_scene_file([temp_json_path], scene_output_path)
+                scene_output_path = parse_ai.get_output_path([temp_json_path], fingerprint, scene_dir, "business_scene")
+                scene_data = parse_ai.generate_business_scene_file([temp_json_path], scene_output_path)
                 logger.info(f"成功生成业务场景文件: {scene_output_path}")
                 
             except Exception as e:
@@ -2892,33 +2831,12 @@ def list_parsed_docs():
         # 缓存失效，重新生成文档列表
         docs_list = []
         
-        for task_id, doc_info in api_docs.items():
-            # 获取文档基本信息
-            filename = doc_info.get('filename', '')
-            created_at = doc_info.get('created_at', '')
-            
-            # 计算API数量
-            api_data = doc_info.get('api_data', {})
-            api_count = 0
-            
-            # 检查是否为完整解析器的数据格式（包含name, method, path等扁平结构）
-            if 'name' in api_data or 'method' in api_data:
-                # 完整解析器的扁平数据格式
-                api_count = 1  # 这种格式每个文档代表一个API
-            else:
-                # 传统OpenAPI格式
-                paths = api_data.get('paths', {})
-                for path, path_item in paths.items():
-                    for method, api_detail in path_item.items():
-                        if method.upper() in ['GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS']:
-                            api_count += 1
-            
-            # 添加到文档列表
+        for doc in api_docs.summaries():
             docs_list.append({
-                'task_id': task_id,
-                'filename': filename,
-                'created_at': created_at,
-                'api_count': api_count
+                'task_id': doc['doc_id'],
+                'filename': doc['meta']['filename'],
+                'created_at': doc['meta']['created_at'],
+                'api_count': doc['meta']['operation_count']
             })
         
         # 更新缓存
@@ -2935,12 +2853,12 @@ def list_parsed_docs():
 def get_api_docs():
     """获取API文档列表"""
     docs_list = []
-    for task_id, doc in api_docs.items():
+    for doc in api_docs.summaries():
         docs_list.append({
-            'task_id': task_id,
-            'filename': doc['filename'],
-            'api_count': len(doc['api_data'].get('apis', [])),
-            'created_at': doc['created_at']
+            'task_id': doc['doc_id'],
+            'filename': doc['meta']['filename'],
+            'api_count': doc['item_count'],
+            'created_at': doc['meta']['created_at']
         })
     
     return jsonify(docs_list)
@@ -3258,16 +3176,16 @@ class Test{case.api_method.title()}{case.api_path.replace('/', '_').replace('{',
 def get_test_cases_list():
     """获取测试用例列表"""
     cases_list = []
-    for task_id, cases in test_cases.items():
-        doc_task_id = cases['doc_task_id']
-        doc_filename = api_docs.get(doc_task_id, {}).get('filename', 'Unknown')
+    doc_filenames = {doc['doc_id']: doc['meta']['filename'] for doc in api_docs.summaries()}
+    for cases in test_cases.summaries():
+        doc_task_id = cases['meta']['doc_task_id']
         
         cases_list.append({
-            'task_id': task_id,
+            'task_id': cases['doc_id'],
             'doc_task_id': doc_task_id,
-            'doc_filename': doc_filename,
-            'test_cases_count': sum(len(c) for c in cases['test_cases'].values()),
-            'created_at': cases['created_at']
+            'doc_filename': doc_filenames.get(doc_task_id, 'Unknown'),
+            'test_cases_count': cases['item_count'],
+            'created_at': cases['meta']['created_at']
         })
     
     return jsonify(cases_list)
@@ -3529,105 +3447,56 @@ def get_suggestions(task_id):
     return jsonify(suggestions[task_id])
 
 # 6. 仪表板数据
+def _ensure_dashboard_seeded():
+    """第一次打开仪表板时，按文档索引中已有的 API 文档和测试用例初始化计数，之后随 save_result 增量更新"""
+    if not test_results_store.dashboard_seeded('api_doc'):
+        test_results_store.seed_dashboard(
+            'api_doc', [(doc['doc_id'], {'count': 1, 'apis': doc['item_count']}) for doc in api_docs.summaries()]
+        )
+    if not test_results_store.dashboard_seeded('test_cases'):
+        test_results_store.seed_dashboard(
+            'test_cases', [(tc['doc_id'], {'count': 1, 'cases': tc['item_count']}) for tc in test_cases.summaries()]
+        )
+
 @app.route('/api/dashboard/stats', methods=['GET'])
 def get_dashboard_stats():
-    """获取仪表板统计数据"""
-    # 统计数据
-    total_apis = sum(len(doc['api_data'].get('apis', [])) for doc in api_docs.values())
-    total_test_cases = sum(sum(len(cases) for cases in tc['test_cases'].values()) for tc in test_cases.values())
-    
-    # 计算平均通过率
-    total_passed = 0
-    total_tests = 0
-    for task_id in test_cases:
-        # 模拟测试结果
-        passed = 27
-        total = 33
-        total_passed += passed
-        total_tests += total
+    """获取仪表板统计数据，直接读取增量维护的汇总计数"""
+    _ensure_dashboard_seeded()
+    counters = test_results_store.dashboard_counters()
+    docs = counters.get('api_doc', {})
+    cases = counters.get('test_cases', {})
+    coverage = counters.get('coverage', {})
+    advice = counters.get('suggestions', {})
+    results = counters.get('test_result', {})
     
+    # 通过率：历史执行结果中的通过用例数 / 执行用例数
+    total_tests = results.get('tests', 0)
+    total_passed = results.get('passed', 0)
     pass_rate = (total_passed / total_tests * 100) if total_tests > 0 else 0
     
-    # 计算平均覆盖度
-    total_coverage = sum(report['coverage_report'].get('overall_coverage', 0) for report in coverage_reports.values())
-    avg_coverage = (total_coverage / len(coverage_reports)) if coverage_reports else 0
-    
-    # 高优先级建议数量
-    high_priority_suggestions = sum(
-        sum(1 for s in suggestion['suggestions'] if s.get('priority') == 'high')
-        for suggestion in suggestions.values()
-    )
+    # 平均覆盖度
+    avg_coverage = (coverage.get('coverage', 0) / coverage['count']) if coverage.get('count') else 0
     
     return jsonify({
-        'total_apis': total_apis,
-        'total_test_cases': total_test_cases,
+        'total_apis': int(docs.get('apis', 0)),
+        'total_test_cases': int(cases.get('cases', 0)),
         'pass_rate': round(pass_rate, 2),
         'avg_coverage': round(avg_coverage, 2),
-        'high_priority_suggestions': high_priority_suggestions,
-        'api_docs_count': len(api_docs),
-        'test_cases_count': len(test_cases),
-        'coverage_reports_count': len(coverage_reports),
-        'suggestions_count': len(suggestions)
+        'high_priority_suggestions': int(advice.get('high_priority', 0)),
+        'api_docs_count': int(docs.get('count', 0)),
+        'test_cases_count': int(cases.get('count', 0)),
+        'coverage_reports_count': int(coverage.get('count', 0)),
+        'suggestions_count': int(advice.get('count', 0)),
+        'executed_runs': int(results.get('count', 0)),
+        'executed_tests': int(total_tests),
+        'passed_tests': int(total_passed),
+        'failed_tests': int(results.get('failed', 0))
     })
 
 @app.route('/api/dashboard/recent-activities', methods=['GET'])
 def get_recent_activities():
-    """获取最近活动"""
-    activities = []
-    
-    # 添加API文档解析活动
-    for task_id, doc in api_docs.items():
-        activities.append({
-            'type': 'api_doc_parsed',
-            'title': f'解析API文档: {doc["filename"]}',
-            'timestamp': doc['created_at'],
-            'details': {
-                'task_id': task_id,
-                'api_count': len(doc['api_data'].get('apis', []))
-            }
-        })
-    
-    # 添加测试用例生成活动
-    for task_id, tc in test_cases.items():
-        activities.append({
-            'type': 'test_cases_generated',
-            'title': '生成测试用例',
-            'timestamp': tc['created_at'],
-            'details': {
-                'task_id': task_id,
-                'test_cases_count': sum(len(cases) for cases in tc['test_cases'].values())
-            }
-        })
-    
-    # 添加覆盖度评估活动
-    for task_id, report in coverage_reports.items():
-        activities.append({
-            'type': 'coverage_evaluated',
-            'title': '评估测试覆盖度',
-            'timestamp': report['created_at'],
-            'details': {
-                'task_id': task_id,
-                'coverage': report['coverage_report'].get('overall_coverage', 0)
-            }
-        })
-    
-    # 添加智能建议生成活动
-    for task_id, suggestion in suggestions.items():
-        activities.append({
-            'type': 'suggestions_generated',
-            'title': '生成智能建议',
-            'timestamp': suggestion['created_at'],
-            'details': {
-                'task_id': task_id,
-                'suggestions_count': len(suggestion['suggestions'])
-            }
-        })
-    
-    # 按时间戳排序，最新的在前
-    activities.sort(key=lambda x: x['timestamp'], reverse=True)
-    
-    # 返回最近10条活动
-    return jsonify(activities[:10])
+    """获取最近活动，来自写入结果时记录的最近活动"""
+    return jsonify(test_results_store.recent_activities(10))
 
 # 测试场景生成
 @app.route('/api/test-scenes/generate', methods=['POST'])
@@ -3645,7 +3514,7 @@ def generate_test_scenes():
         
         # 使用AI分析API文档，生成测试场景
         
-        generator = APICaseGenerator(openapi_spec)
+        generator = api_case_generator.APICaseGenerator(openapi_spec)
         scenes = generator.generate_test_scenes()
         
         # 存储测试场景
@@ -3998,114 +3867,6 @@ def get_smart_test_result(task_id):
     
     return jsonify(smart_test_results[task_id])
 
-@app.route('/api/ai/parse', methods=['POST'])
-def ai_parse_url():
-    """使用AI解析URL并生成JSON文件"""
-    try:
-        
-        data = request.get_json()
-        url = data.get('url')
-        
-        if not url:
-            return jsonify({'error': 'URL不能为空'}), 400
-        
-        # 导入ai.py中的函数
-        sys.path.append(os.path.join(os.path.dirname(__file__), 'utils', 'parse'))
-        
-        # 定义输出目录
-        output_dir = app.config['UPLOAD_FOLDER']
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # 使用新的process_url_with_ai函数处理URL
-        result = process_url_with_ai(url, output_dir)
-        
-        if not result.get('success', False):
-            return jsonify({
-                'error': 'AI解析URL失败',
-                'message': result.get('error', '未知错误')
-            }), 500
-        
-        # 返回生成的文件内容
-        return jsonify({
-            'success': True,
-            'url': result.get('url'),
-            'url_hash': result.get('url_hash'),
-            'openapi_data': result.get('openapi_data'),
-            'relation_data': result.get('relation_data'),
-            'scene_data': result.get('scene_data'),
-            'openapi_file': result.get('openapi_file'),
-            'relation_file': result.get('relation_file'),
-            'scene_file': result.get('scene_file'),
-            'message': 'AI解析成功'
-        })
-        
-    except Exception as e:
-        logger.error(f"AI解析URL失败: {str(e)}")
-        return jsonify({'error': 'AI解析URL失败', 'message': str(e)}), 500
-
-@app.route('/api/ai/files', methods=['GET'])
-def get_ai_files():
-    """根据URL获取已生成的文件"""
-    try:
-        url = request.args.get('url')
-        if not url:
-            return jsonify({'error': 'URL不能为空'}), 400
-        
-        url = _normalize_url(url)
-        file_key = _create_file_key_from_url(url)
-        
-        # 定义输出目录
-        output_dir = app.config['UPLOAD_FOLDER']
-        
-        # 定义文件路径
-        json_file = os.path.join(output_dir, 'json', f"json_{file_key}.json")
-        openapi_file = os.path.join(output_dir, 'openapi', f"openapi_{file_key}.yaml")
-        relation_file = os.path.join(output_dir, 'relation', f"relation_{file_key}.json")
-        scene_file = os.path.join(output_dir, 'scene', f"scene_{file_key}.json")
-        
-        # 检查文件是否存在
-        files_exist = {
-            'openapi': os.path.exists(openapi_file),
-            'relation': os.path.exists(relation_file),
-            'scene': os.path.exists(scene_file)
-        }
-        
-        if not any(files_exist.values()):
-            return jsonify({
-                'error': '该URL对应的文件不存在',
-                'url': url,
-                'url_hash': url_hash
-            }), 404
-        
-        # 读取文件内容
-        result = {
-            'success': True,
-            'url': url,
-            'file_key': file_key,
-            'files_exist': files_exist
-        }
-        
-        # 读取OpenAPI文件
-        if files_exist['openapi']:
-            with open(openapi_file, 'r', encoding='utf-8') as f:
-                result['openapi_data'] = yaml.safe_load(f)
-        
-        # 读取关联关系文件
-        if files_exist['relation']:
-            with open(relation_file, 'r', encoding='utf-8') as f:
-                result['relation_data'] = json.load(f)
-        
-        # 读取业务场景文件
-        if files_exist['scene']:
-            with open(scene_file, 'r', encoding='utf-8') as f:
-                result['scene_data'] = json.load(f)
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        logger.error(f"获取AI文件失败: {str(e)}")
-        return jsonify({'error': '获取AI文件失败', 'message': str(e)}), 500
-
 @app.route('/api/multiapi/documents', methods=['GET'])
 def list_multiapi_documents():
     """获取multiuploads/openapi目录下的所有多接口文档列表"""
@@ -4246,6 +4007,11 @@ def get_multiapi_document(file_id):
                 'success': False,
                 'error': '多接口文档文件不存在'
             }), 404
+
+        # 文件未修改时直接返回 304
+        cached = not_modified(file_path)
+        if cached is not None:
+            return cached
         
         # 读取文件内容
         file_extension = os.path.splitext(file_name)[1].lower()
@@ -4346,6 +4112,7 @@ def delete_multiapi_document(file_id):
         
         # 删除文件
         os.remove(file_path)
+        document_index.remove_path(file_path)
         
         # 删除所有相关的文件（json、relation、scene目录下的同名文件）
         related_dirs = ['json', 'relation', 'scene', 'test_case', 'test_code']
@@ -4689,6 +4456,8 @@ def execute_multiapi_testcases(file_id):
 
 # 7. 飞书测试接口
 @app.route('/api/feishu/run-all-tests', methods=['POST'])
+@background_job(job_manager, app, 'feishu_run_all_tests')
+@with_progress
 def run_all_feishu_tests():
     """执行 run_all_feishu_tests.py 脚本"""
     try:
@@ -4714,6 +4483,7 @@ def run_all_feishu_tests():
         env['PYTHONUTF8'] = '1'  # Python 3.7+ 支持，强制 UTF-8
         # 标记为非交互模式，防止子进程内启动 allure serve 等阻塞操作
         env['NON_INTERACTIVE'] = '1'
+        enable_progress(env, g.progress_run_id, Path(__file__).parent)
         
         # 使用 UTF-8 编码，并设置 errors='replace' 来处理编码错误
         # 设置 stdin=subprocess.DEVNULL 防止脚本等待输入而阻塞
@@ -4728,6 +4498,7 @@ def run_all_feishu_tests():
             errors='replace',  # 遇到编码错误时用替换字符代替
             env=env  # 传递环境变量
         )
+        job_manager.track_process(process)
         
         # 等待执行完成（可以设置超时时间）
         stdout = ''
@@ -4894,6 +4665,8 @@ def run_all_feishu_tests():
         }), 500
 
 @app.route('/api/feishu/generate-and-test', methods=['POST'])
+@background_job(job_manager, app, 'feishu_generate_and_test')
+@with_progress
 def generate_and_test_feishu():
     """执行 run_feishu_generator_and_tests.py 脚本，带文件夹参数"""
     try:
@@ -4939,6 +4712,7 @@ def generate_and_test_feishu():
         env['PYTHONIOENCODING'] = 'utf-8'  # 强制 Python 使用 UTF-8 编码
         env['PYTHONUTF8'] = '1'  # Python 3.7+ 支持，强制 UTF-8
         env['NON_INTERACTIVE'] = '1'  # 标记为非交互式模式，脚本不会启动 Allure 服务器（由 API 启动）
+        enable_progress(env, g.progress_run_id, Path(__file__).parent)
         
         # 使用 UTF-8 编码，并设置 errors='replace' 来处理编码错误
         # 设置 stdin=subprocess.DEVNULL 防止脚本等待输入而阻塞
@@ -4953,6 +4727,7 @@ def generate_and_test_feishu():
             errors='replace',  # 遇到编码错误时用替换字符代替
             env=env  # 传递环境变量
         )
+        job_manager.track_process(process)
         
         # 等待执行完成（可以设置超时时间）
         stdout = ''
@@ -5034,72 +4809,6 @@ def generate_and_test_feishu():
                 inner_list = raw_responses.get('responses') if isinstance(raw_responses.get('responses'), list) else None
                 test_responses = inner_list if inner_list is not None else raw_responses
 
-        def _parse_log_blocks_to_cases(log_text: str, cases_data):
-            """
-            将日志里的“用例标题/请求/响应”块解析为结构化列表:
-            [
-                {
-                    "case_id": "01_open-apis_im_v1_images",
-                    "detail": "测试上传图片",
-                    "request": {...},
-                    "response": {...}
-                },
-                ...
-            ]
-            """
-            import re, ast, json as _json
-
-            case_map = {}
-            if isinstance(cases_data, list):
-                for c in cases_data:
-                    detail = c.get("detail")
-                    if detail:
-                        case_map[detail] = c.get("case_id")
-
-            pattern = re.compile(
-                r"用例标题:\s*(?P<title>.+?)\n"
-                r"请求路径:\s*(?P<url>.+?)\n"
-                r"请求方式:\s*(?P<method>\S+)\n"
-                r"请求头:\s*(?P<headers>\{.*?\})\n"
-                r"请求内容:\s*(?P<body>\{.*?\})\n"
-                r"接口响应内容:\s*(?P<resp_body>\{.*?\})\n"
-                r"接口响应时长:\s*(?P<elapsed>[\d\.]+)\s*ms\n"
-                r"Http状态码:\s*(?P<status>\d+)",
-                re.S
-            )
-
-            def _parse_obj(text):
-                for parser in (
-                    lambda t: _json.loads(t),
-                    lambda t: ast.literal_eval(t),
-                ):
-                    try:
-                        return parser(text)
-                    except Exception:
-                        continue
-                return text
-
-            results = []
-            for m in pattern.finditer(log_text or ""):
-                detail = m.group("title").strip()
-                results.append({
-                    "case_id": case_map.get(detail),
-                    "detail": detail,
-                    "request": {
-                        "method": m.group("method").strip(),
-                        "url": m.group("url").strip(),
-                        "body": _parse_obj(m.group("body")),
-                        "headers": _parse_obj(m.group("headers")),
-                    },
-                    "response": {
-                        "status_code": int(m.group("status")),
-                        "body": _parse_obj(m.group("resp_body")),
-                        "headers": None,
-                        "elapsed_ms": float(m.group("elapsed")),
-                    }
-                })
-            return results or None
-
         # 若 test_responses 仍为 dict 且包含 stdout 文本，则尝试解析为结构化列表
         if test_responses is None and isinstance(parsed, dict):
             stdout_in_responses = parsed.get("responses") if isinstance(parsed.get("responses"), dict) else None
@@ -5108,58 +4817,6 @@ def generate_and_test_feishu():
                 if parsed_list:
                     test_responses = parsed_list
 
-        def _parse_log_blocks_to_cases(log_text: str, cases_data):
-            """
-            解析 stdout 中的日志块为结构化的请求/响应列表。
-            """
-            import re, ast, json as _json
-            if not log_text:
-                return None
-            case_map = {}
-            if isinstance(cases_data, list):
-                for c in cases_data:
-                    detail = c.get("detail")
-                    if detail:
-                        case_map[detail] = c.get("case_id")
-            pattern = re.compile(
-                r"用例标题:\s*(?P<title>.+?)\n"
-                r"请求路径:\s*(?P<url>.+?)\n"
-                r"请求方式:\s*(?P<method>\S+)\n"
-                r"请求头:\s*(?P<headers>\{.*?\})\n"
-                r"请求内容:\s*(?P<body>\{.*?\})\n"
-                r"接口响应内容:\s*(?P<resp_body>\{.*?\})\n"
-                r"接口响应时长:\s*(?P<elapsed>[\d\.]+)\s*ms\n"
-                r"Http状态码:\s*(?P<status>\d+)",
-                re.S
-            )
-            def _parse_obj(text):
-                for parser in (lambda t: _json.loads(t), lambda t: ast.literal_eval(t)):
-                    try:
-                        return parser(text)
-                    except Exception:
-                        continue
-                return text
-            results = []
-            for m in pattern.finditer(log_text):
-                detail = m.group("title").strip()
-                results.append({
-                    "case_id": case_map.get(detail),
-                    "detail": detail,
-                    "request": {
-                        "method": m.group("method").strip(),
-                        "url": m.group("url").strip(),
-                        "body": _parse_obj(m.group("body")),
-                        "headers": _parse_obj(m.group("headers")),
-                    },
-                    "response": {
-                        "status_code": int(m.group("status")),
-                        "body": _parse_obj(m.group("resp_body")),
-                        "headers": None,
-                        "elapsed_ms": float(m.group("elapsed")),
-                    }
-                })
-            return results or None
-
         # 尝试从 stdout/stderr 解析结构化请求/响应
         combined_text = f"{stdout}\n{stderr}"
         stdout_parsed = _parse_log_blocks_to_cases(
@@ -5204,6 +4861,7 @@ def generate_and_test_feishu():
         }), 500
 
 @app.route('/api/feishu/generate-test-cases', methods=['POST'])
+@background_job(job_manager, app, 'feishu_generate_test_cases')
 def generate_test_cases():
     """生成AI测试用例，但不执行测试"""
     try:
@@ -5297,8 +4955,8 @@ def generate_test_cases():
         
         # 执行子进程的辅助函数
         def run_proc(cmd_args):
-            """执行子进程并返回结果"""
-            process = subprocess.Popen(
+            """执行子进程并返回结果，pytest 命令在开启预热进程时不启动新的子进程"""
+            process = popen_pytest(
                 cmd_args,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
@@ -5309,6 +4967,7 @@ def generate_test_cases():
                 errors='replace',  # 遇到编码错误时用替换字符代替
                 env=env  # 传递环境变量
             )
+            job_manager.track_process(process)
             stdout = ''
             stderr = ''
             return_code = -1
@@ -5599,6 +5258,8 @@ def generate_test_cases():
         }), 500
 
 @app.route('/api/feishu/execute-test-cases', methods=['POST'])
+@background_job(job_manager, app, 'feishu_execute_test_cases')
+@with_progress
 def execute_test_cases():
     """执行已生成的测试用例"""
     try:
@@ -5659,11 +5320,12 @@ def execute_test_cases():
         env['PYTHONIOENCODING'] = 'utf-8'  # 强制 Python 使用 UTF-8 编码
         env['PYTHONUTF8'] = '1'  # Python 3.7+ 支持，强制 UTF-8
         env['NON_INTERACTIVE'] = '1'  # 标记为非交互式模式
+        enable_progress(env, g.progress_run_id, Path(__file__).parent)
         
         # 执行子进程的辅助函数
         def run_proc(cmd_args):
-            """执行子进程并返回结果"""
-            process = subprocess.Popen(
+            """执行子进程并返回结果，pytest 命令在开启预热进程时不启动新的子进程"""
+            process = popen_pytest(
                 cmd_args,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
@@ -5674,6 +5336,7 @@ def execute_test_cases():
                 errors='replace',  # 遇到编码错误时用替换字符代替
                 env=env  # 传递环境变量
             )
+            job_manager.track_process(process)
             stdout = ''
             stderr = ''
             return_code = -1
@@ -5774,8 +5437,11 @@ def execute_test_cases():
         if test_stderr_length:
             response_data['test_stderr_length'] = test_stderr_length
         
-        # 提取指标：只用 pytest 输出，避免引用其他任务的 Allure 数据
-        metrics = _parse_pytest_output(test_stdout)
+        # 提取指标：优先使用本次执行的进度事件，其次解析 pytest 输出，避免引用其他任务的 Allure 数据
+        progress = summarize_progress(progress_path(g.progress_run_id))
+        metrics = progress['metrics'] if progress else _parse_pytest_output(test_stdout)
+        if progress:
+            response_data['failed_tests'] = progress['failed_tests']
         if metrics:
             response_data['metrics'] = metrics
             response_data['message'] = f'测试执行完成。通过: {metrics.get("passed", 0)}/{metrics.get("total", 0)}'
@@ -5981,6 +5647,8 @@ def generate_ai_test_cases():
         }), 500
 
 @app.route('/api/feishu/generate-and-test-single-file', methods=['POST'])
+@background_job(job_manager, app, 'feishu_generate_and_test_single_file')
+@with_progress
 def generate_and_test_feishu_single_file():
     """执行 run_feishu_single_file.py 脚本，处理单个文件，只返回指标"""
     try:
@@ -6044,6 +5712,7 @@ def generate_and_test_feishu_single_file():
         env['PYTHONIOENCODING'] = 'utf-8'  # 强制 Python 使用 UTF-8 编码
         env['PYTHONUTF8'] = '1'  # Python 3.7+ 支持，强制 UTF-8
         env['NON_INTERACTIVE'] = '1'  # 标记为非交互式模式，脚本不会启动 Allure 服务器
+        enable_progress(env, g.progress_run_id, Path(__file__).parent)
         
         # 使用 UTF-8 编码，并设置 errors='replace' 来处理编码错误
         # 设置 stdin=subprocess.DEVNULL 防止脚本等待输入而阻塞
@@ -6058,6 +5727,7 @@ def generate_and_test_feishu_single_file():
             errors='replace',  # 遇到编码错误时用替换字符代替
             env=env  # 传递环境变量
         )
+        job_manager.track_process(process)
         
         # 等待执行完成（可以设置超时时间）
         stdout = ''
@@ -6748,6 +6418,7 @@ def generate_test_cases_by_file_id():
 
 # 10. 执行测试用例并生成指标接口
 @app.route('/api/execute_test_cases', methods=['POST'])
+@background_job(job_manager, app, 'execute_test_cases_by_file_id')
 def execute_test_cases_by_file_id():
     """
     根据file_id读取测试用例文件，生成测试代码，执行测试并生成指标
@@ -7107,121 +6778,9 @@ def generate_test_metrics(test_results, test_cases_data, execution_time):
 
 # 6. 测试结果管理
 def sync_test_results():
-    """同步和累积测试结果数据"""
+    """增量同步测试结果索引，只解析新增或修改过的结果文件"""
     try:
-        # 确保结果目录存在
-        results_dir = app.config['RESULTS_FOLDER']
-        if not os.path.exists(results_dir):
-            return
-        
-        # 创建累积数据文件路径
-        sync_file_path = os.path.join(results_dir, "test_results_sync.json")
-        
-        # 初始化累积数据
-        sync_data = {
-            'last_sync': datetime.now().isoformat(),
-            'total_results': 0,
-            'results': []
-        }
-        
-        # 如果已存在同步文件，先加载它
-        if os.path.exists(sync_file_path):
-            try:
-                with open(sync_file_path, 'r', encoding='utf-8') as f:
-                    existing_sync_data = json.load(f)
-                    # 保留现有的结果数据
-                    sync_data['results'] = existing_sync_data.get('results', [])
-            except Exception as e:
-                logger.warning(f"加载现有同步数据失败: {str(e)}")
-        
-        # 创建一个集合来跟踪已处理的文件，避免重复
-        processed_files = {result.get('file_name', '') for result in sync_data['results']}
-        
-        # 遍历结果目录中的所有JSON文件
-        for filename in os.listdir(results_dir):
-            if filename.endswith('.json') and filename != 'test_results_sync.json':
-                file_path = os.path.join(results_dir, filename)
-                
-                # 跳过已经处理过的文件
-                if filename in processed_files:
-                    continue
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        result_data = json.load(f)
-                    
-                    # 检查是否是测试结果数据
-                    is_test_result = (
-                        filename.startswith('coverage_') or 
-                        filename.startswith('test_results_') or
-                        filename.startswith('suggestions_') or
-                        ('execution_results' in result_data) or
-                        ('analysis_results' in result_data) or
-                        ('total' in result_data and 'passed' in result_data and 'failed' in result_data)
-                    )
-                    
-                    if is_test_result:
-                        # 提取测试结果信息
-                        result_type = 'unknown'
-                        if filename.startswith('coverage_'):
-                            result_type = 'execution'
-                        elif filename.startswith('test_results_'):
-                            result_type = 'test'
-                        elif filename.startswith('suggestions_'):
-                            result_type = 'analysis'
-                        elif 'execution_results' in result_data:
-                            result_type = 'execution'
-                        elif 'analysis_results' in result_data:
-                            result_type = 'analysis'
-                        
-                        # 获取关联的file_id
-                        file_id = result_data.get('file_id', '')
-                        if not file_id and filename.startswith('coverage_'):
-                            file_id = filename[9:]  # 移除'coverage_'前缀
-                        elif not file_id and filename.startswith('test_results_'):
-                            file_id = filename[13:]  # 移除'test_results_'前缀
-                        elif not file_id and filename.startswith('suggestions_'):
-                            file_id = filename[12:]  # 移除'suggestions_'前缀
-                        
-                        # 获取API名称
-                        api_name = result_data.get('api_name', '')
-                        if not api_name and file_id and file_id in api_docs:
-                            api_name = api_docs[file_id].get('filename', file_id)
-                        
-                        # 获取时间戳
-                        timestamp = result_data.get('created_at', '')
-                        if not timestamp:
-                            # 尝试从文件修改时间获取
-                            timestamp = datetime.fromtimestamp(os.path.getmtime(file_path)).isoformat()
-                        
-                        # 创建同步记录
-                        sync_record = {
-                            'id': str(uuid.uuid4()),
-                            'file_name': filename,
-                            'file_id': file_id,
-                            'api_name': api_name,
-                            'result_type': result_type,
-                            'timestamp': timestamp,
-                            'data': result_data
-                        }
-                        
-                        # 添加到累积结果
-                        sync_data['results'].append(sync_record)
-                        
-                except Exception as e:
-                    logger.error(f"处理测试结果文件失败 {filename}: {str(e)}")
-        
-        # 更新统计信息
-        sync_data['total_results'] = len(sync_data['results'])
-        sync_data['last_sync'] = datetime.now().isoformat()
-        
-        # 保存同步数据
-        with open(sync_file_path, 'w', encoding='utf-8') as f:
-            json.dump(sync_data, f, ensure_ascii=False, indent=2)
-        
-        logger.info(f"测试结果同步完成，共处理 {sync_data['total_results']} 条结果")
-        return sync_data
-        
+        return test_results_store.sync()
     except Exception as e:
         logger.error(f"测试结果同步失败: {str(e)}")
         return None
@@ -7229,59 +6788,50 @@ def sync_test_results():
 def get_synced_test_results(limit=20, offset=0, result_type=None, file_id=None):
     """获取同步后的测试结果"""
     try:
-        # 确保结果目录存在
-        results_dir = app.config['RESULTS_FOLDER']
-        sync_file_path = os.path.join(results_dir, "test_results_sync.json")
-        
-        # 如果同步文件不存在，先执行同步
-        if not os.path.exists(sync_file_path):
-            sync_data = sync_test_results()
-            if not sync_data:
-                return {'results': [], 'total': 0}
-        else:
-            # 检查是否需要重新同步（例如，超过一定时间）
-            with open(sync_file_path, 'r', encoding='utf-8') as f:
-                sync_data = json.load(f)
-            
-            # 检查最后同步时间，如果超过1小时，重新同步
-            last_sync = sync_data.get('last_sync', '')
-            if last_sync:
-                try:
-                    last_sync_time = datetime.fromisoformat(last_sync.replace('Z', '+00:00'))
-                    current_time = datetime.now()
-                    # 如果超过1小时未同步，重新同步
-                    if (current_time - last_sync_time).total_seconds() > 3600:
-                        sync_data = sync_test_results()
-                except Exception as e:
-                    logger.warning(f"解析最后同步时间失败: {str(e)}")
-                    sync_data = sync_test_results()
-        
-        # 获取结果列表
-        results = sync_data.get('results', [])
-        
-        # 应用筛选条件
-        if result_type and result_type != 'all':
-            results = [r for r in results if r.get('result_type') == result_type]
-        
-        if file_id and file_id != 'all':
-            results = [r for r in results if r.get('file_id') == file_id]
-        
-        # 按时间戳排序（最新的在前）
-        results.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        
-        # 应用分页
-        total = len(results)
-        paginated_results = results[offset:offset+limit]
-        
-        return {
-            'results': paginated_results,
-            'total': total
-        }
-        
+        return test_results_store.query(limit, offset, result_type=result_type, file_id=file_id)
     except Exception as e:
         logger.error(f"获取同步测试结果失败: {str(e)}")
         return {'results': [], 'total': 0}
 
+def _date_filter_since(date_filter):
+    """将 today / week / month 转换为起始日期"""
+    if not date_filter or date_filter == 'all':
+        return None
+    days = {'today': 0, 'week': 7, 'month': 30}.get(date_filter)
+    if days is None:
+        return None
+    return (datetime.now() - timedelta(days=days)).date().isoformat()
+
+def _format_test_result(record):
+    """将索引记录转换为前端期望的格式"""
+    data = record.get('data') or {}
+    result_type = record.get('result_type', 'unknown')
+    api_name = record.get('api_name', '')
+    if not api_name and record.get('file_id') in api_docs:
+        api_name = api_docs[record['file_id']].get('filename', record['file_id'])
+    default_suite = {'execution': '执行结果', 'analysis': '分析结果'}.get(result_type, '测试结果')
+    response = data.get('analysis_results') if result_type == 'analysis' and 'analysis_results' in data \
+        else data.get('response', {})
+    duration = record.get('duration')
+    return {
+        'id': record.get('id', ''),
+        'suiteName': record.get('suite_name') or default_suite,
+        'apiName': api_name,
+        'timestamp': record.get('timestamp', ''),
+        'status': record.get('status', 'unknown'),
+        'totalCases': record.get('total', 0),
+        'passedCases': record.get('passed', 0),
+        'failedCases': record.get('failed', 0),
+        'skippedCases': record.get('skipped', 0),
+        'duration': f"{duration}秒" if duration else '-',
+        'request': data.get('request', {}),
+        'response': response,
+        'log': data.get('log', ''),
+        'resultType': result_type,
+        'fileId': record.get('file_id', ''),
+        'fileName': record.get('file_name', '')
+    }
+
 @app.route('/api/test-results', methods=['GET'])
 def get_test_results():
     """获取历史测试结果列表"""
@@ -7294,300 +6844,27 @@ def get_test_results():
         date_filter = request.args.get('date', None)
         result_type_filter = request.args.get('type', None)
         file_id_filter = request.args.get('file_id', None)
+        # synced=true 时同时返回分析结果，否则只返回测试执行结果
         use_synced = request.args.get('synced', 'false').lower() == 'true'
-        
-        # 如果请求使用同步数据，使用同步函数
-        if use_synced:
-            synced_results = get_synced_test_results(limit, offset, result_type_filter, file_id_filter)
-            
-            # 转换同步数据为前端期望的格式
-            formatted_results = []
-            for result in synced_results['results']:
-                data = result.get('data', {})
-                result_type = result.get('result_type', 'unknown')
-                
-                # 根据结果类型提取不同的数据
-                if result_type == 'execution' and 'execution_results' in data:
-                    exec_results = data['execution_results']
-                    total = exec_results.get('total', 0)
-                    passed = exec_results.get('passed', 0)
-                    failed = exec_results.get('failed', 0)
-                    skipped = exec_results.get('skipped', 0)
-                    duration = exec_results.get('duration', 0)
-                    
-                    status = 'unknown'
-                    if failed == 0:
-                        status = 'passed'
-                    elif passed > 0:
-                        status = 'partial'
-                    else:
-                        status = 'failed'
-                    
-                    formatted_results.append({
-                        'id': result.get('id', ''),
-                        'suiteName': data.get('suite_name', '执行结果'),
-                        'apiName': result.get('api_name', ''),
-                        'timestamp': result.get('timestamp', ''),
-                        'status': status,
-                        'totalCases': total,
-                        'passedCases': passed,
-                        'failedCases': failed,
-                        'skippedCases': skipped,
-                        'duration': f"{duration}秒" if duration else '-',
-                        'request': data.get('request', {}),
-                        'response': data.get('response', {}),
-                        'log': data.get('log', ''),
-                        'resultType': result_type,
-                        'fileId': result.get('file_id', ''),
-                        'fileName': result.get('file_name', '')
-                    })
-                    
-                elif result_type == 'analysis' and 'analysis_results' in data:
-                    analysis = data['analysis_results']
-                    
-                    formatted_results.append({
-                        'id': result.get('id', ''),
-                        'suiteName': data.get('suite_name', '分析结果'),
-                        'apiName': result.get('api_name', ''),
-                        'timestamp': result.get('timestamp', ''),
-                        'status': 'analysis',
-                        'totalCases': 0,
-                        'passedCases': 0,
-                        'failedCases': 0,
-                        'skippedCases': 0,
-                        'duration': '-',
-                        'request': {},
-                        'response': analysis,
-                        'log': '',
-                        'resultType': result_type,
-                        'fileId': result.get('file_id', ''),
-                        'fileName': result.get('file_name', '')
-                    })
-                    
-                else:
-                    # 通用格式
-                    formatted_results.append({
-                        'id': result.get('id', ''),
-                        'suiteName': data.get('suite_name', '测试结果'),
-                        'apiName': result.get('api_name', ''),
-                        'timestamp': result.get('timestamp', ''),
-                        'status': 'unknown',
-                        'totalCases': data.get('total', 0),
-                        'passedCases': data.get('passed', 0),
-                        'failedCases': data.get('failed', 0),
-                        'skippedCases': data.get('skipped', 0),
-                        'duration': f"{data.get('duration', 0)}秒" if data.get('duration') else '-',
-                        'request': data.get('request', {}),
-                        'response': data.get('response', {}),
-                        'log': data.get('log', ''),
-                        'resultType': result_type,
-                        'fileId': result.get('file_id', ''),
-                        'fileName': result.get('file_name', '')
-                    })
-            
-            # 应用额外的筛选条件
-            if status_filter and status_filter != 'all':
-                formatted_results = [r for r in formatted_results if r.get('status') == status_filter]
-            
-            if api_filter and api_filter != 'all':
-                formatted_results = [r for r in formatted_results if r.get('apiName') == api_filter]
-            
-            if date_filter and date_filter != 'all':
-                try:
-                    now = datetime.now().date()
-                    filtered_results = []
-                    
-                    for result in formatted_results:
-                        timestamp = result.get('timestamp', '')
-                        if timestamp:
-                            try:
-                                result_date = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).date()
-                                
-                                if date_filter == 'today' and result_date == now:
-                                    filtered_results.append(result)
-                                elif date_filter == 'week':
-                                    week_ago = now.replace(day=now.day-7)
-                                    if result_date >= week_ago:
-                                        filtered_results.append(result)
-                                elif date_filter == 'month':
-                                    month_ago = now.replace(day=now.day-30)
-                                    if result_date >= month_ago:
-                                        filtered_results.append(result)
-                            except Exception as e:
-                                logger.warning(f"解析日期失败: {str(e)}")
-                    
-                    formatted_results = filtered_results
-                except Exception as e:
-                    logger.warning(f"日期筛选失败: {str(e)}")
-            
-            # 应用分页
-            total = len(formatted_results)
-            paginated_results = formatted_results[offset:offset+limit]
-            
-            return jsonify({
-                'success': True,
-                'results': paginated_results,
-                'total': total
-            })
-        
-        # 原有的逻辑（不使用同步数据）
-        # 确保结果目录存在
-        results_dir = app.config['RESULTS_FOLDER']
-        if not os.path.exists(results_dir):
-            return jsonify({
-                'success': True,
-                'results': [],
-                'total': 0
-            })
-        
-        # 收集所有测试结果文件
-        test_results = []
-        
-        # 遍历结果目录中的所有JSON文件
-        for filename in os.listdir(results_dir):
-            if filename.endswith('.json'):
-                file_path = os.path.join(results_dir, filename)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        result_data = json.load(f)
-                    
-                    # 检查是否是测试结果数据
-                    # 检查文件名前缀是否匹配测试结果模式
-                    if (filename.startswith('coverage_') or 
-                        filename.startswith('test_results_') or
-                        ('execution_results' in result_data) or
-                        ('total' in result_data and 'passed' in result_data and 'failed' in result_data)):
-                        
-                        # 提取测试结果信息
-                        result_id = filename[:-5]  # 移除.json扩展名
-                        timestamp = result_data.get('created_at', result_data.get('timestamp', ''))
-                        
-                        # 尝试从文件名或数据中获取API名称
-                        api_name = result_data.get('api_name', '')
-                        if not api_name and 'file_id' in result_data:
-                            file_id = result_data['file_id']
-                            # 尝试从API文档中获取API名称
-                            if file_id in api_docs:
-                                api_name = api_docs[file_id].get('filename', file_id)
-                        
-                        # 获取测试状态
-                        status = 'unknown'
-                        if 'status' in result_data:
-                            status = result_data['status']
-                        elif 'execution_results' in result_data:
-                            # 从执行结果中计算状态
-                            exec_results = result_data['execution_results']
-                            if isinstance(exec_results, dict):
-                                total = exec_results.get('total', 0)
-                                passed = exec_results.get('passed', 0)
-                                failed = exec_results.get('failed', 0)
-                                
-                                if failed == 0:
-                                    status = 'passed'
-                                elif passed > 0:
-                                    status = 'partial'
-                                else:
-                                    status = 'failed'
-                        elif 'total' in result_data and 'passed' in result_data and 'failed' in result_data:
-                            total = result_data.get('total', 0)
-                            passed = result_data.get('passed', 0)
-                            failed = result_data.get('failed', 0)
-                            
-                            if failed == 0:
-                                status = 'passed'
-                            elif passed > 0:
-                                status = 'partial'
-                            else:
-                                status = 'failed'
-                        
-                        # 获取测试统计
-                        total_cases = 0
-                        passed_cases = 0
-                        failed_cases = 0
-                        skipped_cases = 0
-                        
-                        if 'execution_results' in result_data:
-                            exec_results = result_data['execution_results']
-                            if isinstance(exec_results, dict):
-                                total_cases = exec_results.get('total', 0)
-                                passed_cases = exec_results.get('passed', 0)
-                                failed_cases = exec_results.get('failed', 0)
-                                skipped_cases = exec_results.get('skipped', 0)
-                        elif 'total' in result_data:
-                            total_cases = result_data.get('total', 0)
-                            passed_cases = result_data.get('passed', 0)
-                            failed_cases = result_data.get('failed', 0)
-                            skipped_cases = result_data.get('skipped', 0)
-                        
-                        # 获取执行时长
-                        duration = result_data.get('duration', 0)
-                        
-                        # 创建测试结果对象
-                        test_result = {
-                            'id': result_id,
-                            'suiteName': result_data.get('suite_name', '默认套件'),
-                            'apiName': api_name,
-                            'timestamp': timestamp,
-                            'status': status,
-                            'totalCases': total_cases,
-                            'passedCases': passed_cases,
-                            'failedCases': failed_cases,
-                            'skippedCases': skipped_cases,
-                            'duration': f"{duration}秒" if duration else '-',
-                            'request': result_data.get('request', {}),
-                            'response': result_data.get('response', {}),
-                            'log': result_data.get('log', '')
-                        }
-                        
-                        # 应用筛选条件
-                        include_result = True
-                        
-                        # 状态筛选
-                        if status_filter and status_filter != 'all' and status != status_filter:
-                            include_result = False
-                        
-                        # API筛选
-                        if api_filter and api_filter != 'all' and api_name != api_filter:
-                            include_result = False
-                        
-                        # 日期筛选
-                        if date_filter and date_filter != 'all' and timestamp:
-                            try:
-                                result_date = datetime.fromisoformat(timestamp.replace('Z', '+00:00')).date()
-                                now = datetime.now().date()
-                                
-                                if date_filter == 'today' and result_date != now:
-                                    include_result = False
-                                elif date_filter == 'week':
-                                    week_ago = now.replace(day=now.day-7)
-                                    if result_date < week_ago:
-                                        include_result = False
-                                elif date_filter == 'month':
-                                    month_ago = now.replace(day=now.day-30)
-                                    if result_date < month_ago:
-                                        include_result = False
-                            except Exception as e:
-                                logger.warning(f"解析日期失败: {str(e)}")
-                        
-                        if include_result:
-                            test_results.append(test_result)
-                            
-                except Exception as e:
-                    logger.error(f"加载测试结果失败 {filename}: {str(e)}")
-        
-        # 按时间戳排序（最新的在前）
-        test_results.sort(key=lambda x: x['timestamp'], reverse=True)
-        
-        # 应用分页
-        total = len(test_results)
-        paginated_results = test_results[offset:offset+limit]
-        
+
+        # 筛选、排序和分页都在数据库中完成
+        page = test_results_store.query(
+            limit,
+            offset,
+            result_type=result_type_filter,
+            file_id=file_id_filter,
+            status=status_filter,
+            api_name=api_filter,
+            since=_date_filter_since(date_filter),
+            test_results_only=not use_synced
+        )
+
         return jsonify({
             'success': True,
-            'results': paginated_results,
-            'total': total
+            'results': [_format_test_result(r) for r in page['results']],
+            'total': page['total']
         })
-        
+
     except Exception as e:
         logger.error(f"获取测试结果失败: {str(e)}")
         return jsonify({'error': '获取测试结果失败', 'message': str(e)}), 500
@@ -7633,106 +6910,10 @@ def get_test_result_detail(result_id):
 def get_test_results_statistics():
     """获取测试结果统计信息"""
     try:
-        # 获取所有测试结果
-        all_results = []
-        
-        # 从results目录获取测试执行结果
-        results_dir = app.config['RESULTS_FOLDER']
-        if os.path.exists(results_dir):
-            for filename in os.listdir(results_dir):
-                # 读取所有以coverage_或results_开头的JSON文件
-                if (filename.startswith('coverage_') or filename.startswith('results_')) and filename.endswith('.json'):
-                    file_path = os.path.join(results_dir, filename)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            result_data = json.load(f)
-                            if isinstance(result_data, dict):
-                                # 添加结果类型标识
-                                result_data['result_type'] = result_data.get('result_type', 'execution')
-                                all_results.append(result_data)
-                    except Exception as e:
-                        logger.error(f"读取测试结果文件 {filename} 失败: {str(e)}")
-        
-        # 从suggestions目录获取测试分析结果
-        suggestions_dir = app.config['SUGGESTIONS_FOLDER']
-        if os.path.exists(suggestions_dir):
-            for filename in os.listdir(suggestions_dir):
-                if filename.startswith('suggestions_') and filename.endswith('.json'):
-                    file_path = os.path.join(suggestions_dir, filename)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            result_data = json.load(f)
-                            if isinstance(result_data, dict):
-                                # 添加结果类型标识
-                                result_data['result_type'] = 'analysis'
-                                all_results.append(result_data)
-                    except Exception as e:
-                        logger.error(f"读取分析结果文件 {filename} 失败: {str(e)}")
-        
-        # 计算统计数据
-        total_tests = 0
-        passed_tests = 0
-        failed_tests = 0
-        coverage_percent = 0
-        
-        # 处理执行结果
-        for result in all_results:
-            if result.get('result_type') == 'execution' or result.get('result_type') == 'test_execution':
-                # 尝试从不同的字段获取测试指标
-                metrics = None
-                
-                # 检查是否有metrics字段（实际文件中的字段名）
-                if 'metrics' in result:
-                    metrics = result['metrics']
-                # 检查是否有test_metrics字段
-                elif 'test_metrics' in result:
-                    metrics = result['test_metrics']
-                # 检查是否有summary字段
-                elif 'summary' in result:
-                    metrics = result['summary']
-                # 检查是否有直接的统计字段
-                elif 'total' in result or 'passed' in result or 'failed' in result:
-                    metrics = result
-                
-                if metrics:
-                    total_tests += metrics.get('total', metrics.get('total_tests', 0))
-                    passed_tests += metrics.get('passed', metrics.get('passed_tests', 0))
-                    failed_tests += metrics.get('failed', metrics.get('failed_tests', 0))
-        
-        # 计算平均覆盖率
-        coverage_results = []
-        for result in all_results:
-            if result.get('result_type') == 'execution' or result.get('result_type') == 'test_execution':
-                # 尝试从不同的字段获取覆盖率数据
-                coverage = None
-                
-                # 检查metrics字段
-                if 'metrics' in result and 'coverage' in result['metrics']:
-                    coverage = result['metrics']['coverage']
-                # 检查test_metrics字段
-                elif 'test_metrics' in result and 'coverage' in result['test_metrics']:
-                    coverage = result['test_metrics']['coverage']
-                # 检查summary字段
-                elif 'summary' in result and 'coverage' in result['summary']:
-                    coverage = result['summary']['coverage']
-                # 检查直接字段
-                elif 'coverage' in result:
-                    coverage = result['coverage']
-                
-                if coverage is not None:
-                    coverage_results.append(coverage)
-        
-        if coverage_results:
-            coverage_percent = sum(coverage_results) / len(coverage_results)
-        
-        return jsonify({
-            'success': True,
-            'total_tests': total_tests,
-            'passed_tests': passed_tests,
-            'failed_tests': failed_tests,
-            'coverage_percent': round(coverage_percent, 2)
-        })
-        
+        # 执行结果的用例数和平均覆盖率由聚合查询得到
+        statistics = test_results_store.statistics()
+        return jsonify({'success': True, **statistics})
+
     except Exception as e:
         logger.error(f"获取测试结果统计信息失败: {str(e)}")
         return jsonify({'error': '获取测试结果统计信息失败', 'message': str(e)}), 500
@@ -7763,55 +6944,12 @@ def sync_test_results_endpoint():
 
 def _parse_log_blocks_to_cases(log_text: str, cases_data):
     """解析日志块为结构化请求/响应列表。"""
-    if not log_text:
-        return None
-    case_map = {}
-    if isinstance(cases_data, list):
-        for c in cases_data:
-            detail = c.get("detail")
-            if detail:
-                case_map[detail] = c.get("case_id")
-    pattern = re.compile(
-        r"用例标题:\s*(?P<title>.+?)\n"
-        r"请求路径:\s*(?P<url>.+?)\n"
-        r"请求方式:\s*(?P<method>\S+)\n"
-        r"请求头:\s*(?P<headers>\{.*?\})\n"
-        r"请求内容:\s*(?P<body>\{.*?\})\n"
-        r"接口响应内容:\s*(?P<resp_body>\{.*?\})\n"
-        r"接口响应时长:\s*(?P<elapsed>[\d\.]+)\s*ms\n"
-        r"Http状态码:\s*(?P<status>\d+)",
-        re.S
-    )
-    def _parse_obj(text):
-        for parser in (lambda t: json.loads(t), lambda t: ast.literal_eval(t)):
-            try:
-                return parser(text)
-            except Exception:
-                continue
-        return text
-    results = []
-    for m in pattern.finditer(log_text):
-        detail = m.group("title").strip()
-        results.append({
-            "case_id": case_map.get(detail),
-            "detail": detail,
-            "request": {
-                "method": m.group("method").strip(),
-                "url": m.group("url").strip(),
-                "body": _parse_obj(m.group("body")),
-                "headers": _parse_obj(m.group("headers")),
-            },
-            "response": {
-                "status_code": int(m.group("status")),
-                "body": _parse_obj(m.group("resp_body")),
-                "headers": None,
-                "elapsed_ms": float(m.group("elapsed")),
-            }
-        })
-    return results or None
+    from utils.logging_tool.log_decorator import parse_request_logs
+    return parse_request_logs(log_text, cases_data)
 
 
 @app.route('/api/ai/message-prompt', methods=['POST'])
+@background_job(job_manager, app, 'message_prompt')
 def run_message_prompt():
     """
     通用 message_ai_prompt 执行入口
@@ -7906,6 +7044,7 @@ def run_message_prompt():
             errors="replace",
             env=env,
         )
+        job_manager.track_process(process)
 
         try:
             stdout, stderr = process.communicate(timeout=600)
@@ -7946,6 +7085,8 @@ def run_message_prompt():
 
 
 @app.route('/api/ai/message-prompt/run', methods=['POST'])
+@background_job(job_manager, app, 'message_prompt_run')
+@with_progress
 def run_message_prompt_tests():
     """
     执行已生成的 message_ai_prompt pytest 用例
@@ -7984,9 +7125,13 @@ def run_message_prompt_tests():
         env["PYTHONIOENCODING"] = "utf-8"
         env["PYTHONUTF8"] = "1"
         env["NON_INTERACTIVE"] = "1"
+        enable_progress(env, g.progress_run_id, Path(__file__).parent)
         env["MP_LOG_PATH"] = str(log_path)
+        # 子进程中每个请求写入一行结构化日志，避免再从 stdout 中正则解析
+        event_log_path = project_root / "uploads" / "results" / f"mp_run_{task_id}.events.jsonl"
+        env[EVENT_LOG_ENV] = str(event_log_path)
 
-        process = subprocess.Popen(
+        process = popen_pytest(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
@@ -7997,6 +7142,7 @@ def run_message_prompt_tests():
             errors="replace",
             env=env,
         )
+        job_manager.track_process(process)
 
         try:
             stdout, stderr = process.communicate(timeout=600)
@@ -8019,6 +7165,11 @@ def run_message_prompt_tests():
                 log_read_error = f"读取 MP_LOG_PATH 失败: {e}"
                 logger.warning(log_read_error)
 
+        # 其次读取结构化请求日志，读取后删除，避免 uploads/results 下的文件不断累积
+        if test_responses is None:
+            test_responses = events_to_cases(read_events(str(event_log_path)))
+        remove_events(str(event_log_path))
+
         # 回退：如无文件，则尝试从 stdout/stderr 解析
         if test_responses is None:
             combined = f"{stdout}\n{stderr}"
@@ -8055,45 +7206,93 @@ def run_message_prompt_tests():
 
 @app.route('/api/test-results/export', methods=['GET'])
 def export_test_results():
-    """导出测试结果"""
+    """导出测试结果，支持与列表接口相同的 type / file_id / status / api / date 筛选"""
     try:
         import zipfile
-        import io
-        
+
         # 确保结果目录存在
         results_dir = app.config['RESULTS_FOLDER']
         if not os.path.exists(results_dir):
             return jsonify({'error': '测试结果目录不存在'}), 404
-        
-        # 创建内存中的ZIP文件
-        zip_buffer = io.BytesIO()
-        
+
+        file_names = test_results_store.file_names(
+            result_type=request.args.get('type', None),
+            file_id=request.args.get('file_id', None),
+            status=request.args.get('status', None),
+            api_name=request.args.get('api', None),
+            since=_date_filter_since(request.args.get('date', None))
+        )
+
+        # 结果较多时 ZIP 文件写入临时文件，不占用大量内存
+        zip_buffer = tempfile.SpooledTemporaryFile(max_size=32 * 1024 * 1024)
         with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # 添加所有测试结果文件到ZIP
-            for filename in os.listdir(results_dir):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(results_dir, filename)
+            for filename in file_names:
+                file_path = os.path.join(results_dir, filename)
+                if os.path.exists(file_path):
                     zip_file.write(file_path, filename)
-        
         zip_buffer.seek(0)
-        
-        # 创建响应
-        response = app.response_class(
-            zip_buffer.read(),
-            mimetype='application/zip',
-            direct_passthrough=True
-        )
-        
+
         # 设置下载文件名
         download_name = f"test-results-{datetime.now().strftime('%Y%m%d')}.zip"
-        response.headers.set('Content-Disposition', 'attachment', filename=download_name)
-        
-        return response
-        
+        return send_file(zip_buffer, mimetype='application/zip', as_attachment=True, download_name=download_name)
+
     except Exception as e:
         logger.error(f"导出测试结果失败: {str(e)}")
         return jsonify({'error': '导出测试结果失败', 'message': str(e)}), 500
 
+# 后台任务
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """后台任务列表"""
+    limit = request.args.get('limit', 20, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    data = job_manager.list_jobs(limit, offset, request.args.get('status', None))
+    return jsonify({'success': True, **data})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """查询后台任务状态，完成后 result 为原接口的响应内容"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': '任务不存在'}), 404
+    return jsonify({'success': True, 'job': job})
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """取消后台任务，运行中的任务会结束其启动的子进程"""
+    if job_manager.get(job_id) is None:
+        return jsonify({'error': '任务不存在'}), 404
+    if not job_manager.cancel(job_id):
+        return jsonify({'success': False, 'message': '任务已结束，无法取消'}), 409
+    return jsonify({'success': True, 'job_id': job_id})
+
+# 测试进度
+@app.route('/api/runs/<run_id>/events', methods=['GET'])
+def stream_run_events(run_id):
+    """以 SSE 推送测试执行进度，支持 Last-Event-ID 断线续传，run_finished 事件后结束"""
+    if not valid_run_id(run_id):
+        return jsonify({'error': 'run_id 格式错误'}), 400
+    last_event_id = request.headers.get('Last-Event-ID', type=int) or request.args.get('last_event_id', 0, type=int)
+    return Response(
+        stream_with_context(stream_events(run_id, last_event_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/runs/<run_id>/summary', methods=['GET'])
+def get_run_summary(run_id):
+    """当前已完成用例的汇总结果"""
+    if not valid_run_id(run_id):
+        return jsonify({'error': 'run_id 格式错误'}), 400
+    summary = summarize_progress(progress_path(run_id))
+    return jsonify({'success': True, 'run_id': run_id, **(summary or {'metrics': None, 'failed_tests': []})})
+
+# 重新提交服务重启前排队中的任务
+job_manager.resume()
+
+# ASGI 服务模式：uvicorn api_server:asgi_app，或设置 SERVER_MODE=asgi 后直接运行本文件
+asgi_app = create_asgi_app(app, ai_parse_async_routes)
+
 # 启动服务器
 if __name__ == '__main__':
     # 固定服务器配置
@@ -8111,5 +7310,10 @@ if __name__ == '__main__':
     logger.info(f"本地访问: http://localhost:{PORT}")
     
     # 启动服务器
-    app.run(host=HOST, port=PORT, debug=DEBUG, use_reloader=False)
+    if os.getenv('SERVER_MODE', '').lower() == 'asgi':
+        import uvicorn
+        logger.info("ASGI 服务模式")
+        uvicorn.run(asgi_app, host=HOST, port=PORT)
+    else:
+        app.run(host=HOST, port=PORT, debug=DEBUG, use_reloader=False)
 
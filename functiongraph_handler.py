@@ -6,6 +6,7 @@
 将PytestAutoApi项目适配为华为云FunctionGraph函数
 """
 
+import base64
 import json
 import os
 import sys
@@ -16,11 +17,9 @@ from datetime import datetime
 # 添加项目路径到系统路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-# 导入必要的模块
+# 导入必要的模块，依赖大模型的模块在 api_server 中按需导入，不影响冷启动
 try:
     from api_server import app
-    from utils.smart_auto.api_parser import APIParser
-    from utils.smart_auto.test_generator import TestCaseGenerator
 except ImportError as e:
     print(f"导入错误: {e}")
     sys.exit(1)
@@ -52,14 +51,19 @@ def handler(event, context):
         ):
             # 处理请求
             response = app.full_dispatch_request()
-            response_data = response.get_data(as_text=True)
+            # 压缩后的响应体是二进制数据，按 base64 返回
+            is_base64 = 'Content-Encoding' in response.headers
+            if is_base64:
+                response_data = base64.b64encode(response.get_data()).decode('ascii')
+            else:
+                response_data = response.get_data(as_text=True)
             
             # 构建FunctionGraph响应格式
             return {
                 'statusCode': response.status_code,
                 'headers': dict(response.headers),
                 'body': response_data,
-                'isBase64Encoded': False
+                'isBase64Encoded': is_base64
             }
     
     except Exception as e:
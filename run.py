@@ -4,21 +4,26 @@
 # @Author : 余少琪
 import os
 import sys
+import time
 import traceback
 import pytest
-from utils.other_tools.models import NotificationType
-from utils.other_tools.allure_data.allure_report_data import AllureFileClean
+from utils.other_tools.models import NotificationType, ReportEngine
+from utils.other_tools.allure_data.result_aggregator import AllureResultAggregator
+from utils.other_tools.allure_data.fast_report import generate_report, serve_report
 from utils.logging_tool.log_control import INFO
 from utils.notify.wechat_send import WeChatSend
 from utils.notify.ding_talk import DingTalkSendMsg
 from utils.notify.send_mail import SendEmail
 from utils.notify.lark import FeiShuTalkChatBot
-from utils.other_tools.allure_data.error_case_excel import ErrorCaseExcel
+from utils.other_tools.allure_data.failed_case_excel import FailedCaseExcel
 from utils.other_tools.allure_config_helper import ensure_allure_properties_file
 from utils import config
+from common.setting import ensure_path_sep
 
 
 def run():
+    # 用例执行期间增量统计 allure 原始结果，执行结束后不需要等待 allure generate 即可发送通知
+    aggregator = AllureResultAggregator(ensure_path_sep("\\report\\tmp"), since=time.time())
     # 从配置文件中获取项目名称
     try:
         INFO.logger.info(
@@ -39,6 +44,7 @@ def run():
         # 判断现有的测试用例，如果未生成测试代码，则自动生成
         # TestCaseAutomaticGeneration().get_case_automatic()
 
+        aggregator.start_watch()
         pytest.main(['-s', '-W', 'ignore:Module already imported:pytest.PytestWarning',
                      '--alluredir', './report/tmp', "--clean-alluredir"])
 
@@ -54,29 +60,35 @@ def run():
                     "--reruns=3", "--reruns-delay=2"
                    """
 
-        os.system(r"allure generate ./report/tmp -o ./report/html --clean")
-
-        allure_data = AllureFileClean().get_case_count()
+        allure_data = aggregator.stop_watch()
         notification_mapping = {
             NotificationType.DING_TALK.value: DingTalkSendMsg(allure_data).send_ding_notification,
             NotificationType.WECHAT.value: WeChatSend(allure_data).send_wechat_notification,
-            NotificationType.EMAIL.value: SendEmail(allure_data).send_main,
+            NotificationType.EMAIL.value: SendEmail(allure_data, aggregator).send_main,
             NotificationType.FEI_SHU.value: FeiShuTalkChatBot(allure_data).post
         }
 
         if config.notification_type != NotificationType.DEFAULT.value:
             notification_mapping.get(config.notification_type)()
 
+        if config.report_engine == ReportEngine.FAST:
+            generate_report(ensure_path_sep("\\report\\tmp"), ensure_path_sep("\\report\\fast"))
+        else:
+            os.system(r"allure generate ./report/tmp -o ./report/html --clean")
+
         if config.excel_report:
-            ErrorCaseExcel().write_case()
+            FailedCaseExcel(metrics=allure_data).write_case()
 
         # 程序运行之后，自动启动报告，如果不想启动报告，可注释这段代码
-        os.system(f"allure serve ./report/tmp -h 127.0.0.1 -p 9999")
+        if config.report_engine == ReportEngine.FAST:
+            serve_report(ensure_path_sep("\\report\\fast"), "127.0.0.1", 9999)
+        else:
+            os.system(f"allure serve ./report/tmp -h 127.0.0.1 -p 9999")
 
     except Exception:
         # 如有异常，相关异常发送邮件
         e = traceback.format_exc()
-        send_email = SendEmail(AllureFileClean.get_case_count())
+        send_email = SendEmail(aggregator.stop_watch(), aggregator)
         send_email.error_mail(e)
         raise
 
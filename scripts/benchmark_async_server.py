@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+对比 Flask 多线程服务与 ASGI 服务模式在并发 AI 解析时的表现。
+启动一个本地的大模型桩服务（兼容 OpenAI chat/completions 接口，固定延迟后返回），
+分别以两种模式启动 api_server，同时发起 --parse 个 /api/ai/parse（每个请求解析不同的本地文档）
+和 --listing 个列表请求，输出各类请求的耗时和服务进程的最大线程数（统计前先预热一次解析请求）。
+
+python scripts/benchmark_async_server.py --parse 30 --listing 60 --llm-delay 1.0
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+LISTING_PATHS = ("/api/docs/all-documents", "/api/test-results", "/api/health")
+
+# 同时是合法的 YAML 和 JSON，三种文件的校验都能通过
+STUB_CONTENT = json.dumps({
+    "openapi": "3.0.0",
+    "info": {"title": "stub", "version": "1.0.0"},
+    "paths": {},
+    "related_pairs": [],
+    "unrelated_files": [],
+    "business_scenes": {"scenes": []},
+})
+
+SERVER_CODE = {
+    "wsgi": "from api_server import app; app.run(host='127.0.0.1', port={port}, threaded=True)",
+    "asgi": "import uvicorn; from api_server import asgi_app; "
+            "uvicorn.run(asgi_app, host='127.0.0.1', port={port}, log_level='warning')",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_stub_llm(delay: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(delay)
+            body = json.dumps({
+                "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": "stub",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": STUB_CONTENT}}],
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", free_port()), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def request(url: str, data: dict = None) -> tuple:
+    body = json.dumps(data).encode() if data is not None else None
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    begin = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=600) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - begin
+
+
+def thread_count(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def summary(costs: list) -> str:
+    if not costs:
+        return "-"
+    costs = sorted(costs)
+    p95 = costs[min(len(costs) - 1, int(len(costs) * 0.95))]
+    return f"中位数 {statistics.median(costs):.3f} s, p95 {p95:.3f} s, 最慢 {costs[-1]:.3f} s"
+
+
+def run_mode(mode: str, args, llm_url: str) -> None:
+    work_dir = tempfile.mkdtemp(prefix="async_bench_")
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=str(ROOT), BAILIAN_API_URL=llm_url,
+               DASHSCOPE_API_KEY="stub", BAILIAN_MODEL="stub")
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVER_CODE[mode].format(port=port)],
+        cwd=work_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(300):
+            try:
+                if request(base + "/api/health")[0] == 200:
+                    break
+            except OSError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError(f"{mode} 服务启动失败")
+
+        docs = []
+        for i in range(args.parse + 1):
+            path = os.path.join(work_dir, f"doc_{i}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"name": f"接口{i}", "path": f"/api/{i}", "method": "POST"}, f, ensure_ascii=False)
+            docs.append("file://" + path)
+
+        # 第一次解析会导入 openai 等依赖，先预热一次，只统计之后的并发请求
+        request(base + "/api/ai/parse", {"url": docs.pop()})
+
+        peak = [thread_count(server.pid)]
+        stop = threading.Event()
+
+        def sample():
+            while not stop.wait(0.05):
+                peak[0] = max(peak[0], thread_count(server.pid))
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+
+        parse_costs, listing_costs, errors = [], [], []
+        begin = time.perf_counter()
+        with ThreadPoolExecutor(args.parse + args.listing) as executor:
+            parse_futures = [executor.submit(request, base + "/api/ai/parse", {"url": url}) for url in docs]
+            time.sleep(0.2)
+            listing_futures = [
+                executor.submit(request, base + LISTING_PATHS[i % len(LISTING_PATHS)])
+                for i in range(args.listing)
+            ]
+            for futures, costs in ((parse_futures, parse_costs), (listing_futures, listing_costs)):
+                for future in futures:
+                    status, cost = future.result()
+                    costs.append(cost)
+                    if status != 200:
+                        errors.append(status)
+        wall = time.perf_counter() - begin
+        stop.set()
+        sampler.join()
+
+        print(f"[{mode}] 总耗时 {wall:.3f} s, 服务进程最大线程数 {peak[0]}, 非 200 响应 {len(errors)} 个")
+        print(f"  /api/ai/parse x{args.parse}: {summary(parse_costs)}")
+        print(f"  列表接口 x{args.listing}: {summary(listing_costs)}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask 多线程服务与 ASGI 服务模式并发对比")
+    parser.add_argument("--parse", type=int, default=30, help="并发 /api/ai/parse 请求数")
+    parser.add_argument("--listing", type=int, default=60, help="同时发起的列表请求数")
+    parser.add_argument("--llm-delay", type=float, default=1.0, help="大模型桩服务每次调用的延迟（秒）")
+    parser.add_argument("--modes", nargs="+", default=["wsgi", "asgi"], choices=sorted(SERVER_CODE))
+    args = parser.parse_args()
+
+    llm = start_stub_llm(args.llm_delay)
+    llm_url = f"http://127.0.0.1:{llm.server_address[1]}/v1"
+    try:
+        for mode in args.modes:
+            run_mode(mode, args, llm_url)
+    finally:
+        llm.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+对比每次启动新的 pytest 子进程与在预热进程（pytest_worker_pool）中执行的耗时。
+生成一个与链路用例相同导入方式的测试文件，两种方式各执行 --runs 次，输出单次耗时的中位数。
+
+python scripts/benchmark_pytest_pool.py --runs 10
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.other_tools.pytest_worker_pool import PytestWorkerPool  # noqa: E402
+
+TEST_CODE = '''import os, sys, json
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+import requests
+from utils.other_tools.config.model_config import DEFAULT_BASE_Feishu_URL
+from utils.cache_process.redis_control import RedisHandler
+from utils.read_files_tools.regular_control import regular
+
+
+def test_base_url():
+    assert DEFAULT_BASE_Feishu_URL
+
+
+def test_regular():
+    assert regular("${{host()}}") is not None
+
+
+def test_json():
+    assert json.loads(json.dumps({"a": 1})) == {"a": 1}
+'''
+
+
+def timed_runs(runs: int, start) -> list:
+    costs = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        process = start()
+        process.communicate(timeout=300)
+        if process.returncode != 0:
+            raise RuntimeError(f"pytest 执行失败，返回码: {process.returncode}")
+        costs.append(time.perf_counter() - begin)
+    return costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="新 pytest 子进程与预热进程执行耗时对比")
+    parser.add_argument("--runs", type=int, default=10, help="每种方式执行的次数")
+    args = parser.parse_args()
+
+    # 放在项目根目录下，与链路用例的 .chain_out 目录结构一致
+    work_dir = tempfile.mkdtemp(prefix=".pool_bench_", dir=ROOT)
+    test_file = os.path.join(work_dir, "test_pool_bench.py")
+    with open(test_file, "w", encoding="utf-8") as file:
+        file.write(TEST_CODE)
+    cmd = [sys.executable, "-m", "pytest", test_file, "-q", "-p", "no:cacheprovider"]
+    options = dict(cwd=str(ROOT), stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    pool = PytestWorkerPool(size=1)
+    try:
+        cold = timed_runs(args.runs, lambda: subprocess.Popen(cmd, **options))
+        print(f"新 pytest 子进程: 中位数 {statistics.median(cold):.3f} s, 最慢 {max(cold):.3f} s")
+
+        begin = time.perf_counter()
+        pool.start()
+        print(f"预热进程启动: {time.perf_counter() - begin:.3f} s（只在第一次执行前发生）")
+        warm = timed_runs(args.runs, lambda: pool.popen(cmd, **options))
+        print(f"预热进程: 中位数 {statistics.median(warm):.3f} s, 最慢 {max(warm):.3f} s")
+        print(f"单次加速: {statistics.median(cold) / statistics.median(warm):.1f} 倍")
+    finally:
+        pool.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+对比内置报告（fast_report）与 allure 命令行生成报告的耗时。
+先生成指定数量的模拟 allure 原始结果（带步骤和附件），再分别计时；未安装 allure 命令行时只测试内置报告。
+
+python scripts/benchmark_report.py --count 50000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.other_tools.allure_data.fast_report import generate_report  # noqa: E402
+
+
+def make_results(result_dir: str, count: int) -> None:
+    """ 生成模拟的 allure 原始结果，约 10% 失败，每条用例两个步骤、一个附件 """
+    statuses = ["passed"] * 8 + ["failed", "broken"]
+    now = int(time.time() * 1000)
+    for i in range(count):
+        status = statuses[i % len(statuses)]
+        source = f"{uuid.uuid4()}-attachment.json"
+        with open(os.path.join(result_dir, source), "w", encoding="utf-8") as file:
+            file.write(json.dumps({"code": 0, "msg": "success", "data": {"index": i}}))
+        result = {
+            "uuid": str(uuid.uuid4()),
+            "historyId": f"history-{i}",
+            "name": f"test_case_{i}",
+            "fullName": f"test_case.module_{i % 50}.test_api#test_case_{i}",
+            "status": status,
+            "statusDetails": {"message": "AssertionError: 断言失败", "trace": "Traceback ..."}
+            if status != "passed" else {},
+            "start": now + i * 10,
+            "stop": now + i * 10 + 8,
+            "labels": [{"name": "feature", "value": f"模块{i % 50}"}],
+            "parameters": [{"name": "in_data", "value": "{'url': '/open-apis/xxx', 'method': 'POST'}"}],
+            "steps": [
+                {"name": "请求URL: /open-apis/xxx", "status": "passed", "start": now, "stop": now + 3,
+                 "attachments": [], "steps": []},
+                {"name": "响应结果", "status": "passed", "start": now + 3, "stop": now + 8,
+                 "attachments": [{"name": "响应结果", "source": source, "type": "application/json"}], "steps": []},
+            ],
+            "attachments": [],
+        }
+        with open(os.path.join(result_dir, f"{uuid.uuid4()}-result.json"), "w", encoding="utf-8") as file:
+            file.write(json.dumps(result, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="内置报告与 allure generate 耗时对比")
+    parser.add_argument("--count", type=int, default=50000, help="模拟的用例数")
+    parser.add_argument("--keep", action="store_true", help="保留生成的临时目录")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="report_bench_")
+    result_dir = os.path.join(work_dir, "tmp")
+    os.makedirs(result_dir)
+    try:
+        begin = time.perf_counter()
+        make_results(result_dir, args.count)
+        print(f"生成 {args.count} 条模拟结果: {time.perf_counter() - begin:.2f} s")
+
+        begin = time.perf_counter()
+        summary = generate_report(result_dir, os.path.join(work_dir, "fast"))
+        print(f"fast_report: {time.perf_counter() - begin:.2f} s, 统计: {summary['statistic']}")
+
+        allure = shutil.which("allure")
+        if allure is None:
+            print("allure generate: 跳过（未安装 allure 命令行）")
+        else:
+            begin = time.perf_counter()
+            subprocess.run(
+                [allure, "generate", result_dir, "-o", os.path.join(work_dir, "html"), "--clean"],
+                check=False, stdout=subprocess.DEVNULL
+            )
+            print(f"allure generate: {time.perf_counter() - begin:.2f} s")
+    finally:
+        if args.keep:
+            print(f"临时目录: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
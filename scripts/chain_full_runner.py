@@ -7,6 +7,14 @@
 3) 运行 pytest，自动把响应字段写入 Redis
 4) 下一个接口运行前，从 Redis 读取依赖字段作为 external_params 注入
 
+传入 --parallel N 时最多同时处理 N 个接口：每个接口的上游接口全部执行完成（响应已写入 Redis）后立即开始，
+不等待同一拓扑层的其他接口，总耗时取决于依赖链最长的一条
+
+传入 --prefetch K 时按执行顺序提前为后面最多 K 个接口调用大模型，与前面接口的 pytest 执行重叠：
+依赖上游响应的参数先以占位符生成用例，执行前再替换为 Redis 中的实际值
+
+传入 --in-process 时在当前进程中通过 pytest.main 执行生成的用例，不再为每个接口启动新的 Python 解释器
+
 前置：
 - 需准备 relation_*.json 与 openapi_*.yaml
 - 需配置 FEISHU_APP_ID / FEISHU_APP_SECRET / FEISHU_BASE_URL（请求时使用）
@@ -20,15 +28,18 @@ python scripts/chain_full_runner.py \
   --redis-url redis://127.0.0.1:6379/0 \
   --api-key $DASHSCOPE_API_KEY \
   --model deepseek-v3.2 \
-  --tmp-dir .chain_out
+  --tmp-dir .chain_out \
+  --parallel 4
 """
 import argparse
 import json
 import os
-import subprocess
 import sys
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Set, Tuple
 
 from utils.other_tools.config.model_config import (
     DEFAULT_API_KEY,
@@ -48,6 +59,7 @@ from utils.aiMakecase.message_ai_prompt import (  # noqa: E402
     _extract_json,
     _parse_openapi_head_text,
 )
+from utils.other_tools.pytest_worker_pool import popen_pytest  # noqa: E402
 
 
 def load_text(path: Path) -> str:
@@ -57,13 +69,27 @@ def load_text(path: Path) -> str:
         raise RuntimeError(f"读取文件失败: {path} -> {exc}")
 
 
-def build_chain_field_map(source_file: str, relations: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+def chain_fields_key(py_name: str) -> str:
+    """链路执行时用例把下游需要的字段写入的 Redis 哈希，字段名为取值路径，值为 JSON"""
+    return f"chain_fields:{py_name}"
+
+
+def _param_path(rp: Dict[str, Any], source_param: str) -> str:
+    # 支持 relation 中自定义路径，否则默认 data.<source_param>；source_param 本身可以是带点路径
+    path = rp.get("source_param_path")
+    if not path:
+        path = source_param if "." in source_param else f"data.{source_param}"
+    return path
+
+
+def build_chain_field_map(source_file: str, relations: List[Dict[str, Any]]) -> Dict[str, List[str]]:
     """
-    为当前 source_file 生成写入 Redis 的字段映射。
-    key: target_param
-    value: {"path": "data.xxx", "target_param": "<target_param>"}
+    为当前 source_file 生成写入 Redis 的字段映射，通过环境变量 CHAIN_FIELD_MAP 传给用例，
+    用例只把其中的字段写入 chain_fields_key 对应的哈希。
+    key: 取值路径（如 data.xxx），不同下游使用同名参数时路径不会互相覆盖
+    value: 使用该路径的 target_param 列表
     """
-    fmap: Dict[str, Dict[str, str]] = {}
+    fmap: Dict[str, List[str]] = {}
     for pair in relations:
         if pair.get("source_openapi_file") != source_file:
             continue
@@ -72,12 +98,10 @@ def build_chain_field_map(source_file: str, relations: List[Dict[str, Any]]) ->
             source_param = rp.get("source_param") or target_param
             if not target_param or not source_param:
                 continue
-            # 默认从 data.<source_param> 取值，若模型响应结构不同，可在 relation 中改为带点路径
-            if "." in source_param:
-                path = source_param  # 已包含路径
-            else:
-                path = f"data.{source_param}"
-            fmap[target_param] = {"path": path, "target_param": target_param}
+            # 路径与 fetch_external_params 读取时一致
+            params = fmap.setdefault(_param_path(rp, source_param), [])
+            if target_param not in params:
+                params.append(target_param)
     return fmap
 
 
@@ -112,65 +136,259 @@ def _decode(val: Any) -> Any:
 def fetch_external_params(redis_client, target_file: str, rel_map: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
     """
     针对 target_file，读取它依赖的参数，返回 external_params。
-    当前存储：key 为 pytest 文件名（例如 test_chain_x.py），value 为接口响应 JSON 字符串。
-    为兼容旧配置，依旧尝试多种 key 形式。
+    链路执行时上游用例只把下游需要的字段写入哈希 chain_fields:<pytest 文件名>；
+    哈希中没有所需路径时兼容旧的存储：key 为 pytest 文件名（例如 test_chain_x.py）等多种形式，value 为接口响应 JSON 字符串。
+    所有上游的哈希和候选 key 通过一次 pipeline 读取，每个上游的完整响应只解析一次。
     """
     external: Dict[str, Any] = {}
     if not redis_client:
         return external
 
-    pairs = rel_map.get(target_file, [])
-    for pair in pairs:
-        src = pair.get("source_openapi_file")
-        if not src:
-            continue
+    pairs = [pair for pair in rel_map.get(target_file, []) if pair.get("source_openapi_file")]
+    if not pairs:
+        return external
+
+    sources = list(dict.fromkeys(pair["source_openapi_file"] for pair in pairs))
+    candidates = {}
+    for src in sources:
         stem = Path(src).stem
-        candidate_keys = [
+        candidates[src] = [
             f"test_chain_{stem}.py",
             f"{stem}.py",
             src,
         ]
-        raw_val = None
-        for k in candidate_keys:
-            raw_val = redis_client.get(k)
-            if raw_val is not None:
-                break
+    all_keys = [k for src in sources for k in candidates[src]]
+
+    pipe = redis_client.pipeline(transaction=False)
+    for src in sources:
+        pipe.hgetall(chain_fields_key(candidates[src][0]))
+    pipe.mget(all_keys)
+    *hashes, raw_values = pipe.execute()
+
+    fields_by_src = {
+        src: {_decode(k): _decode(v) for k, v in (fields or {}).items()}
+        for src, fields in zip(sources, hashes)
+    }
+    raw_by_key = dict(zip(all_keys, raw_values))
+
+    responses: Dict[str, Any] = {}
+
+    def load_response(src: str) -> Any:
+        """字段哈希中没有所需路径时读取完整响应，同一个上游只解析一次，失败返回 None"""
+        if src in responses:
+            return responses[src]
+        responses[src] = None
+        raw_val = next((raw_by_key[k] for k in candidates[src] if raw_by_key[k] is not None), None)
         if raw_val is None:
-            print(f"[WARN] 未找到依赖响应，Redis keys 尝试: {candidate_keys}")
-            continue
-
+            print(f"[WARN] 未找到依赖响应，Redis keys 尝试: {candidates[src]}")
+            return None
         raw_val = _decode(raw_val)
         try:
-            resp_json = json.loads(raw_val)
+            responses[src] = json.loads(raw_val)
         except Exception:
-            print(f"[WARN] Redis 响应不可解析为 JSON，key候选={candidate_keys}, 片段={str(raw_val)[:200]}")
-            continue
+            print(f"[WARN] Redis 响应不可解析为 JSON，key候选={candidates[src]}, 片段={str(raw_val)[:200]}")
+        return responses[src]
 
+    for pair in pairs:
+        src = pair["source_openapi_file"]
+        fields = fields_by_src[src]
         for rp in pair.get("relation_params", []):
             target_param = rp.get("target_param") or rp.get("source_param")
             source_param = rp.get("source_param") or target_param
             if not target_param or not source_param:
                 continue
-            # 支持 relation 中自定义路径，否则默认 data.<source_param>
-            path = rp.get("source_param_path")
-            if not path:
-                path = source_param if "." in source_param else f"data.{source_param}"
-            val = _get_by_path(resp_json, path)
+            path = _param_path(rp, source_param)
+            if path in fields:
+                val = json.loads(fields[path])
+            else:
+                resp_json = load_response(src)
+                if resp_json is None:
+                    break
+                val = _get_by_path(resp_json, path)
             if val is None:
-                print(f"[WARN] 依赖字段缺失 path={path} key候选={candidate_keys}")
+                print(f"[WARN] 依赖字段缺失 path={path} key候选={candidates[src]}")
                 continue
             external[target_param] = val
     return external
 
 
+def chain_placeholders(target_file: str, rel_map: Dict[str, List[Dict[str, Any]]]) -> Dict[str, str]:
+    """target_file 依赖上游响应的参数 -> 预生成用例时使用的占位符"""
+    placeholders: Dict[str, str] = {}
+    for pair in rel_map.get(target_file, []):
+        for rp in pair.get("relation_params", []):
+            target_param = rp.get("target_param") or rp.get("source_param")
+            if target_param:
+                placeholders[target_param] = f"__CHAIN_{target_param}__"
+    return placeholders
+
+
+def fill_placeholders(obj: Any, values: Dict[str, Any]) -> Any:
+    """把用例中的占位符替换为实际值，整个字符串就是占位符时保留实际值的类型"""
+    if isinstance(obj, dict):
+        return {k: fill_placeholders(v, values) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [fill_placeholders(v, values) for v in obj]
+    if isinstance(obj, str):
+        if obj in values:
+            return values[obj]
+        for placeholder, val in values.items():
+            if placeholder in obj:
+                obj = obj.replace(placeholder, str(val))
+    return obj
+
+
+class CasePrefetcher:
+    """
+    提前调用大模型生成用例：按执行顺序最多提前 window 个接口，大模型的等待时间与前面接口的 pytest 执行重叠。
+    take(fname) 取出结果后再开始下一个接口的生成
+    """
+
+    def __init__(self, order: List[str], window: int, generate: Callable[[str], Any]):
+        self._queue = deque(order)
+        self._window = window
+        self._generate = generate
+        self._futures: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(window, thread_name_prefix="prefetch")
+        with self._lock:
+            self._fill()
+
+    def _fill(self) -> None:
+        while self._queue and len(self._futures) < self._window:
+            fname = self._queue.popleft()
+            self._futures[fname] = self._executor.submit(self._generate, fname)
+
+    def take(self, fname: str) -> Any:
+        with self._lock:
+            future = self._futures.pop(fname, None)
+            if future is None and fname in self._queue:
+                # 并发模式下执行顺序可能与预生成顺序不同，尚未开始的直接在当前线程生成
+                self._queue.remove(fname)
+            self._fill()
+        return future.result() if future is not None else self._generate(fname)
+
+    def close(self) -> None:
+        with self._lock:
+            self._queue.clear()
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+        self._executor.shutdown()
+
+
 def run_pytest(py_path: Path, env: Dict[str, str]):
     cmd = [sys.executable, "-m", "pytest", str(py_path)]
     print(f"[RUN] {' '.join(cmd)}")
-    res = subprocess.run(cmd, cwd=ROOT, env=env)
-    if res.returncode != 0:
+    # 开启 PYTEST_WORKER_POOL 时在预热进程中执行，省去每个节点重新导入框架的时间
+    if popen_pytest(cmd, cwd=ROOT, env=env).wait() != 0:
+        raise RuntimeError(f"pytest 失败: {py_path}")
+
+
+_inprocess_lock = threading.Lock()
+
+
+def run_pytest_inprocess(py_path: Path, env: Dict[str, str]):
+    """
+    在当前进程中用 pytest.main 执行，框架只导入一次，生成用例中的 RedisHandler 共用同一个连接池。
+    pytest.main 会修改 sys.modules、sys.path、环境变量等进程级状态，并发时逐个执行；
+    执行后移除本次导入的用例模块，同名文件下次执行时重新导入。
+    其他线程（--parallel、--prefetch）可能同时在读写文件、调用大模型，这里不切换工作目录，
+    通过 --rootdir 指定项目根目录，并关闭输出捕获，避免其他线程的输出被当作用例输出吞掉
+    """
+    import pytest
+
+    print(f"[RUN] pytest.main {py_path}")
+    with _inprocess_lock:
+        saved_path = sys.path[:]
+        saved_env = {k: os.environ.get(k) for k in env if os.environ.get(k) != env[k]}
+        before = set(sys.modules)
+        os.environ.update({k: env[k] for k in saved_env})
+        try:
+            code = pytest.main([
+                str(py_path.resolve()), "--rootdir", str(ROOT), "-p", "no:cacheprovider", "--capture=no"
+            ])
+        finally:
+            case_dir = str(py_path.resolve().parent) + os.sep
+            for name in set(sys.modules) - before:
+                module_file = getattr(sys.modules[name], "__file__", None) or ""
+                if os.path.abspath(module_file).startswith(case_dir):
+                    del sys.modules[name]
+            for k, v in saved_env.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+            sys.path[:] = saved_path
+    if code != 0:
         raise RuntimeError(f"pytest 失败: {py_path}")
 
 
+def build_upstream_map(order: List[str], edges: Dict[str, List[str]]) -> Dict[str, Set[str]]:
+    """
+    target_file -> 本次需要先执行完成的上游文件。
+    --only-file 过滤掉的上游不在本次执行范围内，与串行模式一样直接读取 Redis 中已有的响应
+    """
+    selected = set(order)
+    upstream: Dict[str, Set[str]] = {fname: set() for fname in order}
+    for src, tgts in edges.items():
+        if src not in selected:
+            continue
+        for tgt in tgts:
+            if tgt in selected and tgt != src:
+                upstream[tgt].add(src)
+    return upstream
+
+
+def run_parallel(order: List[str], upstream: Dict[str, Set[str]], workers: int,
+                 process: Callable[[str], None]) -> None:
+    """
+    按依赖关系并发执行 process(fname)，最多同时执行 workers 个。
+    某个文件的上游全部完成后立即提交，可执行的文件多于 workers 时优先执行下游依赖链最长的；
+    任一文件失败后不再提交新的文件，等待已提交的执行结束后抛出异常
+    """
+    pending = {fname: set(deps) for fname, deps in upstream.items()}
+    downstream: Dict[str, List[str]] = defaultdict(list)
+    for fname in order:
+        for src in upstream[fname]:
+            downstream[src].append(fname)
+    # 从当前文件开始最长依赖链的长度
+    depth: Dict[str, int] = {}
+    for fname in reversed(order):
+        depth[fname] = 1 + max((depth[tgt] for tgt in downstream[fname]), default=0)
+
+    ready = [fname for fname in order if not pending[fname]]
+    running = {}
+    failed = []
+    with ThreadPoolExecutor(workers, thread_name_prefix="chain") as executor:
+        while ready or running:
+            while ready and not failed and len(running) < workers:
+                fname = max(ready, key=depth.__getitem__)
+                ready.remove(fname)
+                running[executor.submit(process, fname)] = fname
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                fname = running.pop(future)
+                exc = future.exception()
+                if exc is not None:
+                    print(f"[FAIL] {fname}: {exc}")
+                    failed.append(fname)
+                    continue
+                print(f"[DONE] {fname}")
+                for tgt in downstream[fname]:
+                    pending[tgt].discard(fname)
+                    if not pending[tgt]:
+                        ready.append(tgt)
+
+    if failed:
+        skipped = ready + [fname for fname in order if pending[fname]]
+        if skipped:
+            print(f"[WARN] 因失败未执行: {', '.join(skipped)}")
+        raise RuntimeError(f"链路执行失败: {', '.join(failed)}")
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--api-dir", required=True, help="openapi_*.yaml 所在目录")
@@ -183,6 +401,12 @@ def main():
     parser.add_argument("--stream", action="store_true", help="是否流式输出模型（默认关闭以便解析 JSON）")
     parser.add_argument("--only-file", help="只处理特定 openapi 文件，逗号分隔文件名，如 openapi_x.yaml,openapi_y.yaml")
     parser.add_argument("--skip-pytest", action="store_true", help="仅生成用例，不执行 pytest（用于调试生成逻辑）")
+    parser.add_argument("--parallel", type=int, default=1,
+                        help="最多同时处理的接口数，上游完成后下游立即开始，默认 1 即串行")
+    parser.add_argument("--prefetch", type=int, default=0,
+                        help="提前调用大模型生成用例的接口数，依赖参数先用占位符，执行前替换为上游实际值，默认 0 不预生成")
+    parser.add_argument("--in-process", action="store_true",
+                        help="在当前进程中通过 pytest.main 执行用例，不再为每个接口启动新的解释器")
     args = parser.parse_args()
 
     # 兜底从环境变量再尝试一次，避免默认值在调用时为空
@@ -201,9 +425,10 @@ def main():
     if not args.redis_url:
         args.redis_url = os.getenv("REDIS_URL")
 
-    api_dir = Path(args.api_dir)
-    rel_dir = Path(args.relation_dir)
-    tmp_dir = Path(args.tmp_dir)
+    # 统一转换为绝对路径，与执行用例时的工作目录无关
+    api_dir = Path(args.api_dir).resolve()
+    rel_dir = Path(args.relation_dir).resolve()
+    tmp_dir = Path(args.tmp_dir).resolve()
     tmp_dir.mkdir(parents=True, exist_ok=True)
 
     nodes, edges, rel_map = build_graph(rel_dir, api_dir)
@@ -232,11 +457,48 @@ def main():
         except Exception as exc:
             raise SystemExit(f"连接 Redis 失败: {exc}")
 
-    for fname in order:
+    def generate(openapi_path: Path, external_params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # 调用模型生成用例
+        resp = generate_case_with_llm(
+            openapi_path=str(openapi_path),
+            api_key=args.api_key,
+            model=args.model,
+            base_url=args.base_url,
+            stream=args.stream,
+            external_params=external_params or None,
+        )
+
+        cases_json = _extract_json(resp)
+        if not cases_json:
+            raise RuntimeError(f"模型返回无法解析为 JSON: {openapi_path.name}")
+        return cases_json if isinstance(cases_json, list) else [cases_json]
+
+    def prefetch(fname: str) -> Optional[Tuple[Dict[str, str], List[Dict[str, Any]]]]:
+        openapi_path = api_dir / fname
+        if not openapi_path.exists():
+            return None
+        # 未配置 Redis 时串行模式也不做依赖注入，不需要占位符
+        placeholders = chain_placeholders(fname, rel_map) if redis_client else {}
+        return placeholders, generate(openapi_path, placeholders)
+
+    def resolve_prefetched(prefetched, external_params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """替换预生成用例中的占位符，占位符缺少上游值或被模型改写时返回 None，改为按实际值重新生成"""
+        placeholders, cases = prefetched
+        text = json.dumps(cases, ensure_ascii=False)
+        missing = [name for name, ph in placeholders.items() if name not in external_params or ph not in text]
+        if missing:
+            print(f"[WARN] 预生成用例的依赖参数无法替换，重新生成: {missing}")
+            return None
+        return fill_placeholders(cases, {ph: external_params[name] for name, ph in placeholders.items()})
+
+    prefetcher = CasePrefetcher(order, args.prefetch, prefetch) if args.prefetch > 0 else None
+
+    def process(fname: str) -> None:
+        prefetched = prefetcher.take(fname) if prefetcher else None
         openapi_path = api_dir / fname
         if not openapi_path.exists():
             print(f"[WARN] 找不到 OpenAPI 文件，跳过: {openapi_path}")
-            continue
+            return
 
         print(f"\n=== 处理 {fname} ===")
         print(f"openapi_path: {openapi_path}")
@@ -250,20 +512,9 @@ def main():
         if external_params:
             print(f"[INFO] external_params: {external_params}")
 
-        # 调用模型生成用例
-        resp = generate_case_with_llm(
-            openapi_path=str(openapi_path),
-            api_key=args.api_key,
-            model=args.model,
-            base_url=args.base_url,
-            stream=args.stream,
-            external_params=external_params or None,
-        )
-
-        cases_json = _extract_json(resp)
-        if not cases_json:
-            raise RuntimeError(f"模型返回无法解析为 JSON: {fname}")
-        cases = cases_json if isinstance(cases_json, list) else [cases_json]
+        cases = resolve_prefetched(prefetched, external_params) if prefetched else None
+        if cases is None:
+            cases = generate(openapi_path, external_params)
 
         api_info = _parse_openapi_head_text(openapi_text)
         out_py = tmp_dir / f"test_chain_{openapi_path.stem}.py"
@@ -282,9 +533,21 @@ def main():
         generate_pytest_from_cases(cases, api_info, out_py)
         if args.skip_pytest:
             print(f"[SKIP] 已生成 pytest 文件，调试模式跳过执行: {out_py}")
+        elif args.in_process:
+            run_pytest_inprocess(out_py, env)
         else:
             run_pytest(out_py, env)
 
+    try:
+        if args.parallel > 1:
+            run_parallel(order, build_upstream_map(order, edges), args.parallel, process)
+        else:
+            for fname in order:
+                process(fname)
+    finally:
+        if prefetcher:
+            prefetcher.close()
+
     print("\n[OK] 链路执行完成")
 
 
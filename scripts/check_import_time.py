@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+api_server 冷启动耗时检查。
+在新的 Python 进程中以 -X importtime 导入 api_server，并请求健康检查和列表接口，
+统计从导入到接口返回的耗时，超过 --budget 或冷启动时加载了 openai、LangChain 等依赖时返回非 0。
+
+python scripts/check_import_time.py --budget 1.0
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 冷启动时不应加载的模块，这些依赖只在调用大模型的接口中使用
+HEAVY_MODULES = ("openai", "langchain_core", "langchain_openai", "langchain")
+
+DEFAULT_PATHS = ("/api/health", "/api/docs/all-documents", "/api/docs/openapi-list", "/api/test-results")
+
+RESULT_MARK = "IMPORT_CHECK_RESULT="
+
+CHILD_CODE = '''
+import json, sys, time
+begin = time.perf_counter()
+from api_server import app
+imported = time.perf_counter() - begin
+client = app.test_client()
+statuses = {path: client.get(path).status_code for path in %(paths)r}
+ready = time.perf_counter() - begin
+print(%(mark)r + json.dumps({
+    "import": imported,
+    "ready": ready,
+    "statuses": statuses,
+    "heavy": [name for name in %(heavy)r if name in sys.modules],
+}))
+'''
+
+
+def parse_importtime(stderr: str, depth: int = 1) -> list:
+    """解析 -X importtime 输出，返回 [(累计耗时 us, 模块名)]，depth 为模块的导入层级"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2 + 1
+        if level <= depth:
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="api_server 冷启动耗时检查")
+    parser.add_argument("--budget", type=float, default=1.0, help="导入并返回首批接口的耗时上限（秒）")
+    parser.add_argument("--top", type=int, default=15, help="输出导入最慢的模块数")
+    args = parser.parse_args()
+
+    code = CHILD_CODE % {"paths": DEFAULT_PATHS, "mark": RESULT_MARK, "heavy": HEAVY_MODULES}
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(ROOT), capture_output=True, text=True, encoding="utf-8", errors="replace"
+    )
+    marks = [line for line in process.stdout.splitlines() if line.startswith(RESULT_MARK)]
+    if process.returncode != 0 or not marks:
+        print(process.stderr[-3000:])
+        print(f"导入 api_server 失败，返回码: {process.returncode}")
+        sys.exit(1)
+    result = json.loads(marks[-1][len(RESULT_MARK):])
+
+    print(f"导入最慢的 {args.top} 个模块（累计耗时）:")
+    for cumulative, name in parse_importtime(process.stderr, depth=2)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    print(f"导入 api_server: {result['import']:.3f} s")
+    for path, status in result["statuses"].items():
+        print(f"  GET {path} -> {status}")
+    print(f"接口可用: {result['ready']:.3f} s（上限 {args.budget:.3f} s）")
+
+    failed = False
+    if result["ready"] > args.budget:
+        print(f"冷启动耗时超过上限 {args.budget:.3f} s")
+        failed = True
+    if result["heavy"]:
+        print(f"冷启动时加载了 {', '.join(result['heavy'])}，应改为第一次使用时导入（utils.other_tools.lazy_import）")
+        failed = True
+    bad = {path: status for path, status in result["statuses"].items() if status >= 500}
+    if bad:
+        print(f"接口返回错误: {bad}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
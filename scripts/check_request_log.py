@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+校验请求日志的格式化与解析是否一致：
+RequestLog 输出的日志块（含超过 log_body_max_length 被截断的内容）必须能被 parse_request_logs 还原，
+否则平台从 stdout 兜底解析请求/响应时会丢失用例。
+运行方式：python scripts/check_request_log.py
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils import config  # noqa: E402
+from utils.logging_tool.log_decorator import RequestLog, parse_request_logs  # noqa: E402
+
+
+def _fake_response(detail, response_data):
+    return SimpleNamespace(
+        detail=detail,
+        url="https://open.feishu.cn/open-apis/im/v1/messages",
+        method="POST",
+        headers={"Content-Type": "application/json"},
+        request_body={"receive_id": "ou_xxx", "msg_type": "text"},
+        response_data=response_data,
+        res_time=12.5,
+        status_code=200,
+    )
+
+
+def main():
+    limit = config.log_body_max_length or 10000
+    long_body = {"code": 0, "data": {"items": ["x" * 64] * (limit // 32)}}
+    short_body = {"code": 0, "msg": "success"}
+    log_text = "\n".join([
+        str(RequestLog(_fake_response("超长响应", long_body))),
+        str(RequestLog(_fake_response("普通响应", short_body))),
+    ])
+    assert len(str(long_body)) > limit, "构造的响应体未超过截断长度"
+
+    cases = parse_request_logs(log_text, [{"detail": "普通响应", "case_id": "case_02"}])
+    assert cases is not None and len(cases) == 2, f"应解析出 2 个用例，实际: {cases and len(cases)}"
+
+    truncated, normal = cases
+    assert truncated["detail"] == "超长响应"
+    assert truncated["request"]["body"] == {"receive_id": "ou_xxx", "msg_type": "text"}
+    # 被截断的内容无法还原为对象，按原文返回
+    assert isinstance(truncated["response"]["body"], str)
+    assert truncated["response"]["body"].endswith("个字符，已截断)")
+    assert truncated["response"]["status_code"] == 200
+    assert normal["case_id"] == "case_02"
+    assert normal["response"]["body"] == short_body
+    print("请求日志解析校验通过")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,8 +12,13 @@ from utils.requests_tool.request_control import cache_regular
 from utils.logging_tool.log_control import INFO, ERROR, WARNING
 from utils.other_tools.models import TestCase
 from utils.read_files_tools.clean_files import del_file
-from utils.other_tools.allure_data.allure_tools import allure_step, allure_step_no
+from utils.other_tools.allure_data.allure_tools import (
+    allure_step, allure_step_no, start_allure_buffer, flush_allure_buffer,
+    install_attachment_writer, drain_attachment_writer
+)
 from utils.cache_process.cache_control import CacheHandler
+from utils.requests_tool.teardown_queue import TEARDOWN_QUEUE, report_teardown_summary
+from utils.logging_tool.event_sink import EVENT_SINK
 
 
 @pytest.fixture(scope="session", autouse=False)
@@ -22,6 +27,13 @@ def clear_report():
     del_file(ensure_path_sep("\\report"))
 
 
+@pytest.fixture(scope="session", autouse=True)
+def deferred_teardown():
+    """测试会话结束时，等待延迟后置处理全部完成"""
+    yield
+    TEARDOWN_QUEUE.shutdown()
+
+
 @pytest.fixture(scope="session", autouse=True)
 def work_login_init():
     """
@@ -84,9 +96,41 @@ def pytest_collection_modifyitems(items):
             items[items_index], items[run_index] = items[run_index], items[items_index]
 
 
+def pytest_runtest_setup(item):
+    """用例开始执行，结构化日志、allure 步骤暂存该用例的请求"""
+    start_allure_buffer()
+    if EVENT_SINK is not None:
+        EVENT_SINK.begin_case(item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """用例执行完成，将断言结果写入结构化日志，失败的用例写入暂存的 allure 步骤"""
+    outcome = yield
+    report = outcome.get_result()
+    # 前置失败或跳过时不会进入 call 阶段
+    if report.when == "call" or (report.when == "setup" and not report.passed):
+        flush_allure_buffer(report.failed)
+        if EVENT_SINK is None:
+            return
+        error = None
+        if report.failed:
+            reprcrash = getattr(report.longrepr, "reprcrash", None)
+            error = reprcrash.message if reprcrash is not None else str(report.longrepr)[-1000:]
+        EVENT_SINK.finish_case(report.outcome, error)
+
+
+@pytest.hookimpl(trylast=True)
 def pytest_configure(config):
     config.addinivalue_line("markers", 'smoke')
     config.addinivalue_line("markers", '回归测试')
+    # allure-pytest 初始化之后，附件改为后台写入
+    install_attachment_writer(config)
+
+
+def pytest_sessionfinish(session):
+    """等待 allure 附件全部写入，之后才能生成报告"""
+    drain_attachment_writer()
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -121,6 +165,8 @@ def pytest_terminal_summary(terminalreporter):
     WARNING.logger.warning(f"跳过用例数: {_SKIPPED}")
     INFO.logger.info("用例执行时长: %.2f" % _TIMES + " s")
 
+    report_teardown_summary()
+
     try:
         _RATE = _PASSED / _TOTAL * 100
         INFO.logger.info("用例成功率: %.2f" % _RATE + " %")
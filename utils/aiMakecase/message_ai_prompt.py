@@ -260,6 +260,42 @@ def generate_pytest_from_cases(cases: List[Dict[str, Any]], api_info: Dict[str,
     lines.append("        except Exception as e:")
     lines.append("            print(f\"[WARN] 写入日志文件失败: {e}\")")
     lines.append("")
+    lines.append("# 链路执行时下游需要的字段（path 为响应中的点路径），由 chain_full_runner 通过环境变量传入")
+    lines.append("CHAIN_FIELD_MAP = json.loads(os.getenv('CHAIN_FIELD_MAP') or '{}')")
+    lines.append("")
+    lines.append("def _get_by_path(obj, path):")
+    lines.append("    for part in path.split('.'):")
+    lines.append("        if isinstance(obj, dict):")
+    lines.append("            obj = obj.get(part)")
+    lines.append("        elif isinstance(obj, list) and part.isdigit() and int(part) < len(obj):")
+    lines.append("            obj = obj[int(part)]")
+    lines.append("        else:")
+    lines.append("            return None")
+    lines.append("    return obj")
+    lines.append("")
+    lines.append("def _save_response(resp, data):")
+    lines.append("    \"\"\"响应写入 Redis：链路执行时只把下游需要的字段写入哈希 chain_fields:<文件名>，否则写入完整响应\"\"\"")
+    lines.append("    name = Path(__file__).name")
+    lines.append("    if not CHAIN_FIELD_MAP:")
+    lines.append("        redis_handler.set_string(name, resp.text)")
+    lines.append("        return")
+    lines.append("    fields = {}")
+    lines.append("    for path in CHAIN_FIELD_MAP:")
+    lines.append("        value = _get_by_path(data, path)")
+    lines.append("        if value is not None:")
+    lines.append("            fields[path] = json.dumps(value, ensure_ascii=False)")
+    lines.append("    pipe = redis_handler.redis.pipeline()")
+    lines.append("    # 清理上次执行的字段，避免下游读到旧值")
+    lines.append("    pipe.delete(f'chain_fields:{name}')")
+    lines.append("    if len(fields) == len(CHAIN_FIELD_MAP):")
+    lines.append("        pipe.delete(name)")
+    lines.append("    else:")
+    lines.append("        # 有路径未取到值时保留完整响应，下游按路径兜底读取")
+    lines.append("        pipe.set(name, resp.text)")
+    lines.append("    if fields:")
+    lines.append("        pipe.hset(f'chain_fields:{name}', mapping=fields)")
+    lines.append("    pipe.execute()")
+    lines.append("")
     # 外部传入的参数值（如果传入则优先使用，否则从环境变量获取）
     if external_params:
         lines.append("# 外部传入的参数值（优先使用）")
@@ -557,7 +593,7 @@ def generate_pytest_from_cases(cases: List[Dict[str, Any]], api_info: Dict[str,
         lines.append("        assert data.get('msg') == expected_resp['msg'], f\"msg期望{expected_resp['msg']} 实际{data.get('msg')}\"")
         lines.append("    # 将响应内容写入 Redis，key 为当前用例文件名")
         lines.append("    try:")
-        lines.append("        redis_handler.set_string(Path(__file__).name, resp.text)")
+        lines.append("        _save_response(resp, data)")
         lines.append("    except Exception as e:")
         lines.append("        print(f\"[WARN] 写入 Redis 失败: {e}\")")
         lines.append("    # 记录结构化日志，供接口直接返回，不依赖 stdout 解析")
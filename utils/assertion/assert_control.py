@@ -6,17 +6,9 @@
 断言类型封装，支持json响应断言、数据库断言
 """
 import ast
-import json
-from typing import Text, Dict, Any, Union
-from jsonpath import jsonpath
-from utils.other_tools.models import AssertMethod
-from utils.logging_tool.log_control import ERROR, WARNING
+from typing import Text, Dict, Union
 from utils.read_files_tools.regular_control import cache_regular
-from utils.other_tools.models import load_module_functions
-from utils.assertion import assert_type
-from utils.other_tools.exceptions import JsonpathExtractionFailed, SqlNotFound, AssertTypeError
-from utils.other_tools.feishu_error_codes import check_feishu_error
-from utils import config
+from utils.assertion.assert_plan import AssertPlan, FUNCTIONS_MAPPING
 
 
 class Assert:
@@ -24,7 +16,7 @@ class Assert:
 
     def __init__(self, assert_data: Dict):
         self.assert_data = ast.literal_eval(cache_regular(str(assert_data)))
-        self.functions_mapping = load_module_functions(assert_type)
+        self.functions_mapping = FUNCTIONS_MAPPING
 
     @staticmethod
     def _check_params(
@@ -45,163 +37,29 @@ class Assert:
                 )
         return True
 
-    @staticmethod
-    def res_sql_data_bytes(res_sql_data: Any) -> Text:
-        """ 处理 mysql查询出来的数据类型如果是bytes类型，转换成str类型 """
-        if isinstance(res_sql_data, bytes):
-            res_sql_data = res_sql_data.decode('utf=8')
-        return res_sql_data
-
-    def sql_switch_handle(
-            self,
-            sql_data: Dict,
-            assert_value: Any,
-            key: Text,
-            values: Any,
-            resp_data: Dict,
-            message: Text) -> None:
-        """
-
-        :param sql_data: 测试用例中的sql
-        :param assert_value: 断言内容
-        :param key:
-        :param values:
-        :param resp_data: 预期结果
-        :param message: 预期结果
-        :return:
-        """
-        # 判断数据库为开关为关闭状态
-        if config.mysql_db.switch is False:
-            WARNING.logger.warning(
-                "检测到数据库状态为关闭状态，程序已为您跳过此断言，断言值:%s", values
-            )
-        # 数据库开关为开启
-        if config.mysql_db.switch:
-            # 走正常SQL断言逻辑
-            if sql_data != {'sql': None}:
-                res_sql_data = jsonpath(sql_data, assert_value)
-                if res_sql_data is False:
-                    raise JsonpathExtractionFailed(
-                        f"数据库断言内容jsonpath提取失败， 当前jsonpath内容: {assert_value}\n"
-                        f"数据库返回内容: {sql_data}"
-                    )
-
-                # 判断mysql查询出来的数据类型如果是bytes类型，转换成str类型
-                res_sql_data = self.res_sql_data_bytes(res_sql_data[0])
-                name = AssertMethod(self.assert_data[key]['type']).name
-                self.functions_mapping[name](resp_data[0], res_sql_data, str(message))
-
-            # 判断当用例走的数据数据库断言，但是用例中未填写SQL
-            else:
-                raise SqlNotFound("请在用例中添加您要查询的SQL语句。")
-
-    def assert_type_handle(
-            self,
-            assert_types: Union[Text, None],
-            sql_data: Union[Dict, None],
-            assert_value: Any,
-            key: Text,
-            values: Dict,
-            resp_data: Any,
-            message: Text
-    ) -> None:
-        """处理断言类型"""
-        # 判断断言类型
-        if assert_types == 'SQL':
-            self.sql_switch_handle(
-                sql_data=sql_data,
-                assert_value=assert_value,
-                key=key,
-                values=values,
-                resp_data=resp_data,
-                message=message
-            )
-
-        # 判断assertType为空的情况下，则走响应断言
-        elif assert_types is None:
-            name = AssertMethod(self.assert_data[key]['type']).name
-            self.functions_mapping[name](resp_data[0], assert_value, message)
-        else:
-            raise AssertTypeError("断言失败，目前只支持数据库断言和响应断言")
-
-    @classmethod
-    def _message(cls, value):
-        _message = ""
-        if jsonpath(obj=value, expr="$.message") is not False:
-            _message = value['message']
-        return _message
+    @property
+    def plan(self) -> "AssertPlan":
+        """ 当前用例编译后的断言计划 """
+        return AssertPlan.compile(self.assert_data)
 
     def assert_equality(
             self,
             response_data: Text,
             sql_data: Dict,
-            status_code: int) -> None:
-        """  assert 断言处理 """
+            status_code: int,
+            fail_fast: bool = False) -> None:
+        """
+        assert 断言处理，执行全部断言后统一汇报失败
+        :param fail_fast: 为 True 时遇到第一个失败立即抛出
+        """
         # 判断数据类型
         if self._check_params(response_data, sql_data) is not False:
-            # 先检查飞书接口是否返回错误码（在断言之前检查，以便给出友好的错误信息）
-            try:
-                response_dict = json.loads(response_data)
-                is_error, error_message = check_feishu_error(response_dict)
-                if is_error:
-                    # 判断是否为"预期错误场景"（例如 YAML 中仅断言 status_code 为 4xx）
-                    expected_status = self.assert_data.get("status_code")
-                    # 如果预期状态码与实际状态码匹配，且都是4xx或5xx，则认为是预期错误
-                    if expected_status is not None and expected_status == status_code and status_code >= 400:
-                        # 负向用例：如果断言中指定了预期飞书错误码，则进行一一对应校验
-                        expected_feishu_code = self.assert_data.get("feishu_code")
-                        if expected_feishu_code is not None:
-                            actual_code = response_dict.get("code")
-                            if actual_code != expected_feishu_code:
-                                ERROR.logger.error(
-                                    "飞书接口错误码与预期不符，预期: %s, 实际: %s",
-                                    expected_feishu_code,
-                                    actual_code,
-                                )
-                                raise AssertionError(
-                                    f"飞书接口错误码断言失败，预期 {expected_feishu_code}，实际 {actual_code}"
-                                )
-                        # 记录为预期错误，但不中断后续 status_code 及其它断言
-                        WARNING.logger.warning("飞书接口返回预期错误:\n%s", error_message)
-                    elif expected_status is not None and expected_status == status_code:
-                        # 即使状态码匹配但不是4xx/5xx，也允许继续（例如某些2xx错误场景）
-                        WARNING.logger.warning("飞书接口返回错误但状态码匹配预期:\n%s", error_message)
-                    else:
-                        # 非预期错误：仍按原逻辑视为失败
-                        ERROR.logger.error("飞书接口返回错误:\n%s", error_message)
-                        raise AssertionError(f"飞书接口调用失败:\n{error_message}")
-            except (json.JSONDecodeError, TypeError):
-                # 如果响应不是有效的 JSON，跳过错误码检查，继续正常断言流程
-                pass
-            
-            for key, values in self.assert_data.items():
-                if key == "status_code":
-                    assert status_code == values
-                elif key == "feishu_code":
-                    # feishu_code 已在上面的错误检查中断言过，这里直接跳过，避免走通用 JSONPath 逻辑
-                    continue
-                else:
-                    assert_value = self.assert_data[key]['value']  # 获取 yaml 文件中的期望value值
-                    assert_jsonpath = self.assert_data[key]['jsonpath']  # 获取到 yaml断言中的jsonpath的数据
-                    assert_types = self.assert_data[key]['AssertType']
-                    # 从yaml获取jsonpath，拿到对象的接口响应数据
-                    resp_data = jsonpath(json.loads(response_data), assert_jsonpath)
-                    message = self._message(value=values)
-                    # jsonpath 如果数据获取失败，会返回False，判断获取成功才会执行如下代码
-                    if resp_data is not False:
-                        # 判断断言类型
-                        self.assert_type_handle(
-                            assert_types=assert_types,
-                            sql_data=sql_data,
-                            assert_value=assert_value,
-                            key=key,
-                            values=values,
-                            resp_data=resp_data,
-                            message=message
-                        )
-                    else:
-                        ERROR.logger.error("JsonPath值获取失败 %s ", assert_jsonpath)
-                        raise JsonpathExtractionFailed(f"JsonPath值获取失败 {assert_jsonpath}")
+            self.plan.evaluate(
+                response_data=response_data,
+                sql_data=sql_data,
+                status_code=status_code,
+                fail_fast=fail_fast
+            )
 
 
 if __name__ == '__main__':
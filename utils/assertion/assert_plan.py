@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+断言计划（AssertPlan）
+
+将用例中的 assert_data 预先编译成断言计划：
+1) 比较函数在编译期完成绑定，避免每次实例化都重新扫描 assert_type 模块
+2) 响应内容只做一次 json.loads
+3) 简单 jsonpath（$.a.b[0]['c']）合并成前缀树，一次遍历响应即可取出所有值；
+   含过滤、通配、递归等复杂表达式时回退到 jsonpath 库
+4) 执行全部断言后统一汇报失败信息，而不是遇到第一个失败就中断
+"""
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Text, Tuple, Union
+from jsonpath import jsonpath
+from utils.assertion import assert_type
+from utils.other_tools.models import AssertMethod, load_module_functions
+from utils.other_tools.exceptions import (
+    JsonpathExtractionFailed, SqlNotFound, AssertTypeError, AssertionFailures
+)
+from utils.other_tools.feishu_error_codes import check_feishu_error
+from utils.logging_tool.log_control import ERROR, WARNING
+from utils import config
+
+# 断言函数只需要加载一次，所有断言计划共享
+FUNCTIONS_MAPPING = load_module_functions(assert_type)
+
+# 断言计划缓存上限，相同的断言内容直接复用编译结果
+PLAN_CACHE_SIZE = 1024
+
+_SIMPLE_TOKEN = re.compile(r"\.([A-Za-z_一-龥][\w一-龥-]*)|\[(\d+)\]|\[['\"]([^'\"]+)['\"]\]")
+
+
+def parse_simple_jsonpath(expr: Text) -> Union[Tuple, None]:
+    """
+    将简单 jsonpath 解析为路径元组，例：$.data.items[0]['id'] -> ('data', 'items', 0, 'id')
+    不支持的表达式（.. * ?() 切片 等）返回 None，由调用方回退到 jsonpath 库
+    """
+    if not isinstance(expr, str) or not expr.startswith("$"):
+        return None
+    pos, parts = 1, []
+    while pos < len(expr):
+        match = _SIMPLE_TOKEN.match(expr, pos)
+        if match is None:
+            return None
+        name, index, quoted = match.groups()
+        if index is not None:
+            parts.append(int(index))
+        else:
+            parts.append(name if name is not None else quoted)
+        pos = match.end()
+    return tuple(parts)
+
+
+class _PathTrie:
+    """ jsonpath 前缀树，一次遍历提取多个路径的值 """
+
+    def __init__(self):
+        self.children: Dict[Any, "_PathTrie"] = {}
+        self.exprs: List[Text] = []
+
+    def add(self, parts: Tuple, expr: Text) -> None:
+        node = self
+        for part in parts:
+            node = node.children.setdefault(part, _PathTrie())
+        node.exprs.append(expr)
+
+    def extract(self, obj: Any, result: Dict[Text, Any]) -> None:
+        """ 深度优先遍历响应，与 jsonpath 库保持一致：匹配成功返回 [value]，失败返回 False """
+        for expr in self.exprs:
+            result[expr] = [obj]
+        for part, child in self.children.items():
+            if isinstance(part, int):
+                if isinstance(obj, (list, tuple)) and part < len(obj):
+                    child.extract(obj[part], result)
+            elif isinstance(obj, dict) and part in obj:
+                child.extract(obj[part], result)
+
+
+class _Check:
+    """ 单条已编译的断言 """
+    __slots__ = ("key", "jsonpath", "expect", "assert_type", "comparator", "message")
+
+    def __init__(self, key: Text, values: Dict):
+        self.key = key
+        self.jsonpath = values['jsonpath']
+        self.expect = values['value']
+        self.assert_type = values.get('AssertType')
+        if self.assert_type not in (None, 'SQL'):
+            raise AssertTypeError("断言失败，目前只支持数据库断言和响应断言")
+        self.comparator: Callable = FUNCTIONS_MAPPING[AssertMethod(values['type']).name]
+        self.message = str(values.get('message', ""))
+
+
+class AssertPlan:
+    """ 编译后的断言计划，一次解析响应、一次遍历取值、一次性汇报所有失败 """
+
+    def __init__(self, assert_data: Dict):
+        self.status_code = assert_data.get("status_code")
+        self.feishu_code = assert_data.get("feishu_code")
+        self.checks: List[_Check] = [
+            _Check(key, values) for key, values in assert_data.items()
+            if key not in ("status_code", "feishu_code")
+        ]
+        self._trie = _PathTrie()
+        self._trie_exprs: List[Text] = []
+        self._fallback: List[Text] = []
+        # 相同的 jsonpath 只提取一次
+        for expr in dict.fromkeys(i.jsonpath for i in self.checks):
+            parts = parse_simple_jsonpath(expr)
+            if parts is None:
+                self._fallback.append(expr)
+            else:
+                self._trie.add(parts, expr)
+                self._trie_exprs.append(expr)
+
+    @classmethod
+    def compile(cls, assert_data: Dict) -> "AssertPlan":
+        """ 编译断言计划，相同内容的断言命中缓存 """
+        return _compile_cached(repr(assert_data), assert_data)
+
+    def extract(self, response: Any) -> Dict[Text, Any]:
+        """ 提取断言中所有 jsonpath 对应的值 """
+        result = dict.fromkeys(self._trie_exprs, False)
+        self._trie.extract(response, result)
+        for expr in self._fallback:
+            result[expr] = jsonpath(response, expr)
+        return result
+
+    def _check_feishu_error(self, response_dict: Any, status_code: int) -> None:
+        """ 飞书接口错误码检查，在断言之前执行，以便给出友好的错误信息 """
+        is_error, error_message = check_feishu_error(response_dict)
+        if not is_error:
+            return
+        expected_status = self.status_code
+        # 如果预期状态码与实际状态码匹配，且都是4xx或5xx，则认为是预期错误
+        if expected_status is not None and expected_status == status_code and status_code >= 400:
+            # 负向用例：如果断言中指定了预期飞书错误码，则进行一一对应校验
+            if self.feishu_code is not None:
+                actual_code = response_dict.get("code")
+                if actual_code != self.feishu_code:
+                    ERROR.logger.error(
+                        "飞书接口错误码与预期不符，预期: %s, 实际: %s", self.feishu_code, actual_code
+                    )
+                    raise AssertionError(
+                        f"飞书接口错误码断言失败，预期 {self.feishu_code}，实际 {actual_code}"
+                    )
+            # 记录为预期错误，但不中断后续 status_code 及其它断言
+            WARNING.logger.warning("飞书接口返回预期错误:\n%s", error_message)
+        elif expected_status is not None and expected_status == status_code:
+            # 即使状态码匹配但不是4xx/5xx，也允许继续（例如某些2xx错误场景）
+            WARNING.logger.warning("飞书接口返回错误但状态码匹配预期:\n%s", error_message)
+        else:
+            ERROR.logger.error("飞书接口返回错误:\n%s", error_message)
+            raise AssertionError(f"飞书接口调用失败:\n{error_message}")
+
+    @staticmethod
+    def _sql_value(check: "_Check", sql_data: Optional[Dict]) -> Any:
+        """ 从数据库查询结果中提取断言预期值 """
+        if sql_data == {'sql': None}:
+            raise SqlNotFound("请在用例中添加您要查询的SQL语句。")
+        res_sql_data = jsonpath(sql_data, check.expect)
+        if res_sql_data is False:
+            raise JsonpathExtractionFailed(
+                f"数据库断言内容jsonpath提取失败， 当前jsonpath内容: {check.expect}\n"
+                f"数据库返回内容: {sql_data}"
+            )
+        # 判断mysql查询出来的数据类型如果是bytes类型，转换成str类型
+        value = res_sql_data[0]
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return value
+
+    def _run_check(self, check: "_Check", values: Dict, sql_data: Optional[Dict]) -> None:
+        resp_data = values[check.jsonpath]
+        # jsonpath 如果数据获取失败，会返回False
+        if resp_data is False:
+            ERROR.logger.error("JsonPath值获取失败 %s ", check.jsonpath)
+            raise JsonpathExtractionFailed(f"JsonPath值获取失败 {check.jsonpath}")
+        if check.assert_type == 'SQL':
+            # 数据库开关为关闭状态时跳过数据库断言
+            if config.mysql_db.switch is False:
+                WARNING.logger.warning(
+                    "检测到数据库状态为关闭状态，程序已为您跳过此断言，断言值:%s", check.expect
+                )
+                return
+            check.comparator(resp_data[0], self._sql_value(check, sql_data), check.message)
+        else:
+            check.comparator(resp_data[0], check.expect, check.message)
+
+    def evaluate(
+            self,
+            response_data: Text,
+            sql_data: Optional[Dict],
+            status_code: int,
+            fail_fast: bool = False) -> None:
+        """
+        执行断言计划
+        :param response_data: 接口响应内容
+        :param sql_data: 数据库查询结果
+        :param status_code: http 状态码
+        :param fail_fast: 为 True 时遇到第一个失败立即抛出
+        """
+        try:
+            response = json.loads(response_data)
+        except (json.JSONDecodeError, TypeError):
+            # 如果响应不是有效的 JSON，跳过错误码检查，jsonpath 断言按提取失败处理
+            response = None
+        if isinstance(response, dict):
+            self._check_feishu_error(response, status_code)
+
+        failures: List[Tuple[Text, BaseException]] = []
+        if self.status_code is not None and status_code != self.status_code:
+            error = AssertionError(f"状态码断言失败，预期 {self.status_code}，实际 {status_code}")
+            if fail_fast:
+                raise error
+            failures.append(("status_code", error))
+
+        values = self.extract(response) if self.checks else {}
+        for check in self.checks:
+            try:
+                self._run_check(check, values, sql_data)
+            except (AssertionError, JsonpathExtractionFailed, SqlNotFound) as error:
+                if fail_fast:
+                    raise
+                failures.append((check.key, error))
+
+        if len(failures) == 1:
+            raise failures[0][1]
+        if failures:
+            raise AssertionFailures(failures)
+
+
+_plan_cache: Dict[Text, AssertPlan] = {}
+
+
+def _compile_cached(key: Text, assert_data: Dict) -> AssertPlan:
+    plan = _plan_cache.get(key)
+    if plan is None:
+        if len(_plan_cache) >= PLAN_CACHE_SIZE:
+            # 缓存满时淘汰最早编译的计划
+            _plan_cache.pop(next(iter(_plan_cache)))
+        plan = _plan_cache[key] = AssertPlan(assert_data)
+    return plan
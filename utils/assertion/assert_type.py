@@ -7,7 +7,8 @@
 Assert 断言类型
 """
 
-from typing import Any,  Union, Text
+from typing import Any,  Union, Text, Dict
+from utils.assertion import schema_validator
 
 
 def equals(
@@ -139,3 +140,25 @@ def endswith(
 ):
     """检查响应内容的结尾是否和预期结果内容相等"""
     assert str(check_value).endswith(str(expect_value)), message
+
+
+def schema(
+        check_value: Any, expect_value: Dict, message: Text = ""
+):
+    """
+    校验响应内容是否符合 OpenAPI 文档中定义的响应结构
+    expect_value: {"spec": 文档路径, "operation": operationId 或 "METHOD /path",
+                   "status": 状态码(默认200), "fail_fast": 是否遇到第一个错误即停止}
+    """
+    assert isinstance(
+        expect_value, dict
+    ), "expect_value 需要为 dict 类型，包含 spec、operation 字段"
+    errors = schema_validator.validate_response(
+        check_value,
+        spec=expect_value['spec'],
+        operation=expect_value['operation'],
+        status=expect_value.get('status', 200),
+        fail_fast=expect_value.get('fail_fast', False)
+    )
+    # 自定义 message 只作为前缀，具体的校验错误始终保留
+    assert not errors, (f"{message}\n" if message else "") + "响应结构校验失败:\n" + "\n".join(errors)
@@ -0,0 +1,391 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+OpenAPI 响应结构校验
+
+根据 OpenAPI 文档中接口的响应定义（responses.<status>.content.application/json.schema）
+校验接口响应内容，供 schema 断言类型使用：
+1) 文档按 (路径, 修改时间) 缓存，同一个会话中只解析一次
+2) 校验器按 (文档, 接口, 状态码) 编译一次后缓存复用
+3) $ref 的解析与编译结果按文档记忆化，支持递归引用
+4) fail_fast 模式下遇到第一个错误立即停止
+
+支持 OpenAPI 3.0 / Swagger 2.0 中常用的 JSON Schema 关键字：
+type、nullable、enum、const、properties、required、additionalProperties、items、
+allOf、anyOf、oneOf、minimum、maximum、exclusiveMinimum、exclusiveMaximum、
+minLength、maxLength、pattern、minItems、maxItems
+"""
+import json
+import os
+import re
+from functools import lru_cache
+from urllib.parse import urlparse
+from typing import Any, Callable, Dict, List, Text, Tuple, Union
+import yaml
+from common.setting import root_path
+from utils.other_tools.exceptions import FileNotFound, ValueNotFoundError
+
+try:
+    _YamlLoader = yaml.CSafeLoader
+except AttributeError:  # 未编译 libyaml 时使用纯 python 版本
+    _YamlLoader = yaml.SafeLoader
+
+HTTP_METHODS = ("get", "post", "put", "delete", "patch", "head", "options")
+
+# 编译后的校验函数签名: (value, path, errors) -> None
+Validator = Callable[[Any, Text, "_Errors"], None]
+
+
+class _FailFast(Exception):
+    """ fail_fast 模式下，出现第一个错误时用于跳出校验 """
+
+
+class _Errors:
+    """ 校验错误收集器 """
+    __slots__ = ("items", "fail_fast")
+
+    def __init__(self, fail_fast: bool = False):
+        self.items: List[Text] = []
+        self.fail_fast = fail_fast
+
+    def add(self, path: Text, message: Text) -> None:
+        self.items.append(f"{path}: {message}")
+        if self.fail_fast:
+            raise _FailFast
+
+
+def _check_type(value: Any, json_type: Text) -> bool:
+    if json_type == "string":
+        return isinstance(value, str)
+    if json_type == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if json_type == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if json_type == "boolean":
+        return isinstance(value, bool)
+    if json_type == "array":
+        return isinstance(value, list)
+    if json_type == "object":
+        return isinstance(value, dict)
+    if json_type == "null":
+        return value is None
+    # 未知类型不做校验
+    return True
+
+
+def _matches(validator: Validator, value: Any, path: Text) -> bool:
+    """ 以 fail_fast 方式判断 value 是否满足子结构，用于 anyOf / oneOf """
+    try:
+        validator(value, path, _Errors(fail_fast=True))
+        return True
+    except _FailFast:
+        return False
+
+
+class SpecResolver:
+    """ 单个 OpenAPI 文档的 $ref 解析器，解析和编译结果均做记忆化 """
+
+    def __init__(self, spec: Dict):
+        self.spec = spec
+        self._compiled_refs: Dict[Text, Validator] = {}
+
+    def resolve(self, ref: Text) -> Any:
+        """ 解析文档内引用，例: #/components/schemas/Message """
+        if not ref.startswith("#/"):
+            raise ValueNotFoundError(f"暂不支持外部文档引用: {ref}")
+        node = self.spec
+        for part in ref[2:].split("/"):
+            part = part.replace("~1", "/").replace("~0", "~")
+            try:
+                node = node[part]
+            except (KeyError, TypeError) as exc:
+                raise ValueNotFoundError(f"OpenAPI 文档中未找到引用: {ref}") from exc
+        return node
+
+    def compile_ref(self, ref: Text) -> Validator:
+        validator = self._compiled_refs.get(ref)
+        if validator is None:
+            # 先放入占位函数，兼容递归引用
+            holder: List[Validator] = []
+            self._compiled_refs[ref] = lambda value, path, errors: holder[0](value, path, errors)
+            holder.append(self.compile(self.resolve(ref)))
+            validator = self._compiled_refs[ref] = holder[0]
+        return validator
+
+    def compile(self, schema: Any) -> Validator:
+        """ 将 schema 编译为校验函数 """
+        if not isinstance(schema, dict) or not schema:
+            return lambda value, path, errors: None
+        if "$ref" in schema:
+            return self.compile_ref(schema["$ref"])
+
+        checks: List[Validator] = []
+        nullable = schema.get("nullable") is True
+
+        json_types = schema.get("type")
+        if json_types is not None:
+            json_types = tuple(json_types) if isinstance(json_types, list) else (json_types,)
+
+            def check_type(value, path, errors, _types=json_types):
+                if not any(_check_type(value, i) for i in _types):
+                    errors.add(path, f"类型应为 {'/'.join(_types)}，实际为 {type(value).__name__}")
+                    return False
+                return True
+            type_check = check_type
+        else:
+            type_check = None
+
+        if "enum" in schema:
+            enum = schema["enum"]
+
+            def check_enum(value, path, errors, _enum=enum):
+                if value not in _enum:
+                    errors.add(path, f"取值 {value!r} 不在枚举范围 {_enum} 中")
+            checks.append(check_enum)
+
+        if "const" in schema:
+            def check_const(value, path, errors, _const=schema["const"]):
+                if value != _const:
+                    errors.add(path, f"取值应为 {_const!r}，实际为 {value!r}")
+            checks.append(check_const)
+
+        checks.extend(self._compile_object(schema))
+        checks.extend(self._compile_array(schema))
+        checks.extend(self._compile_scalar(schema))
+        checks.extend(self._compile_combinators(schema))
+
+        def validate(value, path, errors):
+            if value is None and nullable:
+                return
+            if type_check is not None and not type_check(value, path, errors):
+                return
+            for check in checks:
+                check(value, path, errors)
+        return validate
+
+    def _compile_object(self, schema: Dict) -> List[Validator]:
+        checks: List[Validator] = []
+        properties = {
+            key: self.compile(value) for key, value in (schema.get("properties") or {}).items()
+        }
+        required = tuple(schema.get("required") or ())
+        additional = schema.get("additionalProperties", True)
+        additional_validator = self.compile(additional) if isinstance(additional, dict) else None
+
+        if properties or required or additional is False or additional_validator:
+            def check_object(value, path, errors):
+                if not isinstance(value, dict):
+                    return
+                for key in required:
+                    if key not in value:
+                        errors.add(path, f"缺少必填字段 {key}")
+                for key, item in value.items():
+                    validator = properties.get(key)
+                    if validator is not None:
+                        validator(item, f"{path}.{key}", errors)
+                    elif additional is False:
+                        errors.add(path, f"不允许出现未定义字段 {key}")
+                    elif additional_validator is not None:
+                        additional_validator(item, f"{path}.{key}", errors)
+            checks.append(check_object)
+        return checks
+
+    def _compile_array(self, schema: Dict) -> List[Validator]:
+        checks: List[Validator] = []
+        items = self.compile(schema["items"]) if isinstance(schema.get("items"), dict) else None
+        min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+        if items is not None or min_items is not None or max_items is not None:
+            def check_array(value, path, errors):
+                if not isinstance(value, list):
+                    return
+                if min_items is not None and len(value) < min_items:
+                    errors.add(path, f"数组长度 {len(value)} 小于 {min_items}")
+                if max_items is not None and len(value) > max_items:
+                    errors.add(path, f"数组长度 {len(value)} 大于 {max_items}")
+                if items is not None:
+                    for index, item in enumerate(value):
+                        items(item, f"{path}[{index}]", errors)
+            checks.append(check_array)
+        return checks
+
+    @staticmethod
+    def _compile_scalar(schema: Dict) -> List[Validator]:
+        checks: List[Validator] = []
+        minimum, maximum = schema.get("minimum"), schema.get("maximum")
+        exclusive_min, exclusive_max = schema.get("exclusiveMinimum"), schema.get("exclusiveMaximum")
+        # OpenAPI 3.0 中 exclusiveMinimum 为 bool，3.1 中为数值
+        if exclusive_min is True:
+            exclusive_min, minimum = minimum, None
+        if exclusive_max is True:
+            exclusive_max, maximum = maximum, None
+        if exclusive_min is False:
+            exclusive_min = None
+        if exclusive_max is False:
+            exclusive_max = None
+
+        if any(i is not None for i in (minimum, maximum, exclusive_min, exclusive_max)):
+            def check_number(value, path, errors):
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    return
+                if minimum is not None and value < minimum:
+                    errors.add(path, f"取值 {value} 小于最小值 {minimum}")
+                if maximum is not None and value > maximum:
+                    errors.add(path, f"取值 {value} 大于最大值 {maximum}")
+                if exclusive_min is not None and value <= exclusive_min:
+                    errors.add(path, f"取值 {value} 应大于 {exclusive_min}")
+                if exclusive_max is not None and value >= exclusive_max:
+                    errors.add(path, f"取值 {value} 应小于 {exclusive_max}")
+            checks.append(check_number)
+
+        min_length, max_length = schema.get("minLength"), schema.get("maxLength")
+        pattern = re.compile(schema["pattern"]) if schema.get("pattern") else None
+        if min_length is not None or max_length is not None or pattern is not None:
+            def check_string(value, path, errors):
+                if not isinstance(value, str):
+                    return
+                if min_length is not None and len(value) < min_length:
+                    errors.add(path, f"字符串长度 {len(value)} 小于 {min_length}")
+                if max_length is not None and len(value) > max_length:
+                    errors.add(path, f"字符串长度 {len(value)} 大于 {max_length}")
+                if pattern is not None and not pattern.search(value):
+                    errors.add(path, f"字符串 {value!r} 不匹配正则 {pattern.pattern}")
+            checks.append(check_string)
+        return checks
+
+    def _compile_combinators(self, schema: Dict) -> List[Validator]:
+        checks: List[Validator] = []
+        for sub in schema.get("allOf") or ():
+            checks.append(self.compile(sub))
+
+        any_of = [self.compile(i) for i in schema.get("anyOf") or ()]
+        if any_of:
+            def check_any_of(value, path, errors):
+                if not any(_matches(i, value, path) for i in any_of):
+                    errors.add(path, "不满足 anyOf 中的任何一个结构")
+            checks.append(check_any_of)
+
+        one_of = [self.compile(i) for i in schema.get("oneOf") or ()]
+        if one_of:
+            def check_one_of(value, path, errors):
+                count = sum(1 for i in one_of if _matches(i, value, path))
+                if count != 1:
+                    errors.add(path, f"应恰好满足 oneOf 中的一个结构，实际满足 {count} 个")
+            checks.append(check_one_of)
+        return checks
+
+
+class SchemaValidator:
+    """ 已编译的接口响应校验器 """
+
+    def __init__(self, validator: Validator, name: Text):
+        self._validator = validator
+        self.name = name
+
+    def validate(self, instance: Any, fail_fast: bool = False) -> List[Text]:
+        """
+        校验响应数据
+        :param instance: 响应数据（已反序列化）
+        :param fail_fast: 为 True 时遇到第一个错误立即返回
+        :return: 错误信息列表，为空表示校验通过
+        """
+        errors = _Errors(fail_fast=fail_fast)
+        try:
+            self._validator(instance, "$", errors)
+        except _FailFast:
+            pass
+        return errors.items
+
+
+def _spec_path(spec: Text) -> Text:
+    """ 文档路径支持绝对路径和相对项目根目录的路径 """
+    path = spec if os.path.isabs(spec) else os.path.join(root_path(), spec)
+    if not os.path.exists(path):
+        raise FileNotFound(f"OpenAPI 文档不存在: {path}")
+    return path
+
+
+@lru_cache(maxsize=128)
+def _load_spec(path: Text, mtime: float) -> Tuple[Dict, "SpecResolver"]:
+    """ 加载文档及其引用解析器，mtime 变化时自动重新加载 """
+    with open(path, 'r', encoding='utf-8') as file:
+        if path.endswith(".json"):
+            spec = json.load(file)
+        else:
+            spec = yaml.load(file, Loader=_YamlLoader)
+    return spec, SpecResolver(spec)
+
+
+def _candidate_paths(spec: Dict, path: Text) -> List[Text]:
+    """ 兼容请求路径中包含 servers 中定义的前缀，例: /open-apis/im/v1/messages -> /im/v1/messages """
+    paths = [path]
+    for server in spec.get("servers") or ():
+        prefix = urlparse(str(server.get("url", ""))).path.rstrip("/")
+        if prefix and path.startswith(prefix + "/"):
+            paths.append(path[len(prefix):])
+    return paths
+
+
+def _find_operation(spec: Dict, operation: Text) -> Dict:
+    """ 通过 operationId 或 "METHOD /path" 查找接口定义 """
+    method_path = operation.split(maxsplit=1)
+    if len(method_path) == 2 and method_path[0].lower() in HTTP_METHODS:
+        method = method_path[0].lower()
+        for path in _candidate_paths(spec, method_path[1]):
+            item = (spec.get("paths") or {}).get(path) or {}
+            if method in item:
+                return item[method]
+    for path_item in (spec.get("paths") or {}).values():
+        for method in HTTP_METHODS:
+            item = path_item.get(method)
+            if isinstance(item, dict) and item.get("operationId") == operation:
+                return item
+    raise ValueNotFoundError(f"OpenAPI 文档中未找到接口: {operation}")
+
+
+def _response_schema(responses: Dict, status: Text) -> Any:
+    """ 依次匹配 精确状态码 -> 2XX 通配 -> default """
+    for key in (status, f"{status[:1]}XX", f"{status[:1]}xx", "default"):
+        response = responses.get(key)
+        if response is None and key.isdigit():
+            response = responses.get(int(key))
+        if response is None:
+            continue
+        # Swagger 2.0
+        if "schema" in response:
+            return response["schema"]
+        content = response.get("content") or {}
+        media = content.get("application/json")
+        if media is None:
+            media = next((v for k, v in content.items() if "json" in k), None)
+        if media is not None and "schema" in media:
+            return media["schema"]
+        return None
+    raise ValueNotFoundError(f"接口未定义状态码 {status} 对应的响应")
+
+
+@lru_cache(maxsize=1024)
+def _compile_validator(path: Text, mtime: float, operation: Text, status: Text) -> "SchemaValidator":
+    spec, resolver = _load_spec(path, mtime)
+    responses = _find_operation(spec, operation).get("responses") or {}
+    return SchemaValidator(resolver.compile(_response_schema(responses, status)), f"{operation} {status}")
+
+
+def get_validator(spec: Text, operation: Text, status: Union[int, Text] = 200) -> "SchemaValidator":
+    """
+    获取编译后的接口响应校验器，(文档, 接口, 状态码) 相同时直接复用缓存
+    :param spec: OpenAPI 文档路径
+    :param operation: operationId 或 "METHOD /path"，例: "post /open-apis/im/v1/messages"
+    :param status: 响应状态码
+    """
+    path = _spec_path(spec)
+    return _compile_validator(path, os.path.getmtime(path), operation, str(status))
+
+
+def validate_response(
+        instance: Any,
+        spec: Text,
+        operation: Text,
+        status: Union[int, Text] = 200,
+        fail_fast: bool = False) -> List[Text]:
+    """ 按接口响应定义校验数据，返回错误信息列表 """
+    return get_validator(spec, operation, status).validate(instance, fail_fast=fail_fast)
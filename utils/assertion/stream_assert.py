@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+大响应流式取值
+
+针对返回几十 MB JSON 的列表/导出类接口，不再将整个响应读成 res.text 再反序列化，
+而是基于 ijson 边读边解析，只提取断言、缓存、后置处理中用到的 jsonpath 对应的值，
+并将这些值还原成一份"投影"响应（只包含被引用到的字段）。
+投影响应可以直接交给 Assert、SetCurrentRequestCache、TearDownHandler 使用，
+日志与 allure 中记录的也是这份投影，内存占用与响应大小无关。
+
+仅支持简单 jsonpath（$.a.b[0]['c']），命中的对象/数组会被完整构建，
+因此请尽量断言到具体字段，避免直接提取大数组。
+"""
+import json
+from typing import Any, Dict, IO, Iterable, List, Text
+from utils.assertion.assert_plan import parse_simple_jsonpath, _PathTrie
+from utils.other_tools.exceptions import ValueTypeError
+
+# 可选依赖：ijson
+try:
+    import ijson
+except ImportError:  # noqa: BLE001
+    ijson = None
+
+_CONTAINER_START = ("start_map", "start_array")
+_CONTAINER_END = ("end_map", "end_array")
+
+
+class _Frame:
+    """ 当前正在解析的容器 """
+    __slots__ = ("node", "is_array", "index")
+
+    def __init__(self, node: "_PathTrie", is_array: bool):
+        self.node = node
+        self.is_array = is_array
+        self.index = -1
+
+
+def _compile_paths(exprs: Iterable[Text]) -> "_PathTrie":
+    trie = _PathTrie()
+    for expr in dict.fromkeys(exprs):
+        parts = parse_simple_jsonpath(expr)
+        if parts is None:
+            raise ValueTypeError(f"流式断言模式仅支持简单 jsonpath，例: $.data.items[0].id，当前: {expr}")
+        trie.add(parts, expr)
+    return trie
+
+
+def stream_extract(source: IO, exprs: Iterable[Text]) -> Dict[Text, Any]:
+    """
+    流式提取多个 jsonpath 的值，一次遍历响应流
+    :param source: 类文件对象，例：requests 的 res.raw
+    :param exprs: jsonpath 列表
+    :return: {jsonpath: [value]}，未提取到时为 False，与 jsonpath 库保持一致
+    """
+    if ijson is None:
+        raise ValueError("未安装 ijson 依赖，无法使用流式断言模式，请执行 pip install ijson")
+    trie = _compile_paths(exprs)
+    result = dict.fromkeys(_iter_exprs(trie), False)
+
+    stack: List[_Frame] = []
+    next_node = trie
+    skip_depth = 0
+    builder, build_node, build_depth = None, None, 0
+
+    for event, value in ijson.basic_parse(source, use_float=True):
+        # 正在构建命中的对象/数组
+        if builder is not None:
+            builder.event(event, value)
+            if event in _CONTAINER_START:
+                build_depth += 1
+            elif event in _CONTAINER_END:
+                build_depth -= 1
+                if build_depth == 0:
+                    build_node.extract(builder.value, result)
+                    builder, build_node = None, None
+                    # 所有 jsonpath 都已提取到，剩余响应无需再读取
+                    if False not in result.values():
+                        break
+            continue
+        # 与任何 jsonpath 无关的子树，只计算层级直接跳过
+        if skip_depth:
+            if event in _CONTAINER_START:
+                skip_depth += 1
+            elif event in _CONTAINER_END:
+                skip_depth -= 1
+            continue
+
+        if event == "map_key":
+            next_node = stack[-1].node.children.get(value)
+            continue
+        if event in _CONTAINER_END:
+            stack.pop()
+            continue
+
+        # 定位当前值对应的前缀树节点
+        if stack and stack[-1].is_array:
+            frame = stack[-1]
+            frame.index += 1
+            node = frame.node.children.get(frame.index)
+        else:
+            node = next_node
+
+        if node is None:
+            if event in _CONTAINER_START:
+                skip_depth = 1
+        elif node.exprs and event in _CONTAINER_START:
+            builder, build_node, build_depth = ijson.ObjectBuilder(), node, 1
+            builder.event(event, value)
+        elif event in _CONTAINER_START:
+            stack.append(_Frame(node, event == "start_array"))
+        else:
+            node.extract(value, result)
+            if False not in result.values():
+                break
+    return result
+
+
+def _iter_exprs(trie: "_PathTrie"):
+    yield from trie.exprs
+    for child in trie.children.values():
+        yield from _iter_exprs(child)
+
+
+def build_projection(values: Dict[Text, Any]) -> Any:
+    """
+    将提取结果还原成只包含被引用字段的响应结构
+    例：{"$.data.items[1].id": [3]} -> {"data": {"items": [None, {"id": 3}]}}
+    """
+    projection: Any = None
+    for expr, found in values.items():
+        if found is False:
+            continue
+        parts = parse_simple_jsonpath(expr)
+        if not parts:
+            return found[0]
+        if projection is None:
+            projection = [] if isinstance(parts[0], int) else {}
+        node = projection
+        for part, next_part in zip(parts, parts[1:] + (None,)):
+            if next_part is None:
+                _set_item(node, part, found[0])
+            else:
+                child = _get_item(node, part)
+                if child is None:
+                    child = [] if isinstance(next_part, int) else {}
+                    _set_item(node, part, child)
+                node = child
+    return {} if projection is None else projection
+
+
+def _get_item(node: Any, part: Any) -> Any:
+    if isinstance(node, list):
+        return node[part] if part < len(node) else None
+    return node.get(part)
+
+
+def _set_item(node: Any, part: Any, value: Any) -> None:
+    if isinstance(node, list):
+        # 数组按下标补齐，未引用的位置填充 None
+        node.extend([None] * (part + 1 - len(node)))
+        node[part] = value
+    else:
+        node[part] = value
+
+
+def stream_projection_text(source: IO, exprs: Iterable[Text]) -> Text:
+    """ 流式读取响应，返回投影响应的 json 字符串 """
+    return json.dumps(build_projection(stream_extract(source, exprs)), ensure_ascii=False)
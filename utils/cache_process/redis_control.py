@@ -6,13 +6,18 @@
 """
 redis 缓存操作封装
 """
-from typing import Text, Any
+import threading
+from typing import Text, Any, Dict, Tuple
 import redis
 
 
 class RedisHandler:
     """ redis 缓存读取封装 """
 
+    # 同一进程内配置相同的 RedisHandler 共用连接池，不再每次实例化都新建连接
+    _pools: Dict[Tuple, redis.ConnectionPool] = {}
+    _pools_lock = threading.Lock()
+
     def __init__(self):
         # 本地 Redis 默认配置，如需远程请自行修改
         self.host = '127.0.0.1'
@@ -20,13 +25,21 @@ class RedisHandler:
         self.database = 0
         self.password = ''
         self.charset = 'UTF-8'
-        self.redis = redis.Redis(
-            self.host,
-            port=self.port,
-            password=self.password,
-            decode_responses=True,
-            db=self.database
-        )
+        self.redis = redis.Redis(connection_pool=self._get_pool())
+
+    def _get_pool(self) -> redis.ConnectionPool:
+        key = (self.host, self.port, self.password, self.database)
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = redis.ConnectionPool(
+                    host=self.host,
+                    port=self.port,
+                    password=self.password,
+                    decode_responses=True,
+                    db=self.database
+                )
+        return pool
 
     def set_string(
             self, name: Text,
@@ -8,7 +8,10 @@ from typing import Dict, Any, Optional
 from flask import Blueprint, request, jsonify
 from dotenv import load_dotenv
 
-from utils.llm.router_service import run_ai_test_router
+from utils.other_tools.lazy_import import lazy_module
+
+# router_service 依赖 LangChain，第一次调用接口时再导入
+router_service = lazy_module("utils.llm.router_service")
 
 bp_ai_router = Blueprint("bp_ai_router", __name__)
 
@@ -90,7 +93,7 @@ def ai_test_router_api():
             return jsonify({"error": "missing_base_name", "message": "缺少 base_name"}), 400
 
         # ========== 3) 调用 router ==========
-        result = run_ai_test_router(
+        result = router_service.run_ai_test_router(
             project_root=project_root,
             action=action,
             base_name=base_name,
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+结构化请求日志
+
+开启 event_log 后，每个请求写入一行紧凑的 json，便于后续统计分析，不需要再用正则解析文本日志：
+{"ts": ..., "case_id": ..., "test": ..., "detail": ..., "method": "POST", "url_template": "/open-apis/im/v1/messages/{id}",
+ "url": ..., "status": 200, "latency_ms": 35.2, "req_bytes": 120, "resp_bytes": 512,
+ "outcome": "passed", "error": null, "request_body": ..., "response_body": ...}
+
+1) pytest 用例中的请求会等用例执行完成后，带上断言结果（outcome）一起写入；用例外的请求立即写入，outcome 为空
+2) 成功的请求按 success_sample_rate 采样，失败的请求全部记录
+3) 请求体、响应体可以不记录、截断或只记录 sha256
+4) json 序列化和写文件都在日志后台线程中完成，文件按大小滚动
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from functools import lru_cache
+from logging import handlers
+from typing import Any, Dict, Iterable, List, Optional, Text
+from urllib.parse import urlsplit
+from common.setting import ensure_path_sep
+from utils import config
+from utils.logging_tool.log_control import register_queued_logger
+
+# 环境变量中指定时，优先使用该路径并开启结构化日志，用于 api_server 调起的 pytest 子进程
+EVENT_LOG_ENV = "EVENT_LOG_PATH"
+
+# url 中的资源 ID：纯数字、uuid、包含数字的长字符串（可含 . @，如 feishu.cn_xxx123、user@example.com1）
+_ID_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|(?=[\w.@-]*\d)[\w.@-]{16,})$"
+)
+
+
+@lru_cache(maxsize=4096)
+def url_template(url: Text) -> Text:
+    """
+    将 url 转换成模板，路径中的资源 ID 替换为 {id}，只保留查询参数名称
+    例：https://host/open-apis/calendar/v4/calendars/feishu.cn_xxx123/events?page_size=10
+     -> /open-apis/calendar/v4/calendars/{id}/events?page_size
+    """
+    parts = urlsplit(url)
+    path = "/".join(
+        "{id}" if _ID_SEGMENT.match(i) else i for i in parts.path.split("/")
+    )
+    if parts.query:
+        keys = sorted({i.split("=", 1)[0] for i in parts.query.split("&") if i})
+        path += "?" + "&".join(keys)
+    return path
+
+
+def _size(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    if not isinstance(value, str):
+        value = str(value)
+    return len(value.encode("utf-8"))
+
+
+class _JsonLineFormatter(logging.Formatter):
+    """ 在日志后台线程中将事件序列化成一行 json """
+
+    def format(self, record: logging.LogRecord) -> Text:
+        return json.dumps(record.msg, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class EventSink:
+    """ 结构化请求日志 """
+
+    def __init__(
+            self,
+            path: Text,
+            max_bytes: int = 50 * 1024 * 1024,
+            backup_count: int = 5,
+            success_sample_rate: float = 1.0,
+            body_mode: Text = "truncate",
+            body_max_length: int = 2000):
+        """
+        :param path: 日志文件路径
+        :param max_bytes: 单个文件最大字节数，超出后滚动
+        :param backup_count: 保留的历史文件数
+        :param success_sample_rate: 成功请求的采样率
+        :param body_mode: none / truncate / hash
+        :param body_max_length: truncate 模式下保留的最大长度
+        """
+        self.path = path
+        self.success_sample_rate = success_sample_rate
+        self.body_mode = body_mode
+        self.body_max_length = body_max_length
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.logger = logging.getLogger(f"event_sink:{path}")
+        self.logger.setLevel(logging.INFO)
+        # 事件只写入文件，不传递到上层 logger
+        self.logger.propagate = False
+        file_handler = handlers.RotatingFileHandler(
+            filename=path,
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8"
+        )
+        file_handler.setFormatter(_JsonLineFormatter())
+        register_queued_logger(self.logger, [file_handler])
+        # 用例执行期间的请求先暂存，用例结束后带上断言结果写入
+        self._local = threading.local()
+
+    def body(self, value: Any) -> Any:
+        """ 按配置处理请求体、响应体 """
+        if self.body_mode == "none" or value is None:
+            return None
+        # 字典、列表序列化成 json，读取时可以还原
+        text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+        if self.body_mode == "hash":
+            return "sha256:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if self.body_max_length and len(text) > self.body_max_length:
+            return text[:self.body_max_length]
+        return text
+
+    def request_event(self, res) -> Dict:
+        """ 根据 ResponseData 生成请求事件 """
+        yaml_data = getattr(res, "yaml_data", None)
+        return {
+            "ts": round(time.time(), 3),
+            "case_id": getattr(yaml_data, "case_id", None),
+            "test": None,
+            "detail": res.detail,
+            "method": res.method,
+            "url_template": url_template(res.url),
+            "url": res.url,
+            "status": res.status_code,
+            "latency_ms": res.res_time,
+            "req_bytes": _size(res.request_body),
+            "resp_bytes": _size(res.response_data),
+            "outcome": None,
+            "error": None,
+            "request_body": self.body(res.request_body),
+            "response_body": self.body(res.response_data),
+        }
+
+    def _sampled(self, event: Dict) -> bool:
+        failed = event["outcome"] == "failed" or not 200 <= (event["status"] or 0) < 400
+        if failed or self.success_sample_rate >= 1:
+            return True
+        return random.random() < self.success_sample_rate
+
+    def write(self, event: Dict) -> None:
+        """ 写入事件，成功的请求按采样率写入 """
+        if self._sampled(event):
+            self.logger.info(event)
+
+    def record_request(self, res) -> None:
+        """ 记录一次请求，用例执行期间暂存，否则直接写入 """
+        event = self.request_event(res)
+        pending = getattr(self._local, "pending", None)
+        if pending is None:
+            self.write(event)
+        else:
+            event["test"] = self._local.test
+            pending.append(event)
+
+    def begin_case(self, test: Text) -> None:
+        """ 用例开始执行，当前线程的请求暂存到用例结束 """
+        self._local.pending = []
+        self._local.test = test
+
+    def finish_case(self, outcome: Text, error: Optional[Text] = None) -> None:
+        """
+        用例执行完成，写入暂存的请求
+        :param outcome: passed / failed / skipped
+        :param error: 失败原因
+        """
+        pending = getattr(self._local, "pending", None) or []
+        self._local.pending = None
+        for event in pending:
+            event["outcome"] = outcome
+            event["error"] = error
+            self.write(event)
+
+
+def _create_sink() -> Optional["EventSink"]:
+    path = os.environ.get(EVENT_LOG_ENV)
+    if path:
+        # api_server 通过该文件读取每个请求的完整请求/响应，不滚动、不采样、不截断
+        return EventSink(path=path, max_bytes=0, body_mode="truncate", body_max_length=0)
+    if not config.event_log.switch:
+        return None
+    path = config.event_log.path
+    # 相对路径基于项目根目录
+    path = path if os.path.isabs(path) else ensure_path_sep("/" + path)
+    return EventSink(
+        path=path,
+        max_bytes=config.event_log.max_bytes,
+        backup_count=config.event_log.backup_count,
+        success_sample_rate=config.event_log.success_sample_rate,
+        body_mode=config.event_log.body_mode,
+        body_max_length=config.event_log.body_max_length
+    )
+
+
+# 未开启时为 None
+EVENT_SINK = _create_sink()
+
+
+def read_events(path: Text) -> List[Dict]:
+    """ 读取结构化日志文件，跳过不完整的行 """
+    events = []
+    if not os.path.exists(path):
+        return events
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+def remove_events(path: Text) -> None:
+    """ 删除结构化日志文件及其滚动产生的历史文件 """
+    directory, name = os.path.split(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        return
+    for i in os.listdir(directory):
+        if i == name or (i.startswith(name + ".") and i[len(name) + 1:].isdigit()):
+            try:
+                os.remove(os.path.join(directory, i))
+            except OSError:
+                pass
+
+
+def events_to_cases(events: Iterable[Dict]) -> Optional[List[Dict]]:
+    """ 将请求事件转换为 api_server 中使用的请求/响应结构 """
+    def _parse_obj(text):
+        if not isinstance(text, str):
+            return text
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+
+    results = [
+        {
+            "case_id": i.get("case_id"),
+            "detail": i.get("detail"),
+            "outcome": i.get("outcome"),
+            "request": {
+                "method": i.get("method"),
+                "url": i.get("url"),
+                "body": _parse_obj(i.get("request_body")),
+                "headers": None,
+            },
+            "response": {
+                "status_code": i.get("status"),
+                "body": _parse_obj(i.get("response_body")),
+                "headers": None,
+                "elapsed_ms": i.get("latency_ms"),
+            }
+        }
+        for i in events
+    ]
+    return results or None
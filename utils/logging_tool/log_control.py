@@ -4,15 +4,101 @@
 # @Author : 余少琪
 """
 日志封装，可设置不同等级的日志颜色
+
+logger 上只挂载 QueueHandler，日志记录放入队列后立即返回，
+格式化、控制台输出、写文件都在后台的 QueueListener 线程中完成，不阻塞用例执行
 """
+import atexit
 import logging
+import os
+import queue
+import threading
 from logging import handlers
-from typing import Text
+from typing import Dict, List, Text
 import colorlog
 import time
 from common.setting import ensure_path_sep
 
 
+class _DeferredQueueHandler(handlers.QueueHandler):
+    """
+    不在调用线程中格式化日志，由后台线程格式化
+    注意：日志参数会在后台线程中才转换成字符串，记录之后不要再修改传入的对象
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _LoggerRouter(logging.Handler):
+    """ 后台线程中，将日志交给对应 logger 的输出处理器 """
+
+    def __init__(self):
+        super().__init__()
+        self.routes: Dict[Text, List[logging.Handler]] = {}
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
+# 所有 LogHandler 共用一个队列和后台线程，保证控制台中日志的先后顺序
+_log_queue: "queue.Queue" = queue.Queue()
+_router = _LoggerRouter()
+_listener = handlers.QueueListener(_log_queue, _router)
+_listener_lock = threading.Lock()
+_listener_started = False
+
+
+def _start_listener() -> None:
+    global _listener_started
+    with _listener_lock:
+        if not _listener_started:
+            _listener.start()
+            # 进程退出前，将队列中剩余的日志全部输出
+            atexit.register(_listener.stop)
+            _listener_started = True
+
+
+def _reinit_after_fork() -> None:
+    """
+    fork 出的子进程中没有后台线程，队列和锁也可能处于父进程中被占用的状态，
+    重新创建后再启动线程，否则子进程中的日志只进入队列不会输出
+    """
+    global _listener, _listener_lock, _listener_started
+    started = _listener_started
+    _log_queue.__init__()
+    _listener = handlers.QueueListener(_log_queue, _router)
+    _listener_lock = threading.Lock()
+    _listener_started = False
+    if started:
+        _start_listener()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def register_queued_logger(logger: logging.Logger, handler_list: List[logging.Handler]) -> None:
+    """
+    logger 上只挂载队列处理器，handler_list 在后台线程中输出
+    :param logger: 日志对象
+    :param handler_list: 实际输出日志的处理器
+    """
+    _router.routes[logger.name] = handler_list
+    if not any(isinstance(i, _DeferredQueueHandler) for i in logger.handlers):
+        logger.addHandler(_DeferredQueueHandler(_log_queue))
+    _start_listener()
+
+
+def flush_logs() -> None:
+    """ 等待队列中的日志全部输出完成，用于需要立即读取日志文件的场景 """
+    if _listener_started:
+        _log_queue.join()
+
+
 class LogHandler:
     """ 日志打印封装"""
     # 日志级别关系映射
@@ -52,9 +138,8 @@ class LogHandler:
         )
         # 设置文件里写入的格式
         time_rotating.setFormatter(format_str)
-        # 把对象加到logger里
-        self.logger.addHandler(screen_output)
-        self.logger.addHandler(time_rotating)
+        # 输出处理器交给后台线程，logger 上只挂载队列处理器
+        register_queued_logger(self.logger, [screen_output, time_rotating])
         self.log_path = ensure_path_sep('\\logs\\log.log')
 
     @classmethod
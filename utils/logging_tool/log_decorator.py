@@ -7,9 +7,118 @@
 如设置 False，则程序不会打印日志
 """
 import ast
+import json
+import logging
+import re
 from functools import wraps
-from utils.read_files_tools.regular_control import cache_regular
+from typing import Any, Dict, List, Optional, Text
+from utils import config
 from utils.logging_tool.log_control import INFO, ERROR
+from utils.logging_tool.event_sink import EVENT_SINK
+
+
+# 截断后缀，parse_request_logs 依赖同一格式识别被截断的内容
+TRUNCATED_SUFFIX = "...(共 {} 个字符，已截断)"
+
+
+def truncate(value: Any, max_length: int = None) -> Text:
+    """
+    超长内容截断
+    :param value: 日志内容
+    :param max_length: 最大长度，为空时读取配置，0 为不限制
+    """
+    text = str(value)
+    if max_length is None:
+        max_length = config.log_body_max_length
+    if max_length and len(text) > max_length:
+        return f"{text[:max_length]}{TRUNCATED_SUFFIX.format(len(text))}"
+    return text
+
+
+# RequestLog 中字典内容的匹配规则，兼容被 truncate 截断的内容
+_LOG_VALUE = r"\{.*?(?:\}|\.\.\.\(共 \d+ 个字符，已截断\))"
+_LOG_BLOCK_PATTERN = re.compile(
+    r"用例标题:\s*(?P<title>.+?)\n"
+    r"请求路径:\s*(?P<url>.+?)\n"
+    r"请求方式:\s*(?P<method>\S+)\n"
+    rf"请求头:\s*(?P<headers>{_LOG_VALUE})\n"
+    rf"请求内容:\s*(?P<body>{_LOG_VALUE})\n"
+    rf"接口响应内容:\s*(?P<resp_body>{_LOG_VALUE})\n"
+    r"接口响应时长:\s*(?P<elapsed>[\d\.]+)\s*ms\n"
+    r"Http状态码:\s*(?P<status>\d+)",
+    re.S
+)
+
+
+class RequestLog:
+    """ 请求日志内容，在日志真正输出时才格式化 """
+    __slots__ = ("res", "_text")
+
+    def __init__(self, res):
+        self.res = res
+        self._text = None
+
+    def __str__(self) -> Text:
+        # 控制台、文件两个处理器共用一次格式化结果
+        if self._text is None:
+            res = self.res
+            self._text = f"\n======================================================\n" \
+                         f"用例标题: {res.detail}\n" \
+                         f"请求路径: {res.url}\n" \
+                         f"请求方式: {res.method}\n" \
+                         f"请求头:   {truncate(res.headers)}\n" \
+                         f"请求内容: {truncate(res.request_body)}\n" \
+                         f"接口响应内容: {truncate(res.response_data)}\n" \
+                         f"接口响应时长: {res.res_time} ms\n" \
+                         f"Http状态码: {res.status_code}\n" \
+                         "====================================================="
+        return self._text
+
+
+def _parse_log_value(text: Text) -> Any:
+    """ 日志中的字典内容还原为对象，被截断或无法解析时返回原文 """
+    for parser in (json.loads, ast.literal_eval):
+        try:
+            return parser(text)
+        except Exception:  # noqa: BLE001
+            continue
+    return text
+
+
+def parse_request_logs(log_text: Text, cases_data: Optional[List[Dict]] = None) -> Optional[List[Dict]]:
+    """
+    将 RequestLog 输出的“用例标题/请求/响应”日志块解析为结构化列表
+    :param log_text: 日志文本
+    :param cases_data: 用例列表，用于按 detail 回填 case_id
+    """
+    if not log_text:
+        return None
+    case_map = {}
+    if isinstance(cases_data, list):
+        for case in cases_data:
+            detail = case.get("detail")
+            if detail:
+                case_map[detail] = case.get("case_id")
+    results = []
+    for match in _LOG_BLOCK_PATTERN.finditer(log_text):
+        detail = match.group("title").strip()
+        results.append({
+            "case_id": case_map.get(detail),
+            "detail": detail,
+            "request": {
+                "method": match.group("method").strip(),
+                "url": match.group("url").strip(),
+                "body": _parse_log_value(match.group("body")),
+                "headers": _parse_log_value(match.group("headers")),
+            },
+            "response": {
+                "status_code": int(match.group("status")),
+                "body": _parse_log_value(match.group("resp_body")),
+                "headers": None,
+                "elapsed_ms": float(match.group("elapsed")),
+            }
+        })
+    return results or None
 
 
 def log_decorator(switch: bool):
@@ -22,27 +131,20 @@ def log_decorator(switch: bool):
         @wraps(func)
         def swapper(*args, **kwargs):
 
-            # 判断日志为开启状态，才打印日志
             res = func(*args, **kwargs)
-            # 判断日志开关为开启状态
-            if switch:
-                _log_msg = f"\n======================================================\n" \
-                               f"用例标题: {res.detail}\n" \
-                               f"请求路径: {res.url}\n" \
-                               f"请求方式: {res.method}\n" \
-                               f"请求头:   {res.headers}\n" \
-                               f"请求内容: {res.request_body}\n" \
-                               f"接口响应内容: {res.response_data}\n" \
-                               f"接口响应时长: {res.res_time} ms\n" \
-                               f"Http状态码: {res.status_code}\n" \
-                               "====================================================="
-                _is_run = ast.literal_eval(cache_regular(str(res.is_run)))
-                # 判断正常打印的日志，控制台输出绿色
-                if _is_run in (True, None) and res.status_code == 200:
-                    INFO.logger.info(_log_msg)
+            # 判断日志开关为开启状态，用例未执行时没有响应数据
+            if switch and res is not None:
+                # 能拿到响应说明用例已执行，正常的请求控制台输出绿色，失败的请求输出红色
+                if res.status_code == 200:
+                    logger, level = INFO.logger, logging.INFO
                 else:
-                    # 失败的用例，控制台打印红色
-                    ERROR.logger.error(_log_msg)
+                    logger, level = ERROR.logger, logging.ERROR
+                # 日志级别未开启时，不生成日志内容
+                if logger.isEnabledFor(level):
+                    logger.log(level, "%s", RequestLog(res))
+            # 结构化请求日志
+            if EVENT_SINK is not None and res is not None:
+                EVENT_SINK.record_request(res)
             return res
         return swapper
     return decorator
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+数据库连接池
+
+进程内共享的连接池，MysqlDB 及其子类不再每次实例化都新建连接：
+1) 连接总数受 max_size 限制，超出时等待归还，等待超时抛出异常
+2) 连接空闲超过 ping_interval 秒后，借出前先做健康检查，失效的连接直接丢弃重建
+3) 查询使用 autocommit 连接；前置/后置写操作通过 transaction() 借出事务连接，
+   退出时统一提交，异常时回滚
+4) 连接的创建方式通过 creator 注入，便于替换为其他 DB-API 实现
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Tuple
+from utils.logging_tool.log_control import WARNING
+from utils.other_tools.exceptions import DataAcquisitionFailed
+
+
+class ConnectionPool:
+    """ 线程安全的 DB-API 连接池 """
+
+    def __init__(
+            self,
+            creator: Callable[[], Any],
+            max_size: int = 10,
+            timeout: float = 30,
+            ping_interval: float = 30):
+        """
+        :param creator: 新建连接的函数
+        :param max_size: 最大连接数
+        :param timeout: 连接池耗尽时，等待连接归还的最长时间（秒）
+        :param ping_interval: 连接空闲超过该时长（秒）后，借出前先做健康检查
+        """
+        self._creator = creator
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        # 空闲连接: (连接, 归还时间)
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        """ 当前已创建的连接数 """
+        return self._size
+
+    def _healthy(self, conn: Any, idle_since: float) -> bool:
+        if time.monotonic() - idle_since < self.ping_interval:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except AttributeError:
+            # 不支持 ping 的连接（如 sqlite3）默认可用
+            return True
+        except Exception as error:  # noqa: BLE001
+            WARNING.logger.warning("数据库连接健康检查失败，已丢弃该连接: %s", error)
+            return False
+
+    def _discard(self, conn: Any) -> None:
+        try:
+            conn.close()
+        except Exception:  # noqa: BLE001
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def acquire(self) -> Any:
+        """ 借出连接，优先复用空闲连接 """
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn, idle_since = None, 0
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    raise DataAcquisitionFailed(
+                        f"获取数据库连接超时，连接池已达到最大连接数 {self.max_size}"
+                    )
+
+        if conn is None:
+            try:
+                return self._creator()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        if not self._healthy(conn, idle_since):
+            self._discard(conn)
+            return self.acquire()
+        return conn
+
+    def release(self, conn: Any, broken: bool = False) -> None:
+        """ 归还连接，异常的连接直接关闭 """
+        if broken:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, autocommit: bool = True):
+        """ 借出连接，使用完毕后自动归还 """
+        conn = self.acquire()
+        broken = False
+        try:
+            conn.autocommit(autocommit)
+            yield conn
+        except Exception:
+            broken = not self._rollback(conn)
+            raise
+        finally:
+            self.release(conn, broken=broken)
+
+    @contextmanager
+    def transaction(self):
+        """ 借出事务连接，正常退出提交，异常回滚 """
+        with self.connection(autocommit=False) as conn:
+            yield conn
+            conn.commit()
+
+    @staticmethod
+    def _rollback(conn: Any) -> bool:
+        """ 回滚事务，回滚失败说明连接已不可用 """
+        try:
+            conn.rollback()
+            return True
+        except Exception:  # noqa: BLE001
+            return False
+
+    def close_all(self) -> None:
+        """ 关闭所有空闲连接 """
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _ in idle:
+            self._discard(conn)
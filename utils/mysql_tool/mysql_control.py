@@ -8,12 +8,18 @@ mysql 封装，支持 增、删、改、查
 import ast
 import datetime
 import decimal
+import sqlite3
+import threading
+from contextlib import contextmanager
 from warnings import filterwarnings
 import pymysql
-from typing import List, Union, Text, Dict
+from pymysql.constants import CLIENT
+from typing import List, Optional, Tuple, Union, Text, Dict
 from utils import config
 from utils.logging_tool.log_control import ERROR
-from utils.read_files_tools.regular_control import sql_regular
+from utils.mysql_tool.connection_pool import ConnectionPool
+from utils.mysql_tool import sqlite_control
+from utils.read_files_tools.regular_control import sql_regular, sql_params
 from utils.read_files_tools.regular_control import cache_regular
 from utils.other_tools.exceptions import DataAcquisitionFailed, ValueTypeError
 
@@ -21,34 +27,98 @@ from utils.other_tools.exceptions import DataAcquisitionFailed, ValueTypeError
 filterwarnings("ignore", category=pymysql.Warning)
 
 
+# pymysql 与 sqlite 替身抛出的数据库异常
+DB_ERRORS = (pymysql.Error, sqlite3.Error)
+
+_pool = None
+_batch_pool = None
+_pool_lock = threading.Lock()
+
+
+def _connect(multi_statements: bool = False):
+    """
+    按配置新建数据库连接，driver 为 sqlite 时使用本地替身
+    :param multi_statements: 是否允许一次发送多条 sql，只用于参数化后的批量查询
+    """
+    if config.mysql_db.driver == "sqlite":
+        return sqlite_control.connect(config.mysql_db.database)
+    return pymysql.connect(
+        host=config.mysql_db.host,
+        user=config.mysql_db.user,
+        password=config.mysql_db.password,
+        port=config.mysql_db.port,
+        client_flag=CLIENT.MULTI_STATEMENTS if multi_statements else 0
+    )
+
+
+def _create_pool(multi_statements: bool = False) -> "ConnectionPool":
+    return ConnectionPool(
+        creator=lambda: _connect(multi_statements),
+        max_size=config.mysql_db.pool_size,
+        timeout=config.mysql_db.pool_timeout,
+        ping_interval=config.mysql_db.ping_interval
+    )
+
+
+def get_pool() -> "ConnectionPool":
+    """ 进程内共享的 mysql 连接池，首次使用时创建；连接不允许一次执行多条 sql """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _create_pool()
+    return _pool
+
+
+def get_batch_pool() -> "ConnectionPool":
+    """
+    批量断言专用的连接池，连接开启 CLIENT.MULTI_STATEMENTS；
+    只用于 batch_query 发送参数化后的查询，响应中的值经过驱动转义，不会被当作额外的 sql 执行
+    """
+    global _batch_pool
+    if _batch_pool is None:
+        with _pool_lock:
+            if _batch_pool is None:
+                _batch_pool = _create_pool(multi_statements=True)
+    return _batch_pool
+
+
 class MysqlDB:
     """ mysql 封装 """
     if config.mysql_db.switch:
 
         def __init__(self):
+            # 连接从进程内共享的连接池中借出，不再每次实例化都新建连接
+            self.pool = get_pool()
+            # transaction() 中借出的事务连接
+            self._tx_conn = None
 
-            try:
-                # 建立数据库连接
-                self.conn = pymysql.connect(
-                    host=config.mysql_db.host,
-                    user=config.mysql_db.user,
-                    password=config.mysql_db.password,
-                    port=config.mysql_db.port
-                )
-
-                # 使用 cursor 方法获取操作游标，得到一个可以执行sql语句，并且操作结果为字典返回的游标
-                self.cur = self.conn.cursor(cursor=pymysql.cursors.DictCursor)
-            except AttributeError as error:
-                ERROR.logger.error("数据库连接失败，失败原因 %s", error)
-
-        def __del__(self):
-            try:
-                # 关闭游标
-                self.cur.close()
-                # 关闭连接
-                self.conn.close()
-            except AttributeError as error:
-                ERROR.logger.error("数据库连接失败，失败原因 %s", error)
+        @contextmanager
+        def _cursor(self, autocommit: bool = True):
+            """ 获取游标，事务中复用事务连接，否则从连接池借出连接 """
+            if self._tx_conn is not None:
+                with self._tx_conn.cursor(pymysql.cursors.DictCursor) as cur:
+                    yield self._tx_conn, cur
+                return
+            with self.pool.connection(autocommit=autocommit) as conn:
+                with conn.cursor(pymysql.cursors.DictCursor) as cur:
+                    yield conn, cur
+
+        @contextmanager
+        def transaction(self):
+            """
+            事务模式，用于前置/后置的写操作，期间所有 sql 共用一个连接，
+            正常退出统一提交，异常回滚
+            """
+            if self._tx_conn is not None:
+                yield self
+                return
+            with self.pool.transaction() as conn:
+                self._tx_conn = conn
+                try:
+                    yield self
+                finally:
+                    self._tx_conn = None
 
         def query(self, sql, state="all"):
             """
@@ -58,17 +128,18 @@ class MysqlDB:
                 :return:
                 """
             try:
-                self.cur.execute(sql)
+                with self._cursor() as (_, cur):
+                    cur.execute(sql)
 
-                if state == "all":
-                    # 查询全部
-                    data = self.cur.fetchall()
-                else:
-                    # 查询单条
-                    data = self.cur.fetchone()
+                    if state == "all":
+                        # 查询全部
+                        data = cur.fetchall()
+                    else:
+                        # 查询单条
+                        data = cur.fetchone()
                 return data
-            except AttributeError as error_data:
-                ERROR.logger.error("数据库连接失败，失败原因 %s", error_data)
+            except DB_ERRORS as error_data:
+                ERROR.logger.error("数据库查询失败，失败原因 %s", error_data)
                 raise
 
         def execute(self, sql: Text):
@@ -78,15 +149,42 @@ class MysqlDB:
                 :return:
                 """
             try:
-                # 使用 execute 操作 sql
-                rows = self.cur.execute(sql)
-                # 提交事务
-                self.conn.commit()
+                # 非事务模式下，单条 sql 自动提交；事务模式下由 transaction() 统一提交
+                with self._cursor() as (_, cur):
+                    rows = cur.execute(sql)
                 return rows
-            except AttributeError as error:
-                ERROR.logger.error("数据库连接失败，失败原因 %s", error)
-                # 如果事务异常，则回滚数据
-                self.conn.rollback()
+            except DB_ERRORS as error:
+                # 事务连接异常时，由连接池回滚数据
+                ERROR.logger.error("数据库执行失败，失败原因 %s", error)
+                raise
+
+        def batch_query(self, statements: List[Tuple[Text, Optional[tuple]]]) -> List[List[Dict]]:
+            """
+            批量查询，开启 batch_sql 且 sql 均已参数化时，一次网络往返发送所有 sql
+            :param statements: (sql, 参数) 列表，参数为 None 表示 sql 中已直接拼接了数据，只能单独执行
+            :return: 每条 sql 对应的查询结果
+            """
+            statements = [(i.strip().rstrip(";"), args) for i, args in statements]
+            batch = len(statements) > 1 and config.mysql_db.batch_sql and \
+                config.mysql_db.driver != "sqlite" and all(args is not None for _, args in statements)
+            try:
+                if not batch:
+                    results = []
+                    with self._cursor() as (_, cur):
+                        for sql, args in statements:
+                            cur.execute(sql, args)
+                            results.append(list(cur.fetchall()))
+                    return results
+                with get_batch_pool().connection() as conn:
+                    with conn.cursor(pymysql.cursors.DictCursor) as cur:
+                        # 参数由驱动转义后再合并，响应中的分号只会出现在字符串字面量中
+                        cur.execute(";\n".join(cur.mogrify(sql, args) for sql, args in statements))
+                        results = [list(cur.fetchall())]
+                        while cur.nextset():
+                            results.append(list(cur.fetchall()))
+                return results
+            except DB_ERRORS as error:
+                ERROR.logger.error("数据库批量查询失败，失败原因 %s", error)
                 raise
 
         @classmethod
@@ -121,14 +219,15 @@ class SetUpMySQL(MysqlDB):
         try:
             data = {}
             if sql is not None:
-                for i in sql:
+                # 前置 sql 在同一个事务中依次执行，任意一条失败则整体回滚；
+                # sql 中直接拼接了缓存数据，不使用允许多条 sql 的连接
+                with self.transaction():
+                    results = [list(self.query(i)) for i in sql]
+                for i, rows in zip(sql, results):
                     # 判断断言类型为查询类型的时候，
-                    if i[0:6].upper() == 'SELECT':
-                        sql_date = self.query(sql=i)[0]
-                        for key, value in sql_date.items():
+                    if i.strip()[0:6].upper() == 'SELECT':
+                        for key, value in rows[0].items():
                             data[key] = value
-                    else:
-                        self.execute(sql=i)
             return data
         except IndexError as exc:
             raise DataAcquisitionFailed("sql 数据查询失败，请检查setup_sql语句是否正确") from exc
@@ -150,15 +249,14 @@ class AssertExecution(MysqlDB):
                 data = {}
                 _sql_type = ['UPDATE', 'update', 'DELETE', 'delete', 'INSERT', 'insert']
                 if any(i in sql for i in _sql_type) is False:
-                    for i in sql:
-                        # 判断sql中是否有正则，如果有则通过jsonpath提取相关的数据
-                        sql = sql_regular(i, resp)
-                        if sql is not None:
-                            # for 循环逐条处理断言 sql
-                            query_data = self.query(sql)[0]
-                            data = self.sql_data_handler(query_data, data)
-                        else:
-                            raise DataAcquisitionFailed(f"该条sql未查询出任何数据, {sql}")
+                    # 判断sql中是否有正则，如果有则通过jsonpath提取相关的数据，能参数化时作为参数传入
+                    statements = [sql_params(i, resp) or (sql_regular(i, resp), None) for i in sql]
+                    sql_list = [i[0] for i in statements]
+                    # 所有断言 sql 一次批量查询
+                    for _sql, rows in zip(sql_list, self.batch_query(statements)):
+                        if not rows:
+                            raise DataAcquisitionFailed(f"该条sql未查询出任何数据, {_sql}")
+                        data = self.sql_data_handler(rows[0], data)
                 else:
                     raise DataAcquisitionFailed("断言的 sql 必须是查询的 sql")
             else:
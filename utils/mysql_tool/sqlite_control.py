@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+SQLite 本地替身
+
+在没有 mysql 服务的环境中（本地调试、CI），将 mysql_db.driver 配置为 sqlite，
+MysqlDB 及其子类会通过本模块使用 SQLite，连接、游标的用法与 pymysql 保持一致：
+1) 游标返回字典格式的数据，对应 pymysql.cursors.DictCursor
+2) 支持 autocommit(bool)、ping()、commit()、rollback()
+3) 支持一次 execute 执行多条以分号分隔的 sql，通过 nextset() 依次读取每条 sql 的结果，
+   对应 pymysql 的 CLIENT.MULTI_STATEMENTS 批量执行
+4) 参数使用 pymysql 的 %s 占位符，执行时转换为 SQLite 的 ?
+"""
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+# 内存数据库需要在连接池的多个连接间共享
+MEMORY_DATABASE = "file:pytest_auto_api?mode=memory&cache=shared"
+
+_PYMYSQL_PARAM = re.compile(r"%([%s])")
+
+
+def split_statements(sql: Text) -> List[Text]:
+    """ 按分号拆分多条 sql，正确处理字符串中的分号 """
+    statements, buffer = [], ""
+    for char in sql:
+        buffer += char
+        if char == ";" and sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip()[:-1].strip())
+            buffer = ""
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return [i for i in statements if i]
+
+
+class SQLiteDictCursor:
+    """ 返回字典数据的游标，支持多结果集 """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._results: List[Tuple[List[Dict], int]] = []
+        self._rows: List[Dict] = []
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def execute(self, sql: Text, args: Optional[Any] = None) -> int:
+        """ 执行 sql，多条 sql 的结果依次放入结果集 """
+        self._results = []
+        if args is not None:
+            # 与 pymysql 一致，有参数时 %s 为占位符、%% 为 %
+            sql = _PYMYSQL_PARAM.sub(lambda m: "?" if m.group(1) == "s" else "%", sql)
+        cursor = self._conn.cursor()
+        try:
+            for statement in split_statements(sql):
+                cursor.execute(statement, args or ())
+                columns = [i[0] for i in cursor.description or ()]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()] if columns else []
+                self._results.append((rows, len(rows) if columns else cursor.rowcount))
+        finally:
+            cursor.close()
+        self.nextset()
+        return self.rowcount
+
+    def nextset(self) -> bool:
+        """ 切换到下一个结果集，没有更多结果集时返回 False """
+        if not self._results:
+            return False
+        self._rows, self.rowcount = self._results.pop(0)
+        return True
+
+    def fetchall(self) -> List[Dict]:
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self) -> Optional[Dict]:
+        return self._rows.pop(0) if self._rows else None
+
+    def close(self) -> None:
+        self._results, self._rows = [], []
+
+
+class SQLiteConnection:
+    """ 与 pymysql.Connection 用法一致的 SQLite 连接 """
+
+    def __init__(self, database: Text):
+        uri = database == MEMORY_DATABASE or database.startswith("file:")
+        # 连接由连接池在线程间复用，同一时间只会被一个线程借出
+        self._conn = sqlite3.connect(database, uri=uri, check_same_thread=False)
+
+    def cursor(self, cursor=None) -> "SQLiteDictCursor":
+        """ cursor 参数仅为兼容 pymysql 的写法，统一返回字典游标 """
+        return SQLiteDictCursor(self._conn)
+
+    def autocommit(self, value: bool) -> None:
+        self._conn.isolation_level = None if value else "DEFERRED"
+
+    def ping(self, reconnect: bool = False) -> None:
+        self._conn.execute("SELECT 1")
+
+    def commit(self) -> None:
+        self._conn.commit()
+
+    def rollback(self) -> None:
+        self._conn.rollback()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def connect(database: Optional[Text] = None) -> "SQLiteConnection":
+    """
+    新建 SQLite 连接
+    :param database: 数据库文件路径，为空或 :memory: 时使用进程内共享的内存数据库
+    """
+    if not database or database == ":memory:":
+        database = MEMORY_DATABASE
+    return SQLiteConnection(database)
@@ -14,9 +14,14 @@ from utils import config
 
 class SendEmail:
     """ 发送邮箱 """
-    def __init__(self, metrics: TestMetrics):
+    def __init__(self, metrics: TestMetrics, allure_data=None):
+        """
+        :param metrics: 用例执行数据
+        :param allure_data: 提供失败用例信息的对象，默认从 allure 报告中读取，
+                            也可以传入 AllureResultAggregator，不依赖 allure generate
+        """
         self.metrics = metrics
-        self.allure_data = AllureFileClean()
+        self.allure_data = allure_data or AllureFileClean()
         self.CaseDetail = self.allure_data.get_failed_cases_detail()
 
     @classmethod
@@ -71,7 +76,7 @@ class SendEmail:
             跳过用例个数: {self.metrics.skipped} 个
             成  功   率: {self.metrics.pass_rate} %
 
-        {self.allure_data.get_failed_cases_detail()}
+        {self.CaseDetail}
 
         **********************************
         jenkins地址：https://121.xx.xx.47:8989/login
@@ -3,35 +3,78 @@
 """
 # @Time   : 2022/4/7 17:53
 # @Author : 余少琪
+
+allure 报告的记录级别由 allure_level 配置：
+full: 记录所有步骤和附件
+failures: 步骤先暂存在内存中，只有用例失败时才写入报告
+minimal: 只记录不带附件的步骤
+附件文件由后台线程写入 report/tmp，测试会话结束前等待写入完成
 """
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, List, Optional, Set, Tuple
 import allure
-from utils.other_tools.models import AllureAttachmentType
+from allure_commons import hookimpl, plugin_manager
+from allure_commons.logger import AllureFileLogger
+from utils.logging_tool.log_control import WARNING
+from utils.other_tools.models import AllureAttachmentType, AllureLevel
 
+# allure 的步骤记录不是线程安全的，后台线程中的请求不写入报告
+_thread_local = threading.local()
 
-def allure_step(step: str, var: str) -> None:
+
+def disable_allure_in_thread() -> None:
+    """ 关闭当前线程的 allure 步骤记录，用于后台线程 """
+    _thread_local.disabled = True
+
+
+def _allure_disabled() -> bool:
+    return getattr(_thread_local, "disabled", False)
+
+
+def _allure_level() -> "AllureLevel":
+    from utils import config
+    return config.allure_level
+
+
+def _buffer() -> Optional[List[Tuple[Callable, Tuple]]]:
+    """ failures 级别下，当前用例暂存的步骤 """
+    return getattr(_thread_local, "buffer", None)
+
+
+def start_allure_buffer() -> None:
+    """ 用例开始执行，failures 级别下开始暂存步骤 """
+    _thread_local.buffer = [] if _allure_level() == AllureLevel.FAILURES else None
+
+
+def flush_allure_buffer(failed: bool) -> None:
     """
-    :param step: 步骤及附件名称
-    :param var: 附件内容
+    用例执行完成，失败时将暂存的步骤写入报告，否则丢弃
+    :param failed: 用例是否失败
     """
+    buffer = _buffer()
+    _thread_local.buffer = None
+    if failed and buffer:
+        for func, args in buffer:
+            func(*args)
+
+
+def _write_step(step: str, var: Any) -> None:
     with allure.step(step):
         allure.attach(
-            json.dumps(
-                str(var),
-                ensure_ascii=False,
-                indent=4),
+            _LazyBody(var) if _ATTACHMENT_WRITER.installed else _dumps(var),
             step,
             allure.attachment_type.JSON)
 
 
-def allure_attach(source: str, name: str, extension: str):
-    """
-    allure报告上传附件、图片、excel等
-    :param source: 文件路径，相当于传一个文件
-    :param name: 附件名称
-    :param extension: 附件的拓展名称
-    :return:
-    """
+def _write_step_no(step: str) -> None:
+    with allure.step(step):
+        pass
+
+
+def _write_attach(source: str, name: str, extension: str) -> None:
     # 获取上传附件的尾缀，判断对应的 attachment_type 枚举值
     _name = name.split('.')[-1].upper()
     _attachment_type = getattr(AllureAttachmentType, _name, None)
@@ -44,11 +87,155 @@ def allure_attach(source: str, name: str, extension: str):
     )
 
 
+def _record(func: Callable, *args) -> None:
+    """ 按当前记录级别写入或暂存步骤 """
+    if _allure_disabled():
+        return
+    buffer = _buffer()
+    if buffer is not None:
+        buffer.append((func, args))
+    else:
+        func(*args)
+
+
+def allure_step(step: str, var: str) -> None:
+    """
+    :param step: 步骤及附件名称
+    :param var: 附件内容
+    """
+    if _allure_level() == AllureLevel.MINIMAL:
+        return
+    _record(_write_step, step, var)
+
+
+def allure_attach(source: str, name: str, extension: str):
+    """
+    allure报告上传附件、图片、excel等
+    :param source: 文件路径，相当于传一个文件
+    :param name: 附件名称
+    :param extension: 附件的拓展名称
+    :return:
+    """
+    if _allure_level() == AllureLevel.MINIMAL:
+        return
+    _record(_write_attach, source, name, extension)
+
+
 def allure_step_no(step: str):
     """
     无附件的操作步骤
     :param step: 步骤名称
     :return:
     """
-    with allure.step(step):
-        pass
+    _record(_write_step_no, step)
+
+
+def _dumps(var: Any) -> str:
+    return json.dumps(str(var), ensure_ascii=False, indent=4)
+
+
+class _LazyBody:
+    """ 附件内容，在后台线程写文件时才序列化 """
+    __slots__ = ("var",)
+
+    def __init__(self, var: Any):
+        self.var = var
+
+
+class BackgroundFileLogger(AllureFileLogger):
+    """ allure 文件日志，附件交给 AttachmentWriter 在后台线程写入，其余内容与默认的文件日志一致 """
+
+    def __init__(self, report_dir: str, writer: "AttachmentWriter"):
+        super().__init__(report_dir)
+        self._writer = writer
+
+    @hookimpl
+    def report_attached_data(self, body, file_name):
+        self._writer.submit(super().report_attached_data, body, file_name)
+
+    @hookimpl
+    def report_attached_file(self, source, file_name):
+        self._writer.submit(super().report_attached_file, source, file_name)
+
+
+class AttachmentWriter:
+    """
+    后台写入 allure 附件
+    用 BackgroundFileLogger 替换 allure-pytest 注册的默认文件日志，测试会话结束时恢复
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self.installed = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: Set = set()
+        self._lock = threading.Lock()
+
+    def install(self, config) -> None:
+        """
+        在 allure-pytest 注册文件日志后调用
+        :param config: pytest 的 config 对象
+        """
+        report_dir = getattr(config.option, "allure_report_dir", None)
+        if self.installed or not report_dir:
+            return
+        default = next(
+            (i for i in plugin_manager.get_plugins() if type(i) is AllureFileLogger), None
+        )
+        if default is None:
+            return
+        name = plugin_manager.get_name(default)
+        plugin_manager.unregister(default)
+        logger = BackgroundFileLogger(os.path.abspath(report_dir), self)
+        plugin_manager.register(logger)
+        self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="allure")
+        self.installed = True
+
+        def restore():
+            # allure-pytest 退出时按原对象注销默认文件日志，需要先恢复注册
+            self.drain()
+            plugin_manager.unregister(logger)
+            plugin_manager.register(default, name)
+            self._executor.shutdown()
+            self.installed = False
+
+        config.add_cleanup(restore)
+
+    def submit(self, func: Callable, body_or_source: Any, file_name: str) -> None:
+        """ 提交附件写入任务 """
+        future = self._executor.submit(self._write, func, body_or_source, file_name)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._done)
+
+    @staticmethod
+    def _write(func: Callable, body_or_source: Any, file_name: str) -> None:
+        try:
+            if isinstance(body_or_source, _LazyBody):
+                body_or_source = _dumps(body_or_source.var)
+            func(body_or_source, file_name)
+        except Exception as error:  # noqa: BLE001
+            WARNING.logger.warning("allure 附件写入失败: %s, 失败原因: %s", file_name, error)
+
+    def _done(self, future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    def drain(self) -> None:
+        """ 等待所有附件写入完成 """
+        with self._lock:
+            futures = list(self._futures)
+        wait(futures)
+
+
+_ATTACHMENT_WRITER = AttachmentWriter()
+
+
+def install_attachment_writer(config) -> None:
+    """ 开启后台写入附件，需要在 allure-pytest 初始化之后调用 """
+    _ATTACHMENT_WRITER.install(config)
+
+
+def drain_attachment_writer() -> None:
+    """ 等待后台附件全部写入 report/tmp """
+    _ATTACHMENT_WRITER.drain()
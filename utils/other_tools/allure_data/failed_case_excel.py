@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+描述: 失败用例 Excel 报告（openpyxl 流式写入）
+
+与 ErrorCaseExcel 输出相同列的工作簿，区别在于：
+1) 直接读取 report/tmp 下的 allure 原始结果，不依赖 allure generate 生成的 report/html
+2) 使用 openpyxl 的 write_only 模式逐行写入，不需要 Excel 程序（xlwings），可以在 Linux 上运行，内存占用与失败用例数无关
+3) 请求信息按步骤名称查找，allure_level 不是 full 时缺少的附件回退到用例参数
+"""
+import ast
+import json
+import os
+from typing import Any, Dict, Iterator, Optional, Text, Tuple
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Font, PatternFill
+from common.setting import ensure_path_sep
+from utils.logging_tool.log_control import INFO, WARNING
+from utils.other_tools.allure_data.result_aggregator import AllureResultAggregator
+from utils.other_tools.models import TestMetrics
+from utils.notify.wechat_send import WeChatSend
+
+# Excel 单元格最多 32767 个字符
+_CELL_MAX_LENGTH = 32767
+_SHEET_NAME = "异常用例"
+_HEADERS = ["allureUid", "用例名称", "请求URL", "请求方式", "请求类型", "请求头",
+            "请求数据", "依赖数据", "预期数据", "sql", "响应耗时", "响应结果"]
+
+
+def _cell_value(value: Any) -> Text:
+    text = ILLEGAL_CHARACTERS_RE.sub("", str(value))
+    return text[:_CELL_MAX_LENGTH]
+
+
+class FailedCaseRow:
+    """ 从一条 allure 原始结果中提取失败用例的各列数据 """
+
+    def __init__(self, result: Dict, result_dir: Text):
+        self.result = result
+        self.result_dir = result_dir
+        self._steps = {}
+        for step in result.get("steps") or ():
+            # 存在依赖用例时会有多组请求步骤，只取最后一组
+            self._steps[(step.get("name") or "").split(":")[0]] = step
+        self._parameters = None
+
+    @property
+    def parameters(self) -> Dict:
+        """ 用例参数，即请求前的用例数据 """
+        if self._parameters is None:
+            self._parameters = {}
+            for i in self.result.get("parameters") or ():
+                try:
+                    value = ast.literal_eval(i.get("value"))
+                except (ValueError, SyntaxError, TypeError):
+                    continue
+                if isinstance(value, dict):
+                    self._parameters = value
+                    break
+        return self._parameters
+
+    def _step_text(self, name: Text) -> Optional[Text]:
+        step = self._steps.get(name)
+        if step is None:
+            return None
+        return step.get("name")[len(name) + 1:].strip()
+
+    def _step_attachment(self, name: Text) -> Any:
+        step = self._steps.get(name)
+        if step is None or not step.get("attachments"):
+            return None
+        path = os.path.join(self.result_dir, step["attachments"][0]["source"])
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def _request_value(self, step_name: Text, key: Text, attachment: bool = False) -> Any:
+        """ 用例执行异常时未发送请求，取请求前的数据，否则取请求步骤中的数据 """
+        if self.result.get("status") != "broken":
+            value = self._step_attachment(step_name) if attachment else self._step_text(step_name)
+            if value is not None:
+                return value
+        return self.parameters.get(key)
+
+    def case_name(self) -> Text:
+        name = self.result.get("name") or ""
+        return name.split("[", 1)[1][:-1] if "[" in name else name
+
+    def response(self) -> Any:
+        if self.result.get("status") == "broken":
+            return (self.result.get("statusDetails") or {}).get("message")
+        return self._step_attachment("响应结果")
+
+    def values(self) -> Tuple:
+        return (
+            self.result.get("uuid"),
+            self.case_name(),
+            self._request_value("请求URL", "url"),
+            self._request_value("请求方式", "method"),
+            self.parameters.get("requestType"),
+            self._request_value("请求头", "headers", attachment=True),
+            self._request_value("请求数据", "data", attachment=True),
+            self.parameters.get("dependence_case_data"),
+            self.parameters.get("assert_data"),
+            self.parameters.get("sql"),
+            str((self.result.get("stop") or 0) - (self.result.get("start") or 0)) + "ms",
+            self.response(),
+        )
+
+
+class FailedCaseExcel:
+    """ 收集运行失败的用例，流式写入 excel 报告 """
+
+    def __init__(self, result_dir: Text = None, file_path: Text = None, metrics: Optional[TestMetrics] = None):
+        """
+        :param result_dir: allure 原始结果目录，默认 report/tmp
+        :param file_path: excel 输出路径，默认 Files/自动化异常测试用例.xlsx
+        :param metrics: 企业微信通知中的执行统计，为空时根据原始结果统计
+        """
+        self.result_dir = result_dir or ensure_path_sep("\\report\\tmp")
+        self._file_path = file_path or ensure_path_sep("\\Files\\" + "自动化异常测试用例.xlsx")
+        self._template = ensure_path_sep("\\utils\\other_tools\\allure_data\\自动化异常测试用例.xlsx")
+        self.metrics = metrics
+
+    def _failed_results(self) -> Iterator[Dict]:
+        """
+        逐个返回失败用例的原始结果
+        先记录每条用例最后一次执行的结果文件，失败重跑成功的用例不再写入
+        """
+        latest: Dict[Text, Tuple[int, Text, bool]] = {}
+        if not os.path.isdir(self.result_dir):
+            return
+        with os.scandir(self.result_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith("-result.json"):
+                    continue
+                try:
+                    with open(entry.path, "rb") as file:
+                        result = json.loads(file.read())
+                except (OSError, ValueError) as error:
+                    WARNING.logger.warning("读取 allure 结果文件失败: %s, %s", entry.path, error)
+                    continue
+                history_id = result.get("historyId") or result.get("uuid") or entry.name
+                stop = result.get("stop") or 0
+                previous = latest.get(history_id)
+                if previous is None or previous[0] <= stop:
+                    latest[history_id] = (stop, entry.path, result.get("status") in ("failed", "broken"))
+
+        for _, path, failed in latest.values():
+            if not failed:
+                continue
+            with open(path, "rb") as file:
+                yield json.loads(file.read())
+
+    def _column_widths(self) -> Dict[Text, float]:
+        """ 沿用模板中的列宽 """
+        try:
+            sheet = load_workbook(self._template)[_SHEET_NAME]
+        except (OSError, KeyError):
+            return {}
+        return {k: v.width for k, v in sheet.column_dimensions.items() if v.width}
+
+    def write_excel(self) -> int:
+        """
+        写入失败用例
+        :return: 失败用例数
+        """
+        book = Workbook(write_only=True)
+        sheet = book.create_sheet(_SHEET_NAME)
+        for column, width in self._column_widths().items():
+            sheet.column_dimensions[column].width = width
+
+        header = []
+        for i in _HEADERS:
+            cell = WriteOnlyCell(sheet, value=i)
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill("solid", fgColor="DDEBF7")
+            header.append(cell)
+        sheet.append(header)
+
+        count = 0
+        for result in self._failed_results():
+            sheet.append([_cell_value(i) for i in FailedCaseRow(result, self.result_dir).values()])
+            count += 1
+        if count:
+            os.makedirs(os.path.dirname(self._file_path), exist_ok=True)
+            book.save(self._file_path)
+            INFO.logger.info("失败用例 excel 报告生成完成: %s, 失败用例数 %s", self._file_path, count)
+        else:
+            book.close()
+        return count
+
+    def write_case(self) -> None:
+        """ 生成失败用例 excel，有失败用例时发送企业微信 """
+        if self.write_excel() > 0:
+            metrics = self.metrics or AllureResultAggregator(self.result_dir).stop_watch()
+            WeChatSend(metrics).send_file_msg(self._file_path)
+
+
+if __name__ == '__main__':
+    FailedCaseExcel().write_case()
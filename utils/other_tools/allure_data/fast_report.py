@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+描述: 内置的轻量测试报告
+
+不依赖 java 和 allure 命令行，直接将 report/tmp 下的 allure 原始结果生成静态报告：
+1) 逐个读取 *-result.json，列表数据写入 data/rows.js，用例详情按批次写入 data/details-*.js，内存占用与用例数量基本无关
+2) 页面中的用例列表为虚拟滚动表格，只渲染可见的行，5 万条用例也能流畅滚动
+3) 点击用例时才加载该批次的详情，附件点击时才打开
+4) 同时输出与 allure widgets/summary.json 格式一致的统计数据，便于通知等模块复用
+
+使用方式：
+    python -m utils.other_tools.allure_data.fast_report --results ./report/tmp --output ./report/fast
+"""
+import argparse
+import functools
+import json
+import os
+import shutil
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Text
+from common.setting import ensure_path_sep
+from utils.logging_tool.log_control import INFO, WARNING
+
+STATUSES = ["passed", "failed", "broken", "skipped", "unknown"]
+# 每个详情文件包含的用例数
+DETAIL_CHUNK_SIZE = 500
+_MESSAGE_LENGTH = 300
+_TRACE_LENGTH = 5000
+
+
+def _dumps(data: Any) -> Text:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _label(result: Dict, name: Text) -> Optional[Text]:
+    for i in result.get("labels") or ():
+        if i.get("name") == name:
+            return i.get("value")
+    return None
+
+
+class FastReport:
+    """ 将 allure 原始结果生成静态 html 报告 """
+
+    def __init__(
+            self,
+            result_dir: Text = None,
+            output_dir: Text = None,
+            link_attachments: bool = True):
+        """
+        :param result_dir: allure 原始结果目录，默认 report/tmp
+        :param output_dir: 报告输出目录，默认 report/fast
+        :param link_attachments: 是否将附件硬链接（失败时复制）到报告目录，否则通过相对路径引用原始结果目录
+        """
+        self.result_dir = os.path.abspath(result_dir or ensure_path_sep("\\report\\tmp"))
+        self.output_dir = os.path.abspath(output_dir or ensure_path_sep("\\report\\fast"))
+        self.link_attachments = link_attachments
+        self._attachment_prefix = "attachments/" if link_attachments else \
+            os.path.relpath(self.result_dir, self.output_dir).replace(os.sep, "/") + "/"
+        # historyId -> (结束时间, 行数据)，失败重跑的用例只保留最后一次结果
+        self._rows: Dict[Text, tuple] = {}
+        self._details: Dict[int, Dict] = {}
+        self._detail_chunks = 0
+        self._start: Optional[int] = None
+        self._stop: Optional[int] = None
+
+    def _attachment(self, attachment: Dict) -> List:
+        source = attachment.get("source")
+        if self.link_attachments and source:
+            src = os.path.join(self.result_dir, source)
+            dst = os.path.join(self.output_dir, "attachments", source)
+            if not os.path.exists(dst):
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    try:
+                        shutil.copyfile(src, dst)
+                    except OSError as error:
+                        WARNING.logger.warning("复制 allure 附件失败: %s, %s", src, error)
+        return [attachment.get("name"), self._attachment_prefix + (source or ""), attachment.get("type")]
+
+    def _steps(self, steps: List[Dict]) -> List:
+        """ 步骤压缩为 [名称, 状态, 耗时, 附件, 子步骤] """
+        return [
+            [
+                i.get("name"),
+                i.get("status"),
+                (i.get("stop") or 0) - (i.get("start") or 0),
+                [self._attachment(a) for a in i.get("attachments") or ()],
+                self._steps(i.get("steps") or ())
+            ]
+            for i in steps
+        ]
+
+    def add_result(self, pid: int, result: Dict) -> None:
+        """ 统计一条用例结果，详情暂存到当前批次 """
+        status = result.get("status") or "unknown"
+        start, stop = result.get("start") or 0, result.get("stop") or 0
+        details = result.get("statusDetails") or {}
+        message = details.get("message") or ""
+        suite = _label(result, "feature") or _label(result, "suite") or _label(result, "parentSuite") or ""
+        row = (
+            pid,
+            result.get("name"),
+            STATUSES.index(status) if status in STATUSES else STATUSES.index("unknown"),
+            stop - start,
+            suite,
+            message[:_MESSAGE_LENGTH]
+        )
+        history_id = result.get("historyId") or result.get("uuid") or str(pid)
+        previous = self._rows.get(history_id)
+        if previous is None or previous[0] <= stop:
+            self._rows[history_id] = (stop, row)
+
+        if start:
+            self._start = start if self._start is None else min(self._start, start)
+        if stop:
+            self._stop = stop if self._stop is None else max(self._stop, stop)
+
+        self._details[pid] = {
+            "name": result.get("name"),
+            "fullName": result.get("fullName"),
+            "status": status,
+            "start": start,
+            "duration": stop - start,
+            "message": message,
+            "trace": (details.get("trace") or "")[:_TRACE_LENGTH],
+            "labels": {i.get("name"): i.get("value") for i in result.get("labels") or ()},
+            "parameters": [[i.get("name"), i.get("value")] for i in result.get("parameters") or ()],
+            "steps": self._steps(result.get("steps") or ()),
+            "attachments": [self._attachment(a) for a in result.get("attachments") or ()],
+        }
+        if len(self._details) >= DETAIL_CHUNK_SIZE:
+            self._flush_details()
+
+    def _flush_details(self) -> None:
+        if not self._details:
+            return
+        path = os.path.join(self.output_dir, "data", f"details-{self._detail_chunks}.js")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(f"window.fastReport.details({self._detail_chunks},{_dumps(self._details)});")
+        self._detail_chunks += 1
+        self._details = {}
+
+    def summary(self) -> Dict:
+        """ 与 allure widgets/summary.json 格式一致的统计数据 """
+        statistic = {i: 0 for i in STATUSES}
+        for _, row in self._rows.values():
+            statistic[STATUSES[row[2]]] += 1
+        statistic["total"] = len(self._rows)
+        duration = (self._stop - self._start) if self._start and self._stop else 0
+        return {
+            "reportName": "Test Report",
+            "statistic": statistic,
+            "time": {"start": self._start, "stop": self._stop, "duration": duration}
+        }
+
+    def generate(self) -> Dict:
+        """
+        生成报告
+        :return: 统计数据
+        """
+        begin = time.perf_counter()
+        if os.path.isdir(self.output_dir):
+            shutil.rmtree(self.output_dir)
+        os.makedirs(os.path.join(self.output_dir, "data"))
+        if self.link_attachments:
+            os.makedirs(os.path.join(self.output_dir, "attachments"))
+
+        pid = 0
+        if os.path.isdir(self.result_dir):
+            with os.scandir(self.result_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith("-result.json"):
+                        continue
+                    try:
+                        with open(entry.path, "rb") as file:
+                            result = json.loads(file.read())
+                    except (OSError, ValueError) as error:
+                        WARNING.logger.warning("读取 allure 结果文件失败: %s, %s", entry.path, error)
+                        continue
+                    # 详情按解析顺序分批，pid 同时决定详情所在的文件
+                    self.add_result(pid, result)
+                    pid += 1
+        self._flush_details()
+
+        rows = sorted((row for _, row in self._rows.values()), key=lambda i: (-(i[2] in (1, 2)), i[1] or ""))
+        with open(os.path.join(self.output_dir, "data", "rows.js"), "w", encoding="utf-8") as file:
+            file.write(f"window.fastReport.rows({_dumps(rows)});")
+
+        summary = self.summary()
+        os.makedirs(os.path.join(self.output_dir, "widgets"), exist_ok=True)
+        with open(os.path.join(self.output_dir, "widgets", "summary.json"), "w", encoding="utf-8") as file:
+            file.write(_dumps(summary))
+        with open(os.path.join(self.output_dir, "index.html"), "w", encoding="utf-8") as file:
+            file.write(_HTML.replace("__SUMMARY__", _dumps(summary))
+                       .replace("__STATUSES__", _dumps(STATUSES))
+                       .replace("__CHUNK__", str(DETAIL_CHUNK_SIZE)))
+        INFO.logger.info(
+            "测试报告生成完成: %s, 用例数 %s, 耗时 %.2f s",
+            os.path.join(self.output_dir, "index.html"), summary["statistic"]["total"], time.perf_counter() - begin
+        )
+        return summary
+
+
+def generate_report(result_dir: Text = None, output_dir: Text = None, link_attachments: bool = True) -> Dict:
+    """ 生成内置测试报告，返回统计数据 """
+    return FastReport(result_dir, output_dir, link_attachments).generate()
+
+
+def serve_report(output_dir: Text = None, host: Text = "127.0.0.1", port: int = 9999) -> None:
+    """ 启动静态文件服务查看报告，替代 allure serve """
+    output_dir = os.path.abspath(output_dir or ensure_path_sep("\\report\\fast"))
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=output_dir)
+    with ThreadingHTTPServer((host, port), handler) as server:
+        INFO.logger.info("测试报告访问地址: http://%s:%s/index.html", host, port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+_HTML = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>测试报告</title>
+<style>
+body{font-family:-apple-system,"Segoe UI","PingFang SC","Microsoft YaHei",sans-serif;margin:0;color:#333;font-size:13px}
+header{padding:12px 20px;background:#2c3e50;color:#fff;display:flex;gap:24px;align-items:center;flex-wrap:wrap}
+header b{font-size:18px}.stat{cursor:pointer;padding:2px 8px;border-radius:3px}.stat.off{opacity:.4}
+.passed{color:#2e9e4f}.failed{color:#e04141}.broken{color:#d9a400}.skipped{color:#888}.unknown{color:#8e44ad}
+header .passed,header .failed,header .broken,header .skipped,header .unknown{background:#fff}
+#bar{padding:8px 20px;border-bottom:1px solid #ddd}#bar input{width:360px;padding:4px}
+#main{display:flex;height:calc(100vh - 100px)}
+#list{flex:1;overflow-y:auto;position:relative;border-right:1px solid #ddd}
+#detail{flex:1;overflow-y:auto;padding:12px 20px}
+.row{position:absolute;left:0;right:0;height:28px;line-height:28px;padding:0 10px;white-space:nowrap;overflow:hidden;
+text-overflow:ellipsis;cursor:pointer;border-bottom:1px solid #f0f0f0;box-sizing:border-box}
+.row:hover,.row.sel{background:#eef4fb}.row span{display:inline-block}
+.row .st{width:60px}.row .du{width:70px;text-align:right;margin-right:10px;color:#888}
+.step{margin-left:16px}.step>div{padding:2px 0}pre{white-space:pre-wrap;background:#f7f7f7;padding:8px;max-height:400px;overflow:auto}
+a{color:#2070c0}
+</style>
+</head>
+<body>
+<header><b>测试报告</b><span id="stats"></span><span id="time"></span></header>
+<div id="bar"><input id="search" placeholder="按用例名称、模块、失败原因搜索"> <span id="count"></span></div>
+<div id="main"><div id="list"><div id="spacer"></div></div><div id="detail">点击左侧用例查看详情</div></div>
+<script>
+var SUMMARY=__SUMMARY__,STATUSES=__STATUSES__,CHUNK=__CHUNK__,ROW=28;
+var all=[],view=[],off={},selected=null,chunks={},waiting={};
+window.fastReport={
+  rows:function(r){all=r;filter();},
+  details:function(i,d){chunks[i]=d;(waiting[i]||[]).forEach(function(f){f();});delete waiting[i];}
+};
+function esc(s){return String(s==null?"":s).replace(/[&<>"]/g,function(c){return{"&":"&amp;","<":"&lt;",">":"&gt;",'"':"&quot;"}[c];});}
+function renderStats(){
+  var s=SUMMARY.statistic,h="总计 "+s.total+" ";
+  STATUSES.forEach(function(k,i){if(s[k])h+='<span class="stat '+k+(off[i]?" off":"")+'" data-i="'+i+'">'+k+" "+s[k]+"</span> ";});
+  if(s.total)h+=" 通过率 "+((s.passed+s.skipped)/s.total*100).toFixed(2)+"%";
+  document.getElementById("stats").innerHTML=h;
+  document.getElementById("time").textContent="耗时 "+(SUMMARY.time.duration/1000).toFixed(2)+" s";
+}
+document.getElementById("stats").onclick=function(e){var i=e.target.getAttribute("data-i");if(i!==null){off[i]=!off[i];renderStats();filter();}};
+document.getElementById("search").oninput=function(){filter();};
+function filter(){
+  var q=document.getElementById("search").value.toLowerCase();
+  view=all.filter(function(r){return !off[r[2]]&&(!q||((r[1]||"")+" "+r[4]+" "+r[5]).toLowerCase().indexOf(q)>=0);});
+  document.getElementById("count").textContent="显示 "+view.length+" / "+all.length;
+  document.getElementById("spacer").style.height=view.length*ROW+"px";
+  document.getElementById("list").scrollTop=0;render();
+}
+var list=document.getElementById("list"),pool=[];
+list.onscroll=function(){render();};
+function render(){
+  var first=Math.max(0,Math.floor(list.scrollTop/ROW)-10),n=Math.ceil(list.clientHeight/ROW)+20;
+  for(var k=0;k<n;k++){
+    var el=pool[k];
+    if(!el){el=pool[k]=document.createElement("div");el.className="row";list.appendChild(el);el.onclick=function(){show(this._r);};}
+    var r=view[first+k];
+    if(!r){el.style.display="none";continue;}
+    el.style.display="";el.style.top=(first+k)*ROW+"px";el._r=r;
+    el.className="row"+(selected===r[0]?" sel":"");
+    el.innerHTML='<span class="st '+STATUSES[r[2]]+'">'+STATUSES[r[2]]+'</span><span class="du">'+r[3]+' ms</span>'+esc(r[1])+' <span class="skipped">'+esc(r[4])+"</span>";
+  }
+}
+function loadChunk(i,cb){
+  if(chunks[i])return cb();
+  if(waiting[i])return waiting[i].push(cb);
+  waiting[i]=[cb];var s=document.createElement("script");s.src="data/details-"+i+".js";document.body.appendChild(s);
+}
+function attachments(list){
+  return list.map(function(a){return '<div>&#128206; <a href="'+esc(a[1])+'" target="_blank">'+esc(a[0]||a[1])+"</a></div>";}).join("");
+}
+function steps(list){
+  return list.map(function(s){return '<div class="step"><div><span class="'+esc(s[1])+'">&#9679;</span> '+esc(s[0])+
+    ' <span class="skipped">'+s[2]+" ms</span></div>"+attachments(s[3])+steps(s[4])+"</div>";}).join("");
+}
+function show(r){
+  selected=r[0];render();
+  loadChunk(Math.floor(r[0]/CHUNK),function(){
+    var d=chunks[Math.floor(r[0]/CHUNK)][r[0]],h="<h3 class='"+d.status+"'>"+esc(d.name)+"</h3>";
+    h+="<div>"+esc(d.fullName)+"</div><div>状态: "+d.status+"，耗时 "+d.duration+" ms</div>";
+    if(d.message)h+="<pre class='failed'>"+esc(d.message)+"</pre>";
+    if(d.trace)h+="<details><summary>堆栈</summary><pre>"+esc(d.trace)+"</pre></details>";
+    if(d.parameters.length)h+="<h4>参数</h4>"+d.parameters.map(function(p){return "<pre>"+esc(p[0])+" = "+esc(p[1])+"</pre>";}).join("");
+    h+="<h4>步骤</h4>"+steps(d.steps)+attachments(d.attachments);
+    document.getElementById("detail").innerHTML=h;
+  });
+}
+renderStats();
+</script>
+<script src="data/rows.js"></script>
+</body>
+</html>
+"""
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="将 allure 原始结果生成内置测试报告")
+    parser.add_argument("--results", default=None, help="allure 原始结果目录，默认 report/tmp")
+    parser.add_argument("--output", default=None, help="报告输出目录，默认 report/fast")
+    parser.add_argument("--no-link-attachments", action="store_true", help="不复制附件，直接引用原始结果目录")
+    parser.add_argument("--serve", action="store_true", help="生成后启动静态文件服务")
+    parser.add_argument("--port", type=int, default=9999)
+    args = parser.parse_args()
+    generate_report(args.results, args.output, not args.no_link_attachments)
+    if args.serve:
+        serve_report(args.output, port=args.port)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+描述: 增量统计 allure 原始结果
+
+直接读取 pytest 写入 report/tmp 的 *-result.json，不需要等待 allure generate：
+1) update() 只读取上次之后新写入的结果文件，可以在用例执行期间由后台线程定时调用
+2) 内存中只保留计数和最近的失败用例（数量受 max_failures 限制）
+3) 同一条用例多次执行（失败重跑）时，以最后一次结果为准；去重用的每条用例最后一次结果
+   存放在临时 SQLite 库中（关闭连接后自动删除），只占用有上限的页缓存，内存占用与用例总数无关
+4) 输出与 AllureFileClean 一致的 TestMetrics 和失败用例信息，用于执行结束后立即发送通知
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Text, Tuple
+from common.setting import ensure_path_sep
+from utils.logging_tool.log_control import WARNING
+from utils.other_tools.models import TestMetrics
+
+# 文件修改时间的精度误差，在该范围内的文件通过文件名去重
+_MTIME_SLACK = 2.0
+_STATUSES = ("passed", "failed", "broken", "skipped")
+
+
+class AllureResultAggregator:
+    """ allure 原始结果的增量统计 """
+
+    def __init__(
+            self,
+            result_dir: Text = None,
+            max_failures: int = 200,
+            since: Optional[float] = None):
+        """
+        :param result_dir: allure 原始结果目录，默认 report/tmp
+        :param max_failures: 保留的失败用例条数
+        :param since: 只统计该时间之后写入的结果，用于忽略上一次执行留下的文件
+        """
+        self.result_dir = result_dir or ensure_path_sep("\\report\\tmp")
+        self.max_failures = max_failures
+        self.counter = Counter()
+        # historyId -> (结束时间, 状态)，用于失败重跑时以最后一次结果为准
+        # 数据量随用例数增长，放在临时库中，database 为空字符串时 SQLite 使用关闭后即删除的磁盘临时文件
+        self._latest = sqlite3.connect("", check_same_thread=False, isolation_level=None)
+        self._latest.execute(
+            "CREATE TABLE latest (history_id TEXT PRIMARY KEY, stop INTEGER NOT NULL, status TEXT NOT NULL)"
+        )
+        # historyId -> (用例名称, 用例路径, 状态, 失败原因)
+        self.failures: "OrderedDict[Text, Tuple[Text, Text, Text, Text]]" = OrderedDict()
+        self.start: Optional[int] = None
+        self.stop: Optional[int] = None
+        self._watermark = since or 0.0
+        # 修改时间处于误差范围内、已经统计过的文件
+        self._recent: Dict[Text, float] = {}
+        self._lock = threading.RLock()
+        self._watch_thread: Optional[threading.Thread] = None
+        self._watch_stop = threading.Event()
+
+    def add_result(self, data: Dict) -> None:
+        """ 统计一条用例结果 """
+        with self._lock:
+            self._add_result(data)
+
+    def _add_result(self, data: Dict) -> None:
+        status = data.get("status") or "unknown"
+        history_id = str(data.get("historyId") or data.get("uuid"))
+        stop = data.get("stop") or 0
+        previous = self._latest.execute(
+            "SELECT stop, status FROM latest WHERE history_id = ?", (history_id,)
+        ).fetchone()
+        if previous is not None:
+            # 只保留最后一次执行结果
+            if previous[0] > stop:
+                return
+            self.counter[previous[1]] -= 1
+            self.failures.pop(history_id, None)
+        self._latest.execute(
+            "INSERT OR REPLACE INTO latest (history_id, stop, status) VALUES (?, ?, ?)",
+            (history_id, stop, status)
+        )
+        self.counter[status] += 1
+
+        if status in ("failed", "broken"):
+            message = (data.get("statusDetails") or {}).get("message") or ""
+            self.failures[history_id] = (data.get("name"), data.get("fullName"), status, message[:500])
+            while len(self.failures) > self.max_failures:
+                self.failures.popitem(last=False)
+
+        start = data.get("start")
+        if start is not None:
+            self.start = start if self.start is None else min(self.start, start)
+        if stop:
+            self.stop = stop if self.stop is None else max(self.stop, stop)
+
+    def update(self) -> int:
+        """
+        读取新写入的结果文件
+        :return: 本次新统计的用例数
+        """
+        with self._lock:
+            if not os.path.isdir(self.result_dir):
+                return 0
+            scan_time = time.time()
+            count = 0
+            with os.scandir(self.result_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith("-result.json"):
+                        continue
+                    try:
+                        mtime = entry.stat().st_mtime
+                    except FileNotFoundError:
+                        continue
+                    if mtime < self._watermark - _MTIME_SLACK or entry.name in self._recent:
+                        continue
+                    try:
+                        with open(entry.path, "r", encoding="utf-8") as file:
+                            data = json.load(file)
+                    except (OSError, ValueError) as error:
+                        WARNING.logger.warning("读取 allure 结果文件失败: %s, %s", entry.path, error)
+                        continue
+                    self.add_result(data)
+                    self._recent[entry.name] = mtime
+                    count += 1
+            self._watermark = scan_time
+            self._recent = {
+                k: v for k, v in self._recent.items() if v >= scan_time - _MTIME_SLACK
+            }
+            return count
+
+    def start_watch(self, interval: float = 1.0) -> None:
+        """ 启动后台线程，定时读取新写入的结果 """
+        if self._watch_thread is not None:
+            return
+
+        def _watch():
+            while not self._watch_stop.wait(interval):
+                self.update()
+
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(target=_watch, name="allure-aggregator", daemon=True)
+        self._watch_thread.start()
+
+    def stop_watch(self) -> "TestMetrics":
+        """ 停止后台线程，读取剩余的结果并返回统计数据 """
+        if self._watch_thread is not None:
+            self._watch_stop.set()
+            self._watch_thread.join()
+            self._watch_thread = None
+        self.update()
+        return self.get_case_count()
+
+    @property
+    def total(self) -> int:
+        return sum(self.counter.values())
+
+    def get_case_count(self) -> "TestMetrics":
+        """ 统计用例数量，与 AllureFileClean.get_case_count 结果一致 """
+        total = self.total
+        data = {i: self.counter[i] for i in _STATUSES}
+        data["total"] = total
+        if total > 0:
+            data["pass_rate"] = round((data["passed"] + data["skipped"]) / total * 100, 2)
+        else:
+            data["pass_rate"] = 0.0
+        duration = (self.stop - self.start) if self.start is not None and self.stop is not None else 0
+        data["time"] = round(duration / 1000, 2)
+        return TestMetrics(**data)
+
+    def get_failed_case(self) -> List[Tuple[Text, Text]]:
+        """ 获取失败的用例标题和用例代码路径 """
+        return [(i[0], i[1]) for i in self.failures.values()]
+
+    def get_failed_cases_detail(self) -> Text:
+        """ 返回失败的测试用例相关内容 """
+        date = self.get_failed_case()
+        values = ""
+        if len(date) >= 1:
+            values = "失败用例:\n"
+            values += "        **********************************\n"
+            for i in date:
+                values += "        " + str(i[0]) + ":" + str(i[1]) + "\n"
+            hidden = self.counter["failed"] + self.counter["broken"] - len(date)
+            if hidden > 0:
+                values += f"        ... 另有 {hidden} 条失败用例未列出\n"
+        return values
@@ -31,6 +31,15 @@ class AssertTypeError(MyBaseFailure):
     pass
 
 
+class AssertionFailures(MyBaseFailure, AssertionError):
+    """ 断言计划中的多条断言同时失败，汇总所有失败信息 """
+
+    def __init__(self, failures):
+        self.failures = failures
+        message = "\n".join(f"[{key}] {type(error).__name__}: {error}" for key, error in failures)
+        super().__init__(f"共 {len(failures)} 条断言失败:\n{message}")
+
+
 class DataAcquisitionFailed(MyBaseFailure):
     pass
 
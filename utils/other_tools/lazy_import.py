@@ -0,0 +1,35 @@
+"""
+模块延迟导入
+
+openai、LangChain 等依赖导入耗时较长，api_server、FunctionGraph 入口通过 lazy_module 引用这些模块，
+模块在第一次访问属性时才真正导入，服务冷启动时不再加载；依赖缺失等导入错误也推迟到第一次使用时抛出
+"""
+
+import importlib
+import importlib.util
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """
+    模块代理，访问属性时通过 importlib 导入真实模块。
+    多个线程同时第一次访问时由导入锁保证只导入一次，且只会拿到导入完成的模块
+    """
+
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self.__name__), attr)
+
+    def __repr__(self):
+        return f"<lazy module {self.__name__!r}>"
+
+
+def lazy_module(name: str) -> ModuleType:
+    """
+    返回延迟导入的模块
+
+    Args:
+        name: 模块的完整路径，如 utils.parse.ai
+    """
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    return LazyModule(name)
@@ -106,6 +106,7 @@ class CurrentRequestSetCache(BaseModel):
 
 
 class TestCase(BaseModel):
+    case_id: Optional[Text] = None
     url: Text
     method: Text
     detail: Text
@@ -124,6 +125,8 @@ class TestCase(BaseModel):
     teardown: Union[List["TearDown"], None] = None
     current_request_set_cache: Optional[List["CurrentRequestSetCache"]] = None
     sleep: Optional[Union[int, float]] = None
+    # 流式断言模式，适用于超大响应，只保留断言、缓存中用到的字段
+    stream: Optional[bool] = False
 
 
 class ResponseData(BaseModel):
@@ -156,6 +159,41 @@ class MySqlDB(BaseModel):
     user: Union[Text, None] = None
     password: Union[Text, None] = None
     port: Union[int, None] = 3306
+    # 连接池最大连接数
+    pool_size: int = 10
+    # 连接池耗尽时等待连接归还的最长时间（秒）
+    pool_timeout: Union[int, float] = 30
+    # 连接空闲超过该时长（秒）后，借出前先做健康检查
+    ping_interval: Union[int, float] = 30
+    # 同一用例的多条断言 sql 是否参数化后批量执行（一次网络往返）
+    batch_sql: bool = True
+    # mysql 或 sqlite，sqlite 为本地替身，用于没有 mysql 服务的环境
+    driver: Text = "mysql"
+    # driver 为 sqlite 时的数据库文件路径，为空时使用内存数据库
+    database: Union[Text, None] = None
+
+
+class DeferredTeardown(BaseModel):
+    # 开启后，后置请求、后置 sql 放入后台线程池执行，不阻塞用例
+    switch: bool = False
+    # 后台执行清理任务的线程数
+    max_workers: int = 4
+    # 排队中的最大清理任务数，超出时等待
+    max_pending: int = 1000
+
+
+class EventLog(BaseModel):
+    # 开启后，每个请求写入一行 json 格式的结构化日志
+    switch: bool = False
+    path: Text = "logs/events.jsonl"
+    # 单个文件最大字节数，超出后滚动，保留 backup_count 个历史文件
+    max_bytes: int = 50 * 1024 * 1024
+    backup_count: int = 5
+    # 成功请求的采样率 0~1，失败的请求全部记录
+    success_sample_rate: float = 1.0
+    # 请求体、响应体的记录方式：none 不记录、truncate 截断、hash 只记录 sha256
+    body_mode: Text = "truncate"
+    body_max_length: int = 2000
 
 
 class Webhook(BaseModel):
@@ -170,6 +208,26 @@ class Email(BaseModel):
     send_list: Union[Text, None]
 
 
+@unique
+class AllureLevel(Enum):
+    """ allure 报告记录级别 """
+    # 记录所有步骤和附件
+    FULL = "full"
+    # 只有用例失败时才写入步骤和附件
+    FAILURES = "failures"
+    # 只记录不带附件的步骤
+    MINIMAL = "minimal"
+
+
+@unique
+class ReportEngine(Enum):
+    """ html 测试报告的生成方式 """
+    # 调用 allure 命令行生成，需要安装 java
+    ALLURE = "allure"
+    # 使用内置的轻量报告，不依赖 java
+    FAST = "fast"
+
+
 class Config(BaseModel):
     project_name: Text
     env: Text
@@ -183,6 +241,12 @@ class Config(BaseModel):
     email: "Email"
     lark: "Webhook"
     real_time_update_test_cases: bool = False
+    deferred_teardown: "DeferredTeardown" = DeferredTeardown()
+    # 请求日志中请求体、响应体的最大长度，超出部分截断，0 为不限制
+    log_body_max_length: int = 10000
+    event_log: "EventLog" = EventLog()
+    allure_level: "AllureLevel" = AllureLevel.FULL
+    report_engine: "ReportEngine" = ReportEngine.ALLURE
     host: Text
     app_host: Union[Text, None]
 
@@ -236,3 +300,4 @@ class AssertMethod(Enum):
     contained_by = 'contained_by'
     startswith = 'startswith'
     endswith = 'endswith'
+    schema = 'schema'
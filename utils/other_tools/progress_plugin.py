@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+描述: pytest 执行进度事件插件
+
+设置环境变量 PYTEST_PROGRESS_PATH 后，每条用例执行完成时向该文件追加一行 json，api_server 读取后通过 SSE 推送给前端：
+{"event": "session_start", "ts": ..., "pid": ...}
+{"event": "collected", "ts": ..., "total": 10}
+{"event": "test", "ts": ..., "nodeid": "...", "outcome": "passed", "duration": 0.12, "message": null}
+{"event": "session_finish", "ts": ..., "exitstatus": 1, "passed": 8, "failed": 2, ...}
+
+通过 PYTEST_ADDOPTS="-p utils.other_tools.progress_plugin" 加载，pytest 子进程中再启动的 pytest 也会生效
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Text, Tuple
+
+PROGRESS_ENV = "PYTEST_PROGRESS_PATH"
+_MESSAGE_LENGTH = 500
+
+
+class ProgressReporter:
+    """ 将用例执行结果逐条写入进度文件 """
+
+    def __init__(self, path: Text):
+        self.path = path
+        self.counter = Counter()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # 追加写入，多个 pytest 进程可以写入同一个文件
+        self._file = open(path, "a", encoding="utf-8")
+
+    def emit(self, event: Text, **data) -> None:
+        data = {"event": event, "ts": round(time.time(), 3), **data}
+        line = json.dumps(data, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    @staticmethod
+    def _message(report) -> Optional[Text]:
+        if report.passed:
+            return None
+        if report.skipped and isinstance(report.longrepr, tuple):
+            return str(report.longrepr[2])[:_MESSAGE_LENGTH]
+        crash = getattr(report.longrepr, "reprcrash", None)
+        if crash is not None:
+            return crash.message[:_MESSAGE_LENGTH]
+        text = report.longreprtext or ""
+        return text.strip().splitlines()[-1][:_MESSAGE_LENGTH] if text.strip() else None
+
+    def pytest_sessionstart(self, session) -> None:
+        self.emit("session_start", pid=os.getpid())
+
+    def pytest_collection_finish(self, session) -> None:
+        self.emit("collected", total=len(session.items))
+
+    def pytest_runtest_logreport(self, report) -> None:
+        # 只上报用例执行阶段，以及 setup、teardown 阶段的失败和 setup 阶段的跳过
+        if report.when == "call":
+            outcome = report.outcome
+        elif report.failed:
+            outcome = "error"
+        elif report.when == "setup" and report.skipped:
+            outcome = "skipped"
+        else:
+            return
+        if hasattr(report, "wasxfail"):
+            outcome = "xfailed" if report.skipped else "xpassed"
+        self.counter[outcome] += 1
+        self.emit(
+            "test",
+            nodeid=report.nodeid,
+            outcome=outcome,
+            when=report.when,
+            duration=round(report.duration, 3),
+            message=self._message(report)
+        )
+
+    def pytest_sessionfinish(self, session, exitstatus) -> None:
+        self.emit("session_finish", exitstatus=int(exitstatus), **self.counter)
+        self._file.close()
+
+
+def pytest_configure(config) -> None:
+    path = os.environ.get(PROGRESS_ENV)
+    # pytest-xdist 的 worker 中不上报，由主进程统一上报
+    if not path or hasattr(config, "workerinput"):
+        return
+    config.pluginmanager.register(ProgressReporter(path), "progress_reporter")
+
+
+def read_progress(path: Text, offset: int = 0) -> Tuple[List[Dict], int]:
+    """
+    从 offset 处读取新写入的完整事件行
+    :return: (事件列表, 新的 offset)
+    """
+    events = []
+    if not os.path.exists(path):
+        return events, offset
+    with open(path, "rb") as file:
+        file.seek(offset)
+        data = file.read()
+    # 最后一行可能还没写完
+    end = data.rfind(b"\n") + 1
+    for line in data[:end].splitlines():
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            continue
+    return events, offset + end
+
+
+def summarize_progress(path: Text) -> Optional[Dict]:
+    """
+    汇总进度文件中的用例结果，同一条用例多次执行时以最后一次为准
+    :return: 与 api_server 中 _parse_pytest_output 相同格式的指标，以及失败用例列表；没有用例结果时返回 None
+    """
+    events, _ = read_progress(path)
+    latest: Dict[Text, Dict] = {}
+    for event in events:
+        if event.get("event") == "test":
+            latest[event["nodeid"]] = event
+    if not latest:
+        return None
+    counter = Counter(i["outcome"] for i in latest.values())
+    duration = sum(i.get("duration") or 0 for i in latest.values())
+    failed_tests = [
+        {
+            "file": i["nodeid"].split("::")[0],
+            "test_name": i["nodeid"].split("::")[-1],
+            "error": i.get("message") or "测试失败（详细信息请查看完整输出）"
+        }
+        for i in latest.values() if i["outcome"] in ("failed", "error")
+    ]
+    if duration < 1:
+        duration_human = f"{duration * 1000:.0f}ms"
+    elif duration < 60:
+        duration_human = f"{duration:.2f}s"
+    else:
+        duration_human = f"{int(duration // 60)}m {duration % 60:.2f}s"
+    return {
+        "metrics": {
+            "total": len(latest),
+            "passed": counter["passed"] + counter["xpassed"],
+            "failed": counter["failed"],
+            "broken": counter["error"],
+            "skipped": counter["skipped"] + counter["xfailed"],
+            "unknown": 0,
+            "duration_ms": int(duration * 1000) if duration > 0 else None,
+            "duration_human": duration_human if duration > 0 else None,
+        },
+        "failed_tests": failed_tests,
+    }
@@ -0,0 +1,412 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+描述: 预热的 pytest 执行进程
+
+每次执行用例都启动一个新的 python -m pytest，需要重新导入 pytest、allure、requests、pydantic 等依赖，
+用例本身只需要几百毫秒时，启动耗时占了大部分。
+
+这里启动一个常驻的预热进程，提前导入框架，通过本地 Unix socket 接收 "执行这些 pytest 参数" 的任务：
+- 每个任务从预热进程 fork 出一个子进程执行 pytest.main，已导入的依赖直接复用
+- 用例池（test_case 包）不预加载，每个任务在子进程中重新读取 data 目录，新增、修改的 yaml 用例立即生效
+- 任务之间互不影响：用例中修改的缓存、全局变量都只存在于各自的子进程中，执行完成即退出
+- 环境变量、工作目录、stdout/stderr 按任务分别设置，与启动新的 pytest 子进程时的行为一致
+- 同时执行的任务数不超过 size，超过时等待
+
+设置环境变量 PYTEST_WORKER_POOL=<同时执行的任务数> 开启，popen_pytest 在开启时使用预热进程，
+未开启、不支持 fork 的平台（Windows）或不是 pytest 命令时，仍然使用 subprocess.Popen
+"""
+import importlib
+import os
+import select
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Optional, Sequence, Text, Tuple
+
+POOL_ENV = "PYTEST_WORKER_POOL"
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 预热进程中提前导入的模块；test_case 导入时会加载用例池，不能预加载，否则用例池停留在服务启动时的状态
+PRELOAD_MODULES = (
+    "pytest",
+    "allure",
+    "allure_pytest.plugin",
+    "requests",
+    "yaml",
+    "pydantic",
+    "utils.other_tools.config.model_config",
+    "utils.cache_process.redis_control",
+)
+
+_STARTED = "started"
+_EXITED = "exited"
+
+
+def is_pytest_command(cmd: Sequence[Text]) -> bool:
+    """ 是否为 [python, -m, pytest, ...] 形式的命令 """
+    return len(cmd) >= 3 and list(cmd[1:3]) == ["-m", "pytest"]
+
+
+class PoolProcess:
+    """ 预热进程中执行的 pytest 任务，接口与 subprocess.Popen 一致 """
+
+    def __init__(
+            self,
+            pool: "PytestWorkerPool",
+            conn: Connection,
+            args: List[Text],
+            stdout_path: Optional[Text],
+            stderr_path: Optional[Text],
+            text: bool,
+            encoding: Optional[Text],
+            errors: Optional[Text]):
+        self.args = args
+        self.returncode: Optional[int] = None
+        self._pool = pool
+        self._conn = conn
+        self._stdout_path = stdout_path
+        self._stderr_path = stderr_path
+        self._text = text or encoding is not None or errors is not None
+        self._encoding = encoding or "utf-8"
+        self._errors = errors or "strict"
+        self._killed = False
+        self._lock = threading.Lock()
+        # 子进程 fork 完成后先返回 pid
+        _, self.pid = conn.recv()
+
+    def _finish(self, returncode: int) -> None:
+        self.returncode = returncode
+        self._conn.close()
+        self._pool.release()
+
+    def poll(self) -> Optional[int]:
+        return self.wait(timeout=0) if self.returncode is None else self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        """
+        等待任务结束
+        :param timeout: 超时时间，为 0 时不等待；超时抛出 subprocess.TimeoutExpired
+        """
+        with self._lock:
+            if self.returncode is not None:
+                return self.returncode
+            if not self._conn.poll(timeout):
+                if timeout == 0:
+                    return None
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            try:
+                _, returncode = self._conn.recv()
+            except (EOFError, OSError):
+                # 子进程被结束，没有返回退出码
+                returncode = -signal.SIGKILL if self._killed else -1
+            self._finish(returncode)
+            return self.returncode
+
+    def _read(self, path: Optional[Text]):
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, "rb") as file:
+            data = file.read()
+        return data.decode(self._encoding, self._errors) if self._text else data
+
+    def communicate(self, timeout: Optional[float] = None) -> Tuple[Any, Any]:
+        self.wait(timeout)
+        stdout = self._read(self._stdout_path)
+        stderr = self._read(self._stderr_path) if self._stderr_path != self._stdout_path else None
+        for path in {self._stdout_path, self._stderr_path} - {None}:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return stdout, stderr
+
+    def send_signal(self, sig: int) -> None:
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self._killed = True
+        self.send_signal(signal.SIGKILL)
+
+
+class PytestWorkerPool:
+    """ 预热进程的客户端，线程安全 """
+
+    def __init__(self, size: int = 4, preload: Sequence[Text] = PRELOAD_MODULES, start_timeout: float = 120):
+        """
+        :param size: 同时执行的任务数
+        :param preload: 预热进程中提前导入的模块
+        :param start_timeout: 等待预热进程启动完成的最长时间
+        """
+        self.size = size
+        self.preload = list(preload)
+        self.start_timeout = start_timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._server: Optional[subprocess.Popen] = None
+        self._tmp_dir: Optional[Text] = None
+        self._address: Optional[Text] = None
+
+    def start(self) -> None:
+        """ 启动预热进程，等待模块导入完成；已经在运行时不做处理 """
+        with self._lock:
+            if self._server is not None and self._server.poll() is None:
+                return
+            self._tmp_dir = tempfile.mkdtemp(prefix="pytest-pool-")
+            self._address = os.path.join(self._tmp_dir, "pool.sock")
+            env = os.environ.copy()
+            env["PYTHONIOENCODING"] = "utf-8"
+            env["PYTHONUTF8"] = "1"
+            env.pop(POOL_ENV, None)
+            self._server = subprocess.Popen(
+                [sys.executable, "-m", "utils.other_tools.pytest_worker_pool",
+                 "--serve", self._address, *self.preload],
+                # 父进程退出后 stdin 关闭，预热进程随之退出
+                stdin=subprocess.PIPE,
+                cwd=ROOT,
+                env=env
+            )
+            deadline = time.monotonic() + self.start_timeout
+            while True:
+                try:
+                    self._connect().close()
+                    return
+                except OSError:
+                    if self._server.poll() is not None:
+                        raise RuntimeError(f"pytest 预热进程启动失败，退出码: {self._server.returncode}")
+                    if time.monotonic() > deadline:
+                        self.close()
+                        raise RuntimeError("pytest 预热进程启动超时")
+                    time.sleep(0.05)
+
+    def _connect(self) -> Connection:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self._address)
+        except OSError:
+            sock.close()
+            raise
+        return Connection(sock.detach())
+
+    def release(self) -> None:
+        self._slots.release()
+
+    def popen(
+            self,
+            cmd: Sequence[Text],
+            cwd: Optional[Text] = None,
+            env: Optional[Dict[Text, Text]] = None,
+            stdout: Optional[int] = None,
+            stderr: Optional[int] = None,
+            text: bool = False,
+            encoding: Optional[Text] = None,
+            errors: Optional[Text] = None,
+            **kwargs) -> PoolProcess:
+        """
+        执行 pytest 命令，参数与 subprocess.Popen 相同
+        stdout/stderr 只支持 None（输出到预热进程的控制台）、subprocess.PIPE 和 stderr=subprocess.STDOUT，
+        其余 Popen 参数（如 stdin）忽略，任务中 stdin 始终为空
+        """
+        if not is_pytest_command(cmd):
+            raise ValueError(f"不是 pytest 命令: {cmd}")
+        self.start()
+        self._slots.acquire()
+        try:
+            stdout_path = stderr_path = None
+            if stdout == subprocess.PIPE:
+                fd, stdout_path = tempfile.mkstemp(prefix="stdout-", dir=self._tmp_dir)
+                os.close(fd)
+            if stderr == subprocess.STDOUT:
+                stderr_path = stdout_path
+            elif stderr == subprocess.PIPE:
+                fd, stderr_path = tempfile.mkstemp(prefix="stderr-", dir=self._tmp_dir)
+                os.close(fd)
+            conn = self._connect()
+            conn.send({
+                "args": list(cmd[3:]),
+                "cwd": os.path.abspath(cwd or os.getcwd()),
+                "env": dict(os.environ if env is None else env),
+                "stdout": stdout_path,
+                "stderr": stderr_path,
+            })
+            return PoolProcess(self, conn, list(cmd), stdout_path, stderr_path, text, encoding, errors)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def close(self) -> None:
+        """ 结束预热进程，正在执行的任务不受影响 """
+        with self._lock:
+            if self._server is not None:
+                if self._server.poll() is None:
+                    self._server.stdin.close()
+                    try:
+                        self._server.wait(timeout=5)
+                    except subprocess.TimeoutExpired:
+                        self._server.kill()
+                self._server = None
+            if self._tmp_dir:
+                shutil.rmtree(self._tmp_dir, ignore_errors=True)
+                self._tmp_dir = None
+
+
+_pool: Optional[PytestWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> Optional[PytestWorkerPool]:
+    """ 根据环境变量 PYTEST_WORKER_POOL 创建进程内共用的预热进程，未开启或不支持 fork 时返回 None """
+    global _pool
+    try:
+        size = int(os.environ.get(POOL_ENV) or 0)
+    except ValueError:
+        size = 0
+    if size <= 0 or not hasattr(os, "fork"):
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = PytestWorkerPool(size)
+            import atexit
+            atexit.register(_pool.close)
+        return _pool
+
+
+def popen_pytest(cmd: Sequence[Text], **kwargs):
+    """ 替代 subprocess.Popen：开启预热进程且是 pytest 命令时在预热进程中执行，否则启动新的子进程 """
+    pool = get_pool()
+    if pool is not None and is_pytest_command(cmd):
+        try:
+            return pool.popen(cmd, **kwargs)
+        except (OSError, RuntimeError) as error:
+            from utils.logging_tool.log_control import WARNING
+            WARNING.logger.warning(f"pytest 预热进程不可用，改为启动新的子进程: {error}")
+    return subprocess.Popen(cmd, **kwargs)
+
+
+# ---------------- 以下在预热进程中执行 ----------------
+
+
+def _refresh_event_sink() -> None:
+    """ 结构化日志在模块导入时根据环境变量创建，任务的环境变量不同时需要重新创建 """
+    event_sink = sys.modules.get("utils.logging_tool.event_sink")
+    if event_sink is None:
+        return
+    old = event_sink.EVENT_SINK
+    new = event_sink._create_sink()
+    # 其他模块通过 from ... import EVENT_SINK 引用，一并替换
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, "__dict__", None) or {}
+        if "EVENT_SINK" in namespace and namespace["EVENT_SINK"] is old:
+            namespace["EVENT_SINK"] = new
+
+
+def _redirect(path: Optional[Text], fd: int) -> None:
+    if path is None:
+        return
+    target = os.open(path, os.O_WRONLY | os.O_APPEND)
+    os.dup2(target, fd)
+    os.close(target)
+
+
+def _run_job(job: Dict[Text, Any]) -> int:
+    """ fork 出的子进程中执行一次 pytest.main """
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    _redirect(job["stdout"], 1)
+    _redirect(job["stderr"], 2)
+    os.environ.clear()
+    os.environ.update(job["env"])
+    os.chdir(job["cwd"])
+    # 与 python -m pytest 相同，工作目录和 PYTHONPATH 加入 sys.path
+    paths = [job["cwd"]] + [i for i in job["env"].get("PYTHONPATH", "").split(os.pathsep) if i]
+    sys.path[:0] = [i for i in paths if i not in sys.path]
+    sys.argv = ["pytest", *job["args"]]
+    _refresh_event_sink()
+    import pytest
+    # 预加载的插件（allure_pytest、faker）已经导入，pytest 无法再改写其中的 assert，忽略对应的提示
+    args = ["-W", "ignore::pytest.PytestAssertRewriteWarning", *job["args"]]
+    try:
+        return int(pytest.main(args))
+    finally:
+        log_control = sys.modules.get("utils.logging_tool.log_control")
+        if log_control is not None:
+            log_control.flush_logs()
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def _serve_one(server: socket.socket) -> None:
+    sock, _ = server.accept()
+    conn = Connection(sock.detach())
+    try:
+        job = conn.recv()
+    except (EOFError, OSError):
+        conn.close()
+        return
+    if os.fork() != 0:
+        conn.close()
+        return
+    # 子进程
+    returncode = 1
+    try:
+        server.close()
+        conn.send((_STARTED, os.getpid()))
+        returncode = _run_job(job)
+    except SystemExit as exit_error:
+        returncode = exit_error.code if isinstance(exit_error.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            conn.send((_EXITED, returncode))
+        finally:
+            os._exit(returncode & 0xff)
+
+
+def serve(address: Text, preload: Sequence[Text]) -> None:
+    """ 预热进程入口：导入模块后监听 address，stdin 关闭时退出 """
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except Exception as error:
+            print(f"[WARN] 预加载模块失败 {name}: {error}", file=sys.stderr)
+    # 子进程退出后自动回收，不产生僵尸进程
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(address)
+    server.listen(64)
+    while True:
+        readable, _, _ = select.select([server, sys.stdin], [], [])
+        if sys.stdin in readable and not os.read(sys.stdin.fileno(), 1024):
+            break
+        if server in readable:
+            _serve_one(server)
+    server.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="pytest 预热进程")
+    parser.add_argument("--serve", required=True, help="监听的 Unix socket 路径")
+    parser.add_argument("preload", nargs="*", default=list(PRELOAD_MODULES), help="提前导入的模块")
+    cli_args = parser.parse_args()
+    serve(cli_args.serve, cli_args.preload)
@@ -32,14 +32,16 @@ except ImportError:
     sys.exit(1)
 
 # 导入 run.py 中使用的模块
-from utils.other_tools.models import NotificationType
+from utils.other_tools.models import NotificationType, ReportEngine
 from utils.other_tools.allure_data.allure_report_data import AllureFileClean
+from utils.other_tools.allure_data.result_aggregator import AllureResultAggregator
+from utils.other_tools.allure_data.fast_report import generate_report, serve_report
 from utils.logging_tool.log_control import INFO
 from utils.notify.wechat_send import WeChatSend
 from utils.notify.ding_talk import DingTalkSendMsg
 from utils.notify.send_mail import SendEmail
 from utils.notify.lark import FeiShuTalkChatBot
-from utils.other_tools.allure_data.error_case_excel import ErrorCaseExcel
+from utils.other_tools.allure_data.failed_case_excel import FailedCaseExcel
 from utils.other_tools.allure_config_helper import ensure_allure_properties_file
 from utils import config
 
@@ -184,6 +186,10 @@ class FeishuTestRunner:
         print("=" * 60)
 
         try:
+            if config.report_engine == ReportEngine.FAST:
+                summary = generate_report("./report/tmp", "./report/fast")
+                print(f"✓ 内置 HTML 报告生成成功: ./report/fast/index.html, 用例数 {summary['statistic']['total']}")
+                return
             os.system(r"allure generate ./report/tmp -o ./report/html --clean")
             print("✓ Allure HTML 报告生成成功")
         except Exception as e:
@@ -197,8 +203,11 @@ class FeishuTestRunner:
         print("=" * 60)
 
         try:
-            # 获取测试统计数据
-            allure_data = AllureFileClean().get_case_count()
+            # 获取测试统计数据，内置报告不生成 report/html，直接统计原始结果
+            if config.report_engine == ReportEngine.FAST:
+                allure_data = AllureResultAggregator("./report/tmp").stop_watch()
+            else:
+                allure_data = AllureFileClean().get_case_count()
             print(f"✓ 测试统计: 总计 {allure_data.total}, 通过 {allure_data.passed}, "
                   f"失败 {allure_data.failed}, 跳过 {allure_data.skipped}")
 
@@ -226,7 +235,7 @@ class FeishuTestRunner:
             # 生成 Excel 报告（如果配置了）
             if config.excel_report:
                 try:
-                    ErrorCaseExcel().write_case()
+                    FailedCaseExcel(metrics=allure_data).write_case()
                     print("✓ Excel 报告生成成功")
                 except Exception as e:
                     print(f"⚠ 警告: 生成 Excel 报告时出错: {e}")
@@ -250,7 +259,10 @@ class FeishuTestRunner:
         print("按 Ctrl+C 可停止服务器\n")
 
         try:
-            os.system("allure serve ./report/tmp -h 127.0.0.1 -p 9999")
+            if config.report_engine == ReportEngine.FAST:
+                serve_report("./report/fast", "127.0.0.1", 9999)
+            else:
+                os.system("allure serve ./report/tmp -h 127.0.0.1 -p 9999")
         except KeyboardInterrupt:
             print("\n\n用户中断，正在退出...")
         except Exception as e:
@@ -3,8 +3,9 @@
 Parse module for parsing various API documentation formats
 """
 
+import importlib
+
 from . import feishu_parse
-from . import ai
 
 # 注意：api_parser模块已移动到utils.smart_auto目录
 # 如果需要使用API解析功能，请从utils.smart_auto.api_parser导入
@@ -12,4 +13,12 @@ from . import ai
 __all__ = [
     'feishu_parse',
     'ai'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # ai 模块依赖 openai，导入较慢，第一次访问时再导入
+    # 不能写成 from . import ai：_handle_fromlist 会先 hasattr 本包，再次进入 __getattr__
+    if name == 'ai':
+        return importlib.import_module(f'{__name__}.ai')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
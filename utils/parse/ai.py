@@ -169,8 +169,8 @@ def call_bailian_api(prompt, system_prompt=None):
 #     print(f"OpenAPI 3.0 YAML文件已生成：{output_yaml_path}")
 #     return yaml_content
 
-def generate_openapi_yaml(json_paths, output_yaml_path):
-    """生成OpenAPI 3.0 YAML文件，重点优化发送消息接口的requestBody"""
+def _openapi_prompts(json_paths):
+    """生成OpenAPI文件的提示词，返回 (prompt, system_prompt)"""
     api_json_data = read_json_files(json_paths)
 
     # 构建针对发送消息接口的提示
@@ -205,7 +205,11 @@ def generate_openapi_yaml(json_paths, output_yaml_path):
 5. 对于发送消息接口，必须按照用户要求完整保留所有消息类型及其对应的content结构，不遗漏任何类型；
 6. 仅返回YAML内容，不包含任何额外解释、说明文字或代码块标记。"""
 
-    yaml_content = call_bailian_api(prompt, system_prompt)
+    return prompt, system_prompt
+
+
+def _save_openapi_yaml(yaml_content, output_yaml_path):
+    """校验大模型返回的YAML并写入文件"""
     if not yaml_content:
         raise Exception("未能从百炼API获取有效的YAML内容")
 
@@ -225,6 +229,12 @@ def generate_openapi_yaml(json_paths, output_yaml_path):
     return yaml_content
 
 
+def generate_openapi_yaml(json_paths, output_yaml_path):
+    """生成OpenAPI 3.0 YAML文件，重点优化发送消息接口的requestBody"""
+    prompt, system_prompt = _openapi_prompts(json_paths)
+    return _save_openapi_yaml(call_bailian_api(prompt, system_prompt), output_yaml_path)
+
+
 # def generate_api_relation_file(json_paths, output_relation_path):
 #     """
 #     生成接口关联关系文件（JSON格式）
@@ -441,11 +451,8 @@ def generate_openapi_yaml(json_paths, output_yaml_path):
 #     print(f"接口关联关系文件已生成：{output_relation_path}")
 #     return relation_json
 
-def generate_api_relation_file(openapi_file_paths, output_relation_path):
-    """
-    生成简化版接口关联关系文件
-    仅输出：关联的OpenAPI文件（仅保留文件名）、接口路径、关联参数
-    """
+def _relation_prompts(openapi_file_paths):
+    """生成接口关联关系文件的提示词，返回 (prompt, system_prompt)"""
     # 读取所有OpenAPI文件内容，并仅保留文件名
     openapi_data = []
     for openapi_path in openapi_file_paths:
@@ -511,8 +518,11 @@ def generate_api_relation_file(openapi_file_paths, output_relation_path):
 2. 隐式关联：同名同类型参数在不同接口的输入输出中形成的映射关系。
 分析时需特别关注路径参数（in:path）的关联，确保单个文件内的接口关联也能被识别。输出必须极简，仅保留核心关联信息，文件名仅含纯文件名。"""
 
-    # 调用API生成简化关联关系
-    relation_content = call_bailian_api(prompt, system_prompt)
+    return prompt, system_prompt
+
+
+def _save_relation_file(relation_content, output_relation_path):
+    """修正大模型返回的关联关系中的文件名并写入文件"""
     if not relation_content:
         raise Exception("未能生成简化版接口关联关系内容")
 
@@ -550,11 +560,19 @@ def generate_api_relation_file(openapi_file_paths, output_relation_path):
     print(f"接口关联关系文件已生成：{output_relation_path}")
     return relation_json
 
-def generate_business_scene_file(json_paths, output_scene_path):
+
+def generate_api_relation_file(openapi_file_paths, output_relation_path):
     """
-    生成业务场景文件（JSON格式）
-    包含：核心业务场景、场景描述、接口调用组合、测试关注点
+    生成简化版接口关联关系文件
+    仅输出：关联的OpenAPI文件（仅保留文件名）、接口路径、关联参数
     """
+    # 调用API生成简化关联关系
+    prompt, system_prompt = _relation_prompts(openapi_file_paths)
+    return _save_relation_file(call_bailian_api(prompt, system_prompt), output_relation_path)
+
+
+def _scene_prompts(json_paths):
+    """生成业务场景文件的提示词，返回 (prompt, system_prompt)"""
     api_json_data = read_json_files(json_paths)
 
     prompt = f"""请分析以下接口JSON数据，生成业务场景文件（仅返回JSON内容，无其他解释）：
@@ -600,8 +618,11 @@ def generate_business_scene_file(json_paths, output_scene_path):
 5. 仅返回标准JSON格式，无任何额外文字、注释或标记；
 6. 确保JSON语法合法，可直接被JSON.parse解析。"""
 
-    # 调用API生成业务场景
-    scene_content = call_bailian_api(prompt, system_prompt)
+    return prompt, system_prompt
+
+
+def _save_scene_file(scene_content, output_scene_path):
+    """校验大模型返回的业务场景JSON并写入文件"""
     if not scene_content:
         raise Exception("未能生成业务场景内容")
 
@@ -621,6 +642,16 @@ def generate_business_scene_file(json_paths, output_scene_path):
     return scene_json
 
 
+def generate_business_scene_file(json_paths, output_scene_path):
+    """
+    生成业务场景文件（JSON格式）
+    包含：核心业务场景、场景描述、接口调用组合、测试关注点
+    """
+    # 调用API生成业务场景
+    prompt, system_prompt = _scene_prompts(json_paths)
+    return _save_scene_file(call_bailian_api(prompt, system_prompt), output_scene_path)
+
+
 
 def process_url_with_ai(url, output_dir, force_regenerate=False):
     """
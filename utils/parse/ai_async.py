@@ -0,0 +1,185 @@
+"""
+AI 解析的异步实现，供 ASGI 服务模式使用
+
+流程与 ai.py 中的 process_url_with_ai 相同，区别在于：
+- 飞书文档通过 httpx 异步下载
+- OpenAPI、关联关系、业务场景三次大模型调用通过 AsyncOpenAI 并发等待，不再各占一个线程
+- 提示词构建、结果校验和文件读写放到线程池中执行，事件循环不被阻塞
+"""
+
+import os
+import json
+import shutil
+import asyncio
+import functools
+import tempfile
+import weakref
+from datetime import datetime
+from urllib.parse import urlparse
+
+import httpx
+from openai import AsyncOpenAI
+
+from . import ai
+from .feishu_parse import transform_feishu_url
+
+# 文件类型 -> (构建提示词, 校验并保存结果)
+GENERATORS = {
+    'openapi': (ai._openapi_prompts, ai._save_openapi_yaml),
+    'relation': (ai._relation_prompts, ai._save_relation_file),
+    'scene': (ai._scene_prompts, ai._save_scene_file),
+}
+
+FEISHU_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'application/json'
+}
+
+# AsyncOpenAI 内部的连接池绑定事件循环，每个事件循环复用一个客户端
+_clients = weakref.WeakKeyDictionary()
+
+
+async def run_sync(func, *args, **kwargs):
+    """在线程池中执行同步函数（文件读写、JSON/YAML 解析等）"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+
+def _client() -> AsyncOpenAI:
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = AsyncOpenAI(api_key=ai.ACCESS_KEY, base_url=ai.BAILIAN_API_URL)
+    return client
+
+
+async def acall_bailian_api(prompt, system_prompt=None):
+    """call_bailian_api 的异步版本，失败时返回 None"""
+    try:
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        completion = await _client().chat.completions.create(
+            model=ai.BAILIAN_MODEL,
+            messages=messages,
+            temperature=0.1,
+            max_tokens=4096
+        )
+
+        content = completion.choices[0].message.content.strip()
+        return content.replace("```json", "").replace("```yaml", "").replace("```", "").strip()
+
+    except Exception as e:
+        print(f"调用百炼API错误：{e}")
+        return None
+
+
+async def agenerate_file(file_type, json_paths, output_path):
+    """生成 openapi / relation / scene 文件，返回解析后的内容"""
+    build, save = GENERATORS[file_type]
+    prompt, system_prompt = await run_sync(build, json_paths)
+    content = await acall_bailian_api(prompt, system_prompt)
+    return await run_sync(save, content, output_path)
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def _afetch_json_data(normalized_url, json_path):
+    """获取接口文档数据，飞书文档异步下载，本地文件和其他 URL 沿用 ai.py 的实现"""
+    if 'feishu.cn' not in urlparse(normalized_url).netloc:
+        return await run_sync(ai._fetch_json_data, normalized_url, json_path)
+
+    if await run_sync(os.path.exists, json_path):
+        return await run_sync(_read_json, json_path)
+    download_url, _ = transform_feishu_url(normalized_url)
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            response = await client.get(download_url, headers=FEISHU_HEADERS)
+            response.raise_for_status()
+        data = response.json()
+    except Exception as e:
+        raise Exception(f"无法下载飞书文档: {normalized_url}, 错误: {str(e)}")
+    await run_sync(_write_json, json_path, data)
+    return data
+
+
+def _prepare_dirs(output_dir, paths):
+    for sub_dir in ('json', 'openapi', 'relation', 'scene'):
+        os.makedirs(os.path.join(output_dir, sub_dir), exist_ok=True)
+    return all(os.path.exists(path) for path in paths)
+
+
+async def aprocess_url_with_ai(url, output_dir, force_regenerate=False):
+    """
+    process_url_with_ai 的异步版本
+
+    Args:
+        url (str): 要处理的飞书URL
+        output_dir (str): 输出目录
+        force_regenerate (bool): 是否强制重新生成所有文件，即使已存在
+
+    Returns:
+        dict: 包含生成文件内容和路径的字典
+    """
+    try:
+        normalized_url = ai._normalize_url(url)
+        file_key = ai._create_file_key_from_url(normalized_url)
+
+        json_output_path = os.path.join(output_dir, 'json', f"json_{file_key}.json")
+        output_paths = {
+            'openapi': os.path.join(output_dir, 'openapi', f"openapi_{file_key}.yaml"),
+            'relation': os.path.join(output_dir, 'relation', f"relation_{file_key}.json"),
+            'scene': os.path.join(output_dir, 'scene', f"scene_{file_key}.json"),
+        }
+        read_existing = functools.partial(
+            ai._read_existing_files,
+            output_paths['openapi'], output_paths['relation'], output_paths['scene'], url, file_key
+        )
+
+        files_exist = await run_sync(_prepare_dirs, output_dir, [json_output_path, *output_paths.values()])
+        if files_exist and not force_regenerate:
+            print(f"使用缓存文件: {file_key}")
+            return await run_sync(read_existing)
+
+        print(f"开始处理: {url}")
+        json_data = await _afetch_json_data(normalized_url, json_output_path)
+
+        temp_dir = await run_sync(tempfile.mkdtemp)
+        try:
+            temp_filepath = os.path.join(temp_dir, "data.json")
+            await run_sync(_write_json, temp_filepath, json_data)
+            results = await asyncio.gather(
+                *(agenerate_file(name, [temp_filepath], path) for name, path in output_paths.items()),
+                return_exceptions=True
+            )
+        finally:
+            await run_sync(shutil.rmtree, temp_dir, ignore_errors=True)
+
+        for name, result in zip(output_paths, results):
+            if isinstance(result, BaseException):
+                print(f"生成 {name} 文件失败: {str(result)}")
+                await run_sync(ai._cleanup_partial_files, *output_paths.values())
+                raise Exception(f"生成 {name} 文件失败: {str(result)}")
+            print(f"生成 {name} 文件完成")
+
+        return await run_sync(read_existing)
+
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e),
+            'message': 'AI解析失败',
+            'url': url,
+            'timestamp': datetime.now().isoformat()
+        }
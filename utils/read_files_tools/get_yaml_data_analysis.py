@@ -42,6 +42,7 @@ class CaseData:
             # 公共配置中的数据，与用例数据不同，需要单独处理
             if key != 'case_common':
                 case_date = {
+                    'case_id': key,
                     'method': self.get_case_method(case_id=key, case_data=values),
                     'is_run': self.get_is_run(key, values),
                     'url': self.get_case_host(case_id=key, case_data=values),
@@ -58,6 +59,7 @@ class CaseData:
                     "teardown": self.tear_down(values),
                     "teardown_sql": self.teardown_sql(values),
                     "sleep": self.time_sleep(values),
+                    "stream": self.stream(values),
                 }
                 if case_id_switch is True:
                     case_lists.append({key: TestCase(**case_date).dict()})
@@ -391,6 +393,11 @@ class CaseData:
         except KeyError:
             return None
 
+    @classmethod
+    def stream(cls, case_data: Dict) -> bool:
+        """ 是否开启流式断言 """
+        return bool(case_data.get('stream', False))
+
 
 class GetTestCase:
 
@@ -6,6 +6,7 @@ Desc : 自定义函数调用
 import re
 import datetime
 import random
+from functools import lru_cache
 from datetime import date, timedelta, datetime
 from jsonpath import jsonpath
 from faker import Faker
@@ -109,10 +110,58 @@ class Context:
 
 def sql_json(js_path, res):
     """ 提取 sql中的 json 数据 """
-    _json_data = jsonpath(res, js_path)[0]
+    _json_data = jsonpath(res, js_path)
     if _json_data is False:
         raise ValueError(f"sql中的jsonpath获取失败 {res}, {js_path}")
-    return jsonpath(res, js_path)[0]
+    return _json_data[0]
+
+
+@lru_cache(maxsize=1024)
+def sql_template(value: str) -> tuple:
+    """
+    解析 sql 模板并缓存，相同的 sql 只解析一次
+    返回 (文本, jsonpath, 文本, jsonpath, ..., 文本)，奇数位为 $json(...)$ 中的 jsonpath
+    """
+    return tuple(re.split(r"\$json\((.*?)\)\$", value))
+
+
+@lru_cache(maxsize=1024)
+def sql_param_template(value: str):
+    """
+    将 sql 中的 $json(...)$ 转换为 %s 占位符并缓存，返回 (sql, jsonpath 列表)
+    占位符两侧紧挨的引号一并去掉，由驱动按参数类型转义；
+    $json(...)$ 位于字符串中间（如 LIKE '%$json(...)$%'）时无法参数化，返回 None
+    """
+    parts = list(sql_template(value))
+    sql, paths = parts[0].replace("%", "%%"), []
+    for index in range(1, len(parts), 2):
+        after = parts[index + 1]
+        # 已拼接的文本中引号个数为奇数时，占位符位于字符串中
+        quote = next((i for i in ("'", '"') if sql.count(i) % 2 == 1), None)
+        if quote is not None:
+            if not (sql.endswith(quote) and after.startswith(quote)):
+                return None
+            sql, after = sql[:-1], after[1:]
+        sql += "%s" + after.replace("%", "%%")
+        paths.append(parts[index])
+    return sql, paths
+
+
+def sql_params(value, res=None):
+    """
+    参数化处理 sql 中的依赖数据，响应中的值作为参数传给数据库驱动，不直接拼接到 sql 文本中
+    :return: (sql, 参数)，无法参数化时返回 None
+    """
+    template = sql_param_template(value)
+    if template is None:
+        return None
+    sql, paths = template
+    args = []
+    for i in paths:
+        data = sql_json(i, res)
+        # 与文本替换时保持一致，数字以外的值按字符串传入
+        args.append(data if isinstance(data, (int, float, str)) and not isinstance(data, bool) else str(data))
+    return sql, tuple(args)
 
 
 def sql_regular(value, res=None):
@@ -122,14 +171,13 @@ def sql_regular(value, res=None):
     :param value:
     :return:
     """
-    sql_json_list = re.findall(r"\$json\((.*?)\)\$", value)
-
-    for i in sql_json_list:
-        pattern = re.compile(r'\$json\(' + i.replace('$', "\$").replace('[', '\[') + r'\)\$')
-        key = str(sql_json(i, res))
-        value = re.sub(pattern, key, value, count=1)
-
-    return value
+    parts = sql_template(value)
+    if len(parts) == 1:
+        return value
+    return "".join(
+        part if index % 2 == 0 else str(sql_json(part, res))
+        for index, part in enumerate(parts)
+    )
 
 
 def cache_regular(value):
@@ -7,6 +7,7 @@ import json
 from typing import Text, Dict, Union, List
 from jsonpath import jsonpath
 from utils.requests_tool.request_control import RequestControl
+from utils.requests_tool.teardown_queue import TEARDOWN_QUEUE
 from utils.mysql_tool.mysql_control import SetUpMySQL
 from utils.read_files_tools.regular_control import regular, cache_regular
 from utils.other_tools.jsonpath_date_replace import jsonpath_replace
@@ -310,6 +311,9 @@ class DependentCase:
         jsonpath 和 依赖的数据,进行替换
         :return:
         """
+        if self.__yaml_case.dependence_case is True:
+            # 依赖用例可能用到延迟后置处理写入的缓存、数据，先等待清理任务完成
+            TEARDOWN_QUEUE.drain()
         _dependent_data = DependentCase(self.__yaml_case).is_dependent()
         _new_data = None
         # 判断有依赖
@@ -5,11 +5,13 @@
 # @Author : 余少琪
 """
 import ast
+import json
 import os
 import random
+import re
 import time
 import urllib
-from typing import Tuple, Dict, Union, Text
+from typing import Tuple, Dict, Union, Text, List
 import requests
 import urllib3
 from requests_toolbelt import MultipartEncoder
@@ -21,6 +23,7 @@ from utils.logging_tool.run_time_decorator import execution_duration
 from utils.other_tools.allure_data.allure_tools import allure_step, allure_step_no, allure_attach
 from utils.read_files_tools.regular_control import cache_regular
 from utils.requests_tool.set_current_request_cache import SetCurrentRequestCache
+from utils.assertion.stream_assert import stream_projection_text
 from utils.other_tools.models import TestCase, ResponseData
 from utils import config
 # from utils.requests_tool.encryption_algorithm_control import encryption
@@ -338,36 +341,68 @@ class RequestControl:
             return data
 
     @classmethod
-    def _sql_data_handler(cls, sql_data, res):
+    def _sql_data_handler(cls, sql_data, response_text: Text):
         """处理 sql 参数 """
         # 判断数据库开关，开启状态，则返回对应的数据
         if config.mysql_db.switch and sql_data is not None:
             sql_data = AssertExecution().assert_execution(
                 sql=sql_data,
-                resp=res.json()
+                resp=json.loads(response_text)
             )
 
         else:
             sql_data = {"sql": None}
         return sql_data
 
+    def _stream_jsonpaths(self) -> List[Text]:
+        """ 流式断言模式下，收集断言、缓存、后置处理、sql 中用到的响应 jsonpath """
+        # code、msg 用于飞书接口错误码检查
+        paths = ["$.code", "$.msg"]
+        assert_data = ast.literal_eval(cache_regular(str(self.__yaml_case.assert_data)))
+        for key, values in assert_data.items():
+            if key not in ("status_code", "feishu_code") and isinstance(values, dict):
+                paths.append(values['jsonpath'])
+        for i in self.__yaml_case.current_request_set_cache or []:
+            if i.type == 'response':
+                paths.append(cache_regular(i.jsonpath))
+        for teardown in self.__yaml_case.teardown or []:
+            for i in teardown.send_request or []:
+                if i.dependent_type == 'response':
+                    paths.append(cache_regular(i.jsonpath))
+        for sql in self.__yaml_case.sql or []:
+            paths.extend(re.findall(r"\$json\((.*?)\)\$", str(sql)))
+        return paths
+
+    def _response_text(self, res) -> Text:
+        """ 获取响应内容，流式断言模式下边读边解析，只保留用到的字段 """
+        if not self.__yaml_case.stream or self.__yaml_case.requestType == RequestType.EXPORT.value:
+            return res.text
+        res.raw.decode_content = True
+        try:
+            return stream_projection_text(res.raw, self._stream_jsonpaths())
+        finally:
+            res.close()
+
     def _check_params(
             self,
             res,
             yaml_data: "TestCase",
     ) -> "ResponseData":
         data = ast.literal_eval(cache_regular(str(yaml_data.data)))
+        response_text = self._response_text(res)
         _data = {
             "url": res.url,
             "is_run": yaml_data.is_run,
             "detail": yaml_data.detail,
-            "response_data": res.text,
+            "response_data": response_text,
             # 这个用于日志专用，判断如果是get请求，直接打印url
             "request_body": self._request_body_handler(
                 data, yaml_data.requestType
             ),
             "method": res.request.method,
-            "sql_data": self._sql_data_handler(sql_data=ast.literal_eval(cache_regular(str(yaml_data.sql))), res=res),
+            "sql_data": self._sql_data_handler(
+                sql_data=ast.literal_eval(cache_regular(str(yaml_data.sql))), response_text=response_text
+            ),
             "yaml_data": yaml_data,
             "headers": res.request.headers,
             "cookie": res.cookies,
@@ -434,6 +469,10 @@ class RequestControl:
             if dependent_switch is True:
                 DependentCase(self.__yaml_case).get_dependent_data()
 
+            # 流式断言模式，响应体不整体读入内存
+            if self.__yaml_case.stream and self.__yaml_case.requestType != RequestType.EXPORT.value:
+                kwargs['stream'] = True
+
             res = requests_type_mapping.get(self.__yaml_case.requestType)(
                 headers=self.__yaml_case.headers,
                 method=self.__yaml_case.method,
@@ -460,7 +499,7 @@ class RequestControl:
             SetCurrentRequestCache(
                 current_request_set_cache=self.__yaml_case.current_request_set_cache,
                 request_data=self.__yaml_case.data,
-                response_data=res
+                response_data=_res_data.response_data
             ).set_caches_main()
 
             return _res_data
@@ -25,7 +25,8 @@ class SetCurrentRequestCache:
     ):
         self.current_request_set_cache = current_request_set_cache
         self.request_data = {"data": request_data}
-        self.response_data = response_data.text
+        # 兼容直接传入响应文本（流式断言模式下只有投影后的响应内容）
+        self.response_data = response_data if isinstance(response_data, str) else response_data.text
 
     def set_request_cache(
             self,
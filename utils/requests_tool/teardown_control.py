@@ -9,9 +9,11 @@
 """
 import ast
 import json
-from typing import Dict, Text
+from functools import partial
+from typing import Dict, List, Text
 from jsonpath import jsonpath
 from utils.requests_tool.request_control import RequestControl
+from utils.requests_tool.teardown_queue import TEARDOWN_QUEUE
 from utils.read_files_tools.regular_control import cache_regular, sql_regular, regular
 from utils.other_tools.jsonpath_date_replace import jsonpath_replace
 from utils.mysql_tool.mysql_control import MysqlDB
@@ -81,6 +83,11 @@ class TearDownHandler:
         """
 
         test_case = cls.regular_testcase(teardown_case)
+        return cls.send_teardown_request(test_case)
+
+    @classmethod
+    def send_teardown_request(cls, test_case: Dict) -> "ResponseData":
+        """ 发送已完成数据替换的后置请求 """
         res = RequestControl(test_case).http_request(
             dependent_switch=False
         )
@@ -221,6 +228,22 @@ class TearDownHandler:
         后置请求处理
         @return:
         """
+        test_case = self.render_send_request(
+            data=data,
+            resp_data=resp_data,
+            request_data=request_data
+        )
+        self.teardown_http_requests(test_case)
+
+    def render_send_request(
+            self, data: "TearDown",
+            resp_data: Dict,
+            request_data: Dict
+    ) -> Dict:
+        """
+        替换后置请求中依赖的数据
+        @return: 替换完成的后置用例
+        """
         _send_request = data.send_request
         _case_id = data.case_id
         # _teardown_case = ast.literal_eval(Cache('case_process').get_cache())[_case_id]
@@ -242,8 +265,7 @@ class TearDownHandler:
                     request_data=request_data
                 )
 
-        test_case = self.regular_testcase(_teardown_case)
-        self.teardown_http_requests(test_case)
+        return self.regular_testcase(_teardown_case)
 
     def param_prepare_request_handler(
             self,
@@ -281,6 +303,9 @@ class TearDownHandler:
         一个是发送请求send_request
         @return:
         """
+        if config.deferred_teardown.switch:
+            self.deferred_teardown_handle()
+            return
         # 拿到用例信息
         _teardown_data = self._res.teardown
         # 获取接口的响应内容
@@ -304,15 +329,77 @@ class TearDownHandler:
                     )
         self.teardown_sql()
 
+    def deferred_teardown_handle(self) -> None:
+        """
+        延迟后置处理：数据替换在当前线程完成，发送请求、执行 sql 放入后台队列
+        param_prepare 的响应会写入缓存供后续步骤使用，因此仍然同步执行
+        """
+        _teardown_data = self._res.teardown
+        _resp_data = json.loads(self._res.response_data)
+        _request_data = self._res.yaml_data.data
+        # 同一条用例的后置 sql 排在其最后一个后置请求之后执行
+        resource = None
+        if _teardown_data is not None:
+            for _data in _teardown_data:
+                if _data.param_prepare is not None:
+                    self.param_prepare_request_handler(data=_data, resp_data=_resp_data)
+                elif _data.send_request is not None:
+                    test_case = self.render_send_request(
+                        data=_data,
+                        request_data=_request_data,
+                        resp_data=_resp_data
+                    )
+                    method = str(test_case.get('method', '')).upper()
+                    resource = (method, test_case.get('url'))
+                    TEARDOWN_QUEUE.submit(
+                        resource=resource,
+                        func=partial(self.send_teardown_request, test_case),
+                        description=f"{_data.case_id}: {method} {test_case.get('url')}",
+                        # 相同的删除请求只执行一次
+                        dedup_key=(resource, repr(test_case.get('data'))) if method == 'DELETE' else None
+                    )
+        self.deferred_teardown_sql(resource)
+
+    def deferred_teardown_sql(self, resource=None) -> None:
+        """ 后置 sql 放入后台队列，在同一个事务中执行 """
+        sql_data = self._res.teardown_sql
+        if sql_data is None:
+            return
+        if not config.mysql_db.switch:
+            for i in sql_data:
+                WARNING.logger.warning("程序中检查到您数据库开关为关闭状态，已为您跳过删除sql: %s", i)
+            return
+        _response_data = json.loads(self._res.response_data)
+        sql_list = tuple(
+            cache_regular(sql_regular(value=i, res=_response_data)) for i in sql_data
+        )
+        is_delete = all(i.strip()[0:6].upper() == 'DELETE' for i in sql_list)
+        TEARDOWN_QUEUE.submit(
+            resource=resource or ('teardown_sql', sql_list),
+            func=partial(self.execute_teardown_sql, sql_list),
+            description=f"teardown_sql: {'; '.join(sql_list)}",
+            dedup_key=('teardown_sql', sql_list) if is_delete else None
+        )
+
+    @classmethod
+    def execute_teardown_sql(cls, sql_list: List[Text]) -> None:
+        """ 在同一个事务中执行已完成数据替换的后置 sql """
+        with MysqlDB().transaction() as mysql_db:
+            for i in sql_list:
+                mysql_db.execute(i)
+
     def teardown_sql(self) -> None:
         """处理后置sql"""
 
         sql_data = self._res.teardown_sql
         _response_data = self._res.response_data
         if sql_data is not None:
-            for i in sql_data:
-                if config.mysql_db.switch:
-                    _sql_data = sql_regular(value=i, res=json.loads(_response_data))
-                    MysqlDB().execute(cache_regular(_sql_data))
-                else:
+            if config.mysql_db.switch:
+                # 后置 sql 在同一个事务中执行
+                with MysqlDB().transaction() as mysql_db:
+                    for i in sql_data:
+                        _sql_data = sql_regular(value=i, res=json.loads(_response_data))
+                        mysql_db.execute(cache_regular(_sql_data))
+            else:
+                for i in sql_data:
                     WARNING.logger.warning("程序中检查到您数据库开关为关闭状态，已为您跳过删除sql: %s", i)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+延迟后置处理队列
+
+开启 deferred_teardown 后，用例的后置请求、后置 sql 不再阻塞用例本身，而是放入后台线程池执行：
+1) 同一资源（如同一个删除地址）的清理任务按提交顺序串行执行，不同资源之间并行执行
+2) 尚未执行的相同清理任务（如重复删除同一条数据）只执行一次
+3) 排队中的任务数量受 max_pending 限制，超出时提交方等待，避免清理任务无限堆积
+4) 依赖用例执行前、测试会话结束时调用 drain() 等待所有清理任务完成
+5) 清理失败不影响用例结果，统一记录到 failures 中，在会话结束时输出汇总
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Hashable, List, NamedTuple, Optional, Set, Text
+from utils.logging_tool.log_control import ERROR, INFO
+from utils.other_tools.allure_data.allure_tools import disable_allure_in_thread
+
+
+class TeardownFailure(NamedTuple):
+    """ 执行失败的清理任务 """
+    resource: Hashable
+    description: Text
+    error: Text
+
+
+class _Task(NamedTuple):
+    func: Callable[[], Any]
+    description: Text
+    dedup_key: Optional[Hashable]
+
+
+class TeardownQueue:
+    """ 按资源保序、可去重的后台清理队列 """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 1000):
+        """
+        :param max_workers: 后台执行清理任务的线程数
+        :param max_pending: 排队中的最大任务数
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # 每个资源对应一个任务队列，队列非空说明该资源已有线程在处理
+        self._resources: Dict[Hashable, Deque[_Task]] = {}
+        self._dedup_keys: Set[Hashable] = set()
+        self._pending = 0
+        self._cond = threading.Condition()
+        self.failures: List[TeardownFailure] = []
+        self.executed = 0
+        self.deduplicated = 0
+
+    @property
+    def pending(self) -> int:
+        """ 尚未执行完成的任务数 """
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="teardown",
+                # 后台线程中不写 allure 步骤，避免混入正在执行的用例
+                initializer=disable_allure_in_thread
+            )
+        return self._executor
+
+    def submit(
+            self,
+            resource: Hashable,
+            func: Callable[[], Any],
+            description: Text = "",
+            dedup_key: Optional[Hashable] = None) -> bool:
+        """
+        提交清理任务
+        :param resource: 资源标识，相同资源的任务按提交顺序执行
+        :param func: 清理函数
+        :param description: 任务描述，用于失败汇总
+        :param dedup_key: 去重标识，与排队中的任务相同时丢弃本次任务
+        :return: 任务是否被放入队列
+        """
+        with self._cond:
+            if dedup_key is not None:
+                if dedup_key in self._dedup_keys:
+                    self.deduplicated += 1
+                    return False
+                self._dedup_keys.add(dedup_key)
+            while self._pending >= self.max_pending:
+                self._cond.wait()
+            self._pending += 1
+            queue = self._resources.get(resource)
+            if queue is None:
+                queue = self._resources[resource] = deque()
+            queue.append(_Task(func, description, dedup_key))
+            if len(queue) == 1:
+                self._get_executor().submit(self._run_resource, resource)
+        return True
+
+    def _run_resource(self, resource: Hashable) -> None:
+        """ 依次执行同一资源下的所有任务 """
+        while True:
+            with self._cond:
+                task = self._resources[resource][0]
+            try:
+                task.func()
+            except Exception as error:  # noqa: BLE001
+                ERROR.logger.error("延迟后置处理失败: %s, 失败原因: %s", task.description, error)
+                with self._cond:
+                    self.failures.append(TeardownFailure(resource, task.description, repr(error)))
+            with self._cond:
+                queue = self._resources[resource]
+                queue.popleft()
+                self._dedup_keys.discard(task.dedup_key)
+                self._pending -= 1
+                self.executed += 1
+                if not queue:
+                    del self._resources[resource]
+                self._cond.notify_all()
+                if not queue:
+                    return
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待所有清理任务执行完成
+        :param timeout: 最长等待时间（秒），为空时一直等待
+        :return: 是否全部完成
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def summary(self) -> List[Text]:
+        """ 清理任务的执行汇总 """
+        lines = [
+            f"延迟后置处理: 已执行 {self.executed} 个，去重跳过 {self.deduplicated} 个，"
+            f"失败 {len(self.failures)} 个"
+        ]
+        lines.extend(f"  {i.description}: {i.error}" for i in self.failures)
+        return lines
+
+    def shutdown(self) -> None:
+        """ 等待所有任务完成并关闭线程池 """
+        self.drain()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _create_queue() -> "TeardownQueue":
+    from utils import config
+    return TeardownQueue(
+        max_workers=config.deferred_teardown.max_workers,
+        max_pending=config.deferred_teardown.max_pending
+    )
+
+
+TEARDOWN_QUEUE = _create_queue()
+
+
+def report_teardown_summary() -> None:
+    """ 输出延迟后置处理的汇总信息，有失败时记录为错误日志 """
+    if not TEARDOWN_QUEUE.executed and not TEARDOWN_QUEUE.deduplicated:
+        return
+    logger = ERROR.logger.error if TEARDOWN_QUEUE.failures else INFO.logger.info
+    for line in TEARDOWN_QUEUE.summary():
+        logger(line)
@@ -0,0 +1,158 @@
+"""
+AI 解析接口
+
+/api/ai/parse 调用大模型把飞书文档 URL 解析为 OpenAPI、接口关联和业务场景文件，/api/ai/files 查询已生成的文件。
+utils.parse.ai 依赖 openai，延迟到第一次调用接口时导入。
+ASGI 服务模式下 /api/ai/parse 由 async_routes 中的协程处理，大模型调用和文档下载不占用线程
+"""
+
+import os
+import json
+import asyncio
+import logging
+
+import yaml
+from flask import Blueprint, current_app, request, jsonify
+
+from utils.other_tools.lazy_import import lazy_module
+
+parse_ai = lazy_module('utils.parse.ai')
+parse_ai_async = lazy_module('utils.parse.ai_async')
+
+logger = logging.getLogger(__name__)
+
+bp_ai_parse = Blueprint('bp_ai_parse', __name__)
+
+
+def _parse_response(result):
+    """根据 process_url_with_ai 的结果生成 (响应数据, 状态码)"""
+    if not result.get('success', False):
+        return {
+            'error': 'AI解析URL失败',
+            'message': result.get('error', '未知错误')
+        }, 500
+
+    # 返回生成的文件内容
+    return {
+        'success': True,
+        'url': result.get('url'),
+        'url_hash': result.get('url_hash'),
+        'openapi_data': result.get('openapi_data'),
+        'relation_data': result.get('relation_data'),
+        'scene_data': result.get('scene_data'),
+        'openapi_file': result.get('openapi_file'),
+        'relation_file': result.get('relation_file'),
+        'scene_file': result.get('scene_file'),
+        'message': 'AI解析成功'
+    }, 200
+
+
+@bp_ai_parse.route('/api/ai/parse', methods=['POST'])
+def ai_parse_url():
+    """使用AI解析URL并生成JSON文件"""
+    try:
+        
+        data = request.get_json()
+        url = data.get('url')
+        
+        if not url:
+            return jsonify({'error': 'URL不能为空'}), 400
+        
+        # 定义输出目录
+        output_dir = current_app.config['UPLOAD_FOLDER']
+        os.makedirs(output_dir, exist_ok=True)
+        
+        # 使用新的process_url_with_ai函数处理URL
+        result = parse_ai.process_url_with_ai(url, output_dir)
+        payload, status = _parse_response(result)
+        return jsonify(payload), status
+        
+    except Exception as e:
+        logger.error(f"AI解析URL失败: {str(e)}")
+        return jsonify({'error': 'AI解析URL失败', 'message': str(e)}), 500
+
+@bp_ai_parse.route('/api/ai/files', methods=['GET'])
+def get_ai_files():
+    """根据URL获取已生成的文件"""
+    try:
+        url = request.args.get('url')
+        if not url:
+            return jsonify({'error': 'URL不能为空'}), 400
+        
+        url = parse_ai._normalize_url(url)
+        file_key = parse_ai._create_file_key_from_url(url)
+        
+        # 定义输出目录
+        output_dir = current_app.config['UPLOAD_FOLDER']
+        
+        # 定义文件路径
+        json_file = os.path.join(output_dir, 'json', f"json_{file_key}.json")
+        openapi_file = os.path.join(output_dir, 'openapi', f"openapi_{file_key}.yaml")
+        relation_file = os.path.join(output_dir, 'relation', f"relation_{file_key}.json")
+        scene_file = os.path.join(output_dir, 'scene', f"scene_{file_key}.json")
+        
+        # 检查文件是否存在
+        files_exist = {
+            'openapi': os.path.exists(openapi_file),
+            'relation': os.path.exists(relation_file),
+            'scene': os.path.exists(scene_file)
+        }
+        
+        if not any(files_exist.values()):
+            return jsonify({
+                'error': '该URL对应的文件不存在',
+                'url': url,
+                'file_key': file_key
+            }), 404
+        
+        # 读取文件内容
+        result = {
+            'success': True,
+            'url': url,
+            'file_key': file_key,
+            'files_exist': files_exist
+        }
+        
+        # 读取OpenAPI文件
+        if files_exist['openapi']:
+            with open(openapi_file, 'r', encoding='utf-8') as f:
+                result['openapi_data'] = yaml.safe_load(f)
+        
+        # 读取关联关系文件
+        if files_exist['relation']:
+            with open(relation_file, 'r', encoding='utf-8') as f:
+                result['relation_data'] = json.load(f)
+        
+        # 读取业务场景文件
+        if files_exist['scene']:
+            with open(scene_file, 'r', encoding='utf-8') as f:
+                result['scene_data'] = json.load(f)
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"获取AI文件失败: {str(e)}")
+        return jsonify({'error': '获取AI文件失败', 'message': str(e)}), 500
+
+
+async def ai_parse_url_async(request):
+    """/api/ai/parse 的异步版本，ASGI 服务模式下使用"""
+    data = request.get_json() or {}
+    url = data.get('url')
+    if not url:
+        return {'error': 'URL不能为空'}, 400
+    try:
+        # 第一次调用时 openai 等依赖在线程池中导入，不阻塞事件循环
+        loop = asyncio.get_running_loop()
+        aprocess_url_with_ai = await loop.run_in_executor(None, getattr, parse_ai_async, 'aprocess_url_with_ai')
+        result = await aprocess_url_with_ai(url, request.app.config['UPLOAD_FOLDER'])
+        return _parse_response(result)
+    except Exception as e:
+        logger.error(f"AI解析URL失败: {str(e)}")
+        return {'error': 'AI解析URL失败', 'message': str(e)}, 500
+
+
+# ASGI 服务模式下以协程执行的接口：(请求方法, 路径) -> 异步接口
+async_routes = {
+    ('POST', '/api/ai/parse'): ai_parse_url_async,
+}
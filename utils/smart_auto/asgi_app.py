@@ -0,0 +1,123 @@
+"""
+ASGI 服务模式
+
+Flask 开发服务器每个请求占用一个线程，调用大模型、下载飞书文档的接口会长时间阻塞线程，
+少量用户同时解析文档就会把线程耗尽。create_asgi_app 把 api_server 包装为 ASGI 应用：
+- 登记在 async_routes 中的接口以协程执行，大模型调用、文档下载和文件读写都通过 await 等待，等待期间不占用线程
+- 其余接口仍交给 Flask 处理，在线程池中执行；asgiref 的 WsgiToAsgi 默认把所有请求放到同一个线程中串行执行，这里改为线程池
+
+    SERVER_MODE=asgi python api_server.py
+    uvicorn api_server:asgi_app --host 0.0.0.0 --port 5000
+"""
+
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRequest:
+    """异步接口的请求数据"""
+
+    def __init__(self, scope: Dict[str, Any], body: bytes, app):
+        self.scope = scope
+        self.body = body
+        self.app = app
+        self.method = scope['method']
+        self.path = scope['path']
+        self.args = {k: v[-1] for k, v in parse_qs(scope.get('query_string', b'').decode('latin1')).items()}
+        self.headers = {k.decode('latin1').lower(): v.decode('latin1') for k, v in scope.get('headers', [])}
+
+    def get_json(self) -> Optional[Any]:
+        """解析 JSON 请求体，格式错误时返回 None"""
+        try:
+            return json.loads(self.body) if self.body else None
+        except ValueError:
+            return None
+
+
+# 异步接口：接收 AsyncRequest，返回 (响应数据, 状态码)
+AsyncView = Callable[[AsyncRequest], Awaitable[Tuple[Any, int]]]
+
+
+_run_wsgi_app = WsgiToAsgiInstance.__dict__['run_wsgi_app']
+
+
+class _ThreadPoolWsgiInstance(WsgiToAsgiInstance):
+    run_wsgi_app = sync_to_async(getattr(_run_wsgi_app, 'func', _run_wsgi_app), thread_sensitive=False)
+
+
+class _ThreadPoolWsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await _ThreadPoolWsgiInstance(self.wsgi_application)(scope, receive, send)
+
+
+class AsgiApp:
+    """异步接口直接在事件循环中执行，其余请求交给 Flask"""
+
+    def __init__(self, flask_app, async_routes: Dict[Tuple[str, str], AsyncView]):
+        self.flask_app = flask_app
+        self.async_routes = dict(async_routes)
+        self.wsgi = _ThreadPoolWsgi(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        view = self.async_routes.get((scope.get('method'), scope.get('path'))) if scope['type'] == 'http' else None
+        if view is None:
+            await self.wsgi(scope, receive, send)
+            return
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        try:
+            data, status = await view(AsyncRequest(scope, body, self.flask_app))
+        except Exception as e:
+            logger.exception(f"异步接口执行失败 {scope['path']}")
+            data, status = {'error': '服务器内部错误', 'message': str(e)}, 500
+        await self._send_json(send, data, status)
+
+    @staticmethod
+    async def _lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def _send_json(send, data: Any, status: int) -> None:
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode('latin1')),
+                # 与 flask_cors 的默认配置一致
+                (b'access-control-allow-origin', b'*'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def create_asgi_app(flask_app, async_routes: Dict[Tuple[str, str], AsyncView]) -> AsgiApp:
+    """
+    创建 ASGI 应用
+
+    Args:
+        flask_app: Flask 应用，未登记为异步接口的请求都由它处理
+        async_routes: (请求方法, 路径) -> 异步接口
+    """
+    return AsgiApp(flask_app, async_routes)
@@ -0,0 +1,409 @@
+"""
+文档元数据索引模块
+
+api_server 启动时不再把 uploads/results、test_cases 下的全部 json 读入内存，文档列表也不再逐个解析文件生成预览：
+- 每个文件的 id、类型、大小、修改时间、条目数、预览保存在 SQLite 中，按修改时间和大小校验，只解析新增或变化的文件
+- 上传、更新、删除文档时直接更新索引，列表接口只读取索引
+- LazyDocuments 以字典的方式访问文档，文档内容在第一次访问时才从文件读取
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, List, Any, Optional, Callable, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_LENGTH = 500
+HTTP_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'PATCH', 'HEAD', 'OPTIONS')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    -- 文件不属于该类型文档时为 0，仍然记录以免重复解析
+    matched INTEGER DEFAULT 1,
+    item_count INTEGER DEFAULT 0,
+    preview TEXT,
+    meta TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_documents_kind ON documents (kind, doc_id);
+"""
+
+
+def _preview(text: str) -> str:
+    return text[:PREVIEW_LENGTH] + ('...' if len(text) > PREVIEW_LENGTH else '')
+
+
+def count_operations(spec: Any) -> int:
+    """OpenAPI 文档中的接口数量"""
+    count = 0
+    if isinstance(spec, dict) and isinstance(spec.get('paths'), dict):
+        for path_item in spec['paths'].values():
+            if isinstance(path_item, dict):
+                count += sum(1 for method in path_item if str(method).upper() in HTTP_METHODS)
+    return count
+
+
+def result_doc_id(filename: str) -> str:
+    """save_result 保存的 results_<id>.json 对应的 id"""
+    stem = filename.rsplit('.', 1)[0]
+    return stem[len('results_'):] if stem.startswith('results_') else stem
+
+
+def summarize_api_doc(data: Any) -> Optional[Dict[str, Any]]:
+    """uploads/results 下的 API 文档解析结果"""
+    if not isinstance(data, dict) or 'api_data' not in data or not ('filename' in data or 'url' in data):
+        return None
+    api_data = data.get('api_data') or {}
+    # 完整解析器的扁平数据格式每个文档代表一个接口
+    if 'name' in api_data or 'method' in api_data:
+        operation_count = 1
+    else:
+        operation_count = count_operations(api_data)
+    return {
+        'item_count': len(api_data.get('apis', [])),
+        'preview': None,
+        'meta': {
+            'filename': data.get('filename', ''),
+            'created_at': data.get('created_at', ''),
+            'operation_count': operation_count,
+        }
+    }
+
+
+def summarize_test_cases(data: Any) -> Optional[Dict[str, Any]]:
+    """test_cases 目录下的测试用例"""
+    if not isinstance(data, dict) or 'test_cases' not in data:
+        return None
+    cases = data['test_cases']
+    return {
+        'item_count': sum(len(c) for c in cases.values()) if isinstance(cases, dict) else len(cases),
+        'preview': None,
+        'meta': {
+            'doc_task_id': data.get('doc_task_id'),
+            'created_at': data.get('created_at', ''),
+        }
+    }
+
+
+# uploads 下可在线查看、编辑的文档目录
+UPLOAD_DOC_TYPES = {
+    'openapi': {'description': 'OpenAPI文档', 'file_types': ('.yaml', '.yml', '.json')},
+    'relation': {'description': '关系文档', 'file_types': ('.json', '.yaml', '.yml', '.txt')},
+    'scene': {'description': '场景文档', 'file_types': ('.json', '.yaml', '.yml', '.txt')},
+}
+
+
+def upload_doc_id(doc_type: str, filename: str) -> str:
+    """去掉类型前缀和扩展名后的文件 id"""
+    file_id = filename[len(f'{doc_type}_'):] if filename.startswith(f'{doc_type}_') else filename
+    return file_id.rsplit('.', 1)[0] if '.' in file_id else file_id
+
+
+def extract_upload_document(doc_type: str, path: str) -> Dict[str, Any]:
+    """
+    uploads/openapi、relation、scene 下的文档摘要：
+    json 文档按内容计算条目数，其他文档按行数；openapi 文档另外记录 yaml/json 中的接口数量
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    meta = {}
+    if path.lower().endswith('.json'):
+        content = json.loads(text)
+        preview = json.dumps(content, ensure_ascii=False, indent=2)
+        if doc_type == 'openapi':
+            item_count = count_operations(content)
+            meta['api_count'] = item_count
+        else:
+            item_count = len(content) if isinstance(content, (list, dict)) else 0
+    else:
+        preview = text
+        item_count = len(text.split('\n')) if text else 0
+        if doc_type == 'openapi':
+            import yaml
+            try:
+                meta['api_count'] = count_operations(yaml.safe_load(text))
+            except yaml.YAMLError as e:
+                logger.warning(f"解析OpenAPI文件失败 {path}: {str(e)}")
+                meta['api_count'] = 0
+    return {'item_count': item_count, 'preview': _preview(preview), 'meta': meta}
+
+
+class _Kind:
+    """一种文档的目录、扩展名和摘要提取方式"""
+
+    def __init__(self, name, directory, extensions, doc_id, extractor, summarize):
+        self.name = name
+        self.directory = directory
+        self.extensions = tuple(extensions)
+        self.doc_id = doc_id
+        self.extractor = extractor
+        self.summarize = summarize
+
+
+class DocumentIndex:
+    """文档元数据索引"""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: 索引数据库路径
+        """
+        self.db_path = db_path
+        self._kinds: Dict[str, _Kind] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._conn()
+        with self._lock, conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def register(
+            self,
+            kind: str,
+            directory: str,
+            extensions: Tuple[str, ...],
+            doc_id: Callable[[str], str],
+            extractor: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+            summarize: Optional[Callable[[Any], Optional[Dict[str, Any]]]] = None) -> None:
+        """
+        登记一种文档
+
+        Args:
+            kind: 文档类型
+            directory: 文档所在目录
+            extensions: 文件扩展名
+            doc_id: 文件名 -> 文档 id
+            extractor: 文件路径 -> 摘要 {'item_count', 'preview', 'meta'}，不属于该类型时返回 None
+            summarize: json 文档内容 -> 摘要；只提供 summarize 时按 json 读取文件后调用
+        """
+        if extractor is None:
+            def extractor(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    return summarize(json.load(f))
+        self._kinds[kind] = _Kind(kind, directory, extensions, doc_id, extractor, summarize)
+
+    def _write(self, kind: _Kind, path: str, stat: os.stat_result, summary: Optional[Dict[str, Any]]) -> None:
+        file_name = os.path.basename(path)
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO documents '
+                '(path, kind, doc_id, file_name, size, mtime, matched, item_count, preview, meta) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (path, kind.name, kind.doc_id(file_name), file_name, stat.st_size, stat.st_mtime,
+                 int(summary is not None),
+                 (summary or {}).get('item_count') or 0,
+                 (summary or {}).get('preview'),
+                 json.dumps((summary or {}).get('meta'), ensure_ascii=False, default=str))
+            )
+
+    def _index_file(self, kind: _Kind, path: str, stat: os.stat_result) -> None:
+        try:
+            summary = kind.extractor(path)
+        except Exception as e:
+            logger.warning(f"解析文件失败 {path}: {str(e)}")
+            # json 数据文件解析失败时不计入文档；上传的文档仍然列出，预览中显示失败原因
+            summary = None if kind.summarize else {'item_count': 0, 'preview': f"解析失败: {str(e)}", 'meta': {}}
+        self._write(kind, path, stat, summary)
+
+    def record_file(self, kind: str, path: str, data: Any = None) -> None:
+        """
+        上传、更新文档后更新索引
+
+        Args:
+            kind: 文档类型
+            path: 文件路径
+            data: 刚写入的 json 内容，提供时不再重新读取文件
+        """
+        kind = self._kinds[kind]
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.remove_path(path)
+            return
+        if data is not None and kind.summarize is not None:
+            self._write(kind, path, stat, kind.summarize(data))
+        else:
+            self._index_file(kind, path, stat)
+
+    def remove_path(self, path: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM documents WHERE path = ?', (os.path.abspath(path),))
+
+    def remove(self, kind: str, doc_id: str) -> None:
+        """删除文档后移除索引"""
+        conn = self._conn()
+        with conn:
+            conn.execute('DELETE FROM documents WHERE kind = ? AND doc_id = ?', (kind, doc_id))
+
+    def refresh(self, kind: str) -> None:
+        """校验目录中文件的修改时间和大小，只重新解析变化的文件，移除已删除的文件"""
+        kind = self._kinds[kind]
+        directory = os.path.abspath(kind.directory)
+        conn = self._conn()
+        indexed = {
+            row['path']: (row['mtime'], row['size'])
+            for row in conn.execute('SELECT path, mtime, size FROM documents WHERE kind = ?', (kind.name,))
+        }
+        seen = set()
+        if os.path.isdir(directory):
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not entry.name.lower().endswith(kind.extensions):
+                        continue
+                    path = os.path.join(directory, entry.name)
+                    seen.add(path)
+                    stat = entry.stat()
+                    if indexed.get(path) != (stat.st_mtime, stat.st_size):
+                        self._index_file(kind, path, stat)
+        removed = [path for path in indexed if path not in seen]
+        if removed:
+            with conn:
+                conn.executemany('DELETE FROM documents WHERE path = ?', [(path,) for path in removed])
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        doc = dict(row)
+        doc['meta'] = json.loads(doc['meta']) if doc.get('meta') else {}
+        doc.pop('matched', None)
+        return doc
+
+    def list(self, kind: str, refresh: bool = True) -> List[Dict[str, Any]]:
+        """文档元数据列表，按文件名排序"""
+        if refresh:
+            self.refresh(kind)
+        rows = self._conn().execute(
+            'SELECT * FROM documents WHERE kind = ? AND matched = 1 ORDER BY file_name', (kind,)
+        ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def ids(self, kind: str) -> List[str]:
+        rows = self._conn().execute(
+            'SELECT DISTINCT doc_id FROM documents WHERE kind = ? AND matched = 1', (kind,)
+        ).fetchall()
+        return [row['doc_id'] for row in rows]
+
+    def get(self, kind: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        """文档元数据，同一 id 有多个文件时取最新修改的"""
+        row = self._conn().execute(
+            'SELECT * FROM documents WHERE kind = ? AND doc_id = ? AND matched = 1 ORDER BY mtime DESC LIMIT 1',
+            (kind, doc_id)
+        ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def summarize(self, kind: str, data: Any) -> Optional[Dict[str, Any]]:
+        return self._kinds[kind].summarize(data)
+
+
+class LazyDocuments(MutableMapping):
+    """
+    按需加载的文档字典，替代原来启动时全部读入内存的全局字典
+
+    - 程序中写入的文档一直保留在内存中，与原来的行为一致
+    - 从文件加载的文档放在容量有限的缓存中，超出后淘汰最久未访问的
+    """
+
+    def __init__(self, index: DocumentIndex, kind: str, cache_size: int = 64):
+        self.index = index
+        self.kind = kind
+        self.cache_size = cache_size
+        self._pinned: Dict[str, Any] = {}
+        self._cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __getitem__(self, doc_id: str) -> Any:
+        with self._lock:
+            if doc_id in self._pinned:
+                return self._pinned[doc_id]
+            if doc_id in self._cache:
+                self._cache.move_to_end(doc_id)
+                return self._cache[doc_id]
+        meta = self.index.get(self.kind, doc_id)
+        if meta is None:
+            raise KeyError(doc_id)
+        try:
+            with open(meta['path'], 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # 文件已被删除或损坏，移除过期的索引
+            self.index.remove_path(meta['path'])
+            raise KeyError(doc_id)
+        with self._lock:
+            self._cache[doc_id] = data
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return data
+
+    def __setitem__(self, doc_id: str, value: Any) -> None:
+        with self._lock:
+            self._cache.pop(doc_id, None)
+            self._pinned[doc_id] = value
+
+    def __delitem__(self, doc_id: str) -> None:
+        with self._lock:
+            found = self._pinned.pop(doc_id, None) is not None
+            found = self._cache.pop(doc_id, None) is not None or found
+        if self.index.get(self.kind, doc_id) is not None:
+            found = True
+        self.index.remove(self.kind, doc_id)
+        if not found:
+            raise KeyError(doc_id)
+
+    def __contains__(self, doc_id: object) -> bool:
+        with self._lock:
+            if doc_id in self._pinned:
+                return True
+        return isinstance(doc_id, str) and self.index.get(self.kind, doc_id) is not None
+
+    def _keys(self) -> List[str]:
+        with self._lock:
+            pinned = list(self._pinned)
+        return pinned + [i for i in self.index.ids(self.kind) if i not in set(pinned)]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def summaries(self) -> List[Dict[str, Any]]:
+        """
+        所有文档的元数据，不读取文件内容：内存中的文档现场计算，其余来自索引
+        每一项包含 doc_id、item_count、preview、meta
+        """
+        with self._lock:
+            pinned = dict(self._pinned)
+        result = []
+        for doc_id, data in pinned.items():
+            summary = self.index.summarize(self.kind, data)
+            if summary is not None:
+                result.append({'doc_id': doc_id, **summary})
+        # 同一 id 有多个文件时取最新修改的，与 __getitem__ 一致
+        latest: Dict[str, Dict[str, Any]] = {}
+        for doc in self.index.list(self.kind):
+            if doc['doc_id'] in pinned:
+                continue
+            if doc['doc_id'] not in latest or doc['mtime'] > latest[doc['doc_id']]['mtime']:
+                latest[doc['doc_id']] = doc
+        return result + list(latest.values())
@@ -0,0 +1,155 @@
+"""
+响应压缩和条件请求模块
+
+文档内容、测试结果等接口返回的 JSON 较大，init_http_cache 为 api_server 统一处理：
+- JSON 响应改为紧凑格式输出，安装了 orjson 时使用 orjson 序列化
+- GET 响应带上 ETag，请求中的 If-None-Match / If-Modified-Since 与之一致时返回 304
+- 按 Accept-Encoding 使用 brotli 或 gzip 压缩文本类响应，SSE 等流式响应不做处理
+- 读取文件的接口先通过 not_modified 按文件修改时间和大小判断，未修改时不读取文件直接返回 304
+"""
+
+import os
+import gzip
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from flask import Response, g, request
+from werkzeug.http import is_resource_modified
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 小于该大小的响应不压缩
+MIN_COMPRESS_SIZE = 1024
+BROTLI_QUALITY = 5
+GZIP_LEVEL = 6
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/javascript', 'application/xml', 'application/x-yaml', 'image/svg+xml'
+)
+
+_VALIDATORS = '_http_cache_validators'
+
+
+def _compressible(response: Response) -> bool:
+    mimetype = response.mimetype or ''
+    return (mimetype.startswith('text/') and mimetype != 'text/event-stream') or mimetype in COMPRESSIBLE_TYPES
+
+
+def _accepted_encoding() -> Optional[str]:
+    """客户端支持的压缩方式，优先使用 brotli"""
+    accept = request.accept_encodings
+    if brotli is not None and accept['br']:
+        return 'br'
+    if accept['gzip']:
+        return 'gzip'
+    return None
+
+
+def file_validators(*paths: str) -> Tuple[str, datetime]:
+    """根据文件路径、修改时间和大小生成 ETag，返回 (ETag, 最后修改时间)"""
+    digest = hashlib.md5()
+    latest = 0.0
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f'{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}'.encode('utf-8'))
+        latest = max(latest, stat.st_mtime)
+    return digest.hexdigest(), datetime.fromtimestamp(int(latest), tz=timezone.utc)
+
+
+def not_modified(*paths: str) -> Optional[Response]:
+    """
+    文件类接口的条件请求：文件未修改时返回 304 响应，否则返回 None，
+    并记录 ETag 和最后修改时间，由 after_request 写入本次响应
+
+    Args:
+        paths: 接口返回内容依赖的文件
+    """
+    try:
+        etag, last_modified = file_validators(*paths)
+    except OSError:
+        return None
+    setattr(g, _VALIDATORS, (etag, last_modified))
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+    return response
+
+
+def _after_request(response: Response) -> Response:
+    if response.direct_passthrough or response.is_streamed:
+        return response
+
+    if request.method in ('GET', 'HEAD') and response.status_code == 200:
+        validators = g.pop(_VALIDATORS, None)
+        if validators is not None:
+            response.set_etag(validators[0], weak=True)
+            response.last_modified = validators[1]
+        elif 'ETag' not in response.headers:
+            response.add_etag(weak=True)
+        response.make_conditional(request)
+
+    if (response.status_code != 200 or 'Content-Encoding' in response.headers
+            or not _compressible(response)):
+        return response
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = _accepted_encoding()
+    if encoding is None:
+        return response
+    if encoding == 'br':
+        data = brotli.compress(data, quality=BROTLI_QUALITY)
+    else:
+        data = gzip.compress(data, compresslevel=GZIP_LEVEL)
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _install_json_provider(app) -> None:
+    try:
+        from flask.json.provider import DefaultJSONProvider
+    except ImportError:
+        # Flask 2.2 之前没有 JSON provider，只关闭缩进输出和中文转义
+        app.config['JSONIFY_PRETTYPRINT_REGULAR'] = False
+        app.config['JSON_AS_ASCII'] = False
+        return
+
+    class CompactJSONProvider(DefaultJSONProvider):
+        """紧凑输出、不转义中文的 JSON 序列化，安装了 orjson 时优先使用"""
+
+        compact = True
+        ensure_ascii = False
+
+        def dumps(self, obj, **kwargs):
+            # response() 只会额外传入 separators，orjson 默认就是紧凑格式
+            if orjson is not None and set(kwargs) <= {'separators'}:
+                try:
+                    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                    if self.sort_keys:
+                        option |= orjson.OPT_SORT_KEYS
+                    return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+                except (TypeError, orjson.JSONEncodeError):
+                    # 超出 64 位的整数等 orjson 不支持的数据交给标准库处理
+                    pass
+            return super().dumps(obj, **kwargs)
+
+    app.json = CompactJSONProvider(app)
+
+
+def init_http_cache(app) -> None:
+    """为 Flask 应用开启紧凑 JSON、ETag/304 和响应压缩"""
+    _install_json_provider(app)
+    app.after_request(_after_request)
+
@@ -0,0 +1,315 @@
+"""
+后台任务管理模块
+
+长时间运行的接口（链式测试、飞书全量测试等）可以作为后台任务执行，接口立即返回 job_id：
+- 线程池限制同时运行的任务数，排队任务数超过上限时拒绝提交
+- 任务状态保存在 SQLite 中，服务重启后仍可查询；重启前排队中的任务会重新提交，运行中的任务标记为 interrupted
+- 任务中启动的子进程通过 track_process 登记，取消任务时结束这些子进程
+- background_job 装饰器让 Flask 接口支持 async 参数，在后台线程中以相同的请求数据执行原接口
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+INTERRUPTED = 'interrupted'
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED, INTERRUPTED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    payload TEXT,
+    status_code INTEGER,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at DESC);
+"""
+
+
+class JobQueueFull(Exception):
+    """排队任务数超过上限"""
+
+
+class _RunningJob:
+    """运行中任务的取消标记和子进程"""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.processes: List[Any] = []
+        self.future = None
+
+
+class JobManager:
+    """后台任务管理器"""
+
+    def __init__(self, db_path: str, max_workers: int = 4, max_pending: int = 100):
+        """
+        Args:
+            db_path: 任务状态数据库路径
+            max_workers: 同时运行的任务数
+            max_pending: 排队和运行中的任务数上限
+        """
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='job')
+        self._jobs: Dict[str, _RunningJob] = {}
+        # 任务名称 -> 根据 payload 重新执行任务的函数，用于服务重启后恢复排队中的任务
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        conn = self._conn()
+        with self._lock, conn:
+            conn.executescript(_SCHEMA)
+            # 重启前运行中的任务已随进程退出
+            conn.execute(
+                'UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE status = ?',
+                (INTERRUPTED, datetime.now().isoformat(), '服务重启，任务中断', RUNNING)
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _update(self, job_id: str, **fields) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+                list(fields.values()) + [job_id]
+            )
+
+    def register(self, name: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """登记任务处理函数，handler(payload) 返回 (状态码, 结果)"""
+        self._handlers[name] = handler
+
+    def submit(self, name: str, payload: Optional[Dict[str, Any]] = None, job_id: Optional[str] = None) -> str:
+        """
+        提交任务
+
+        Args:
+            name: 任务名称，需要先通过 register 登记
+            payload: 任务参数，会持久化保存
+            job_id: 恢复任务时使用原有的 id
+
+        Returns:
+            任务 id
+        """
+        handler = self._handlers[name]
+        with self._lock:
+            if len(self._jobs) >= self.max_pending:
+                raise JobQueueFull(f'排队中的任务已达到上限 {self.max_pending}')
+            if job_id is None:
+                job_id = uuid4().hex
+                conn = self._conn()
+                with conn:
+                    conn.execute(
+                        'INSERT INTO jobs (id, name, status, created_at, payload) VALUES (?, ?, ?, ?, ?)',
+                        (job_id, name, QUEUED, datetime.now().isoformat(),
+                         json.dumps(payload, ensure_ascii=False, default=str))
+                    )
+            running = _RunningJob()
+            self._jobs[job_id] = running
+            running.future = self._executor.submit(self._run, job_id, handler, payload or {})
+        return job_id
+
+    def _run(self, job_id: str, handler: Callable, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            running = self._jobs[job_id]
+            if running.cancelled.is_set():
+                # 出队后才取消时 future.cancel() 已失败，由这里结束任务
+                self._jobs.pop(job_id, None)
+                self._update(job_id, status=CANCELLED, finished_at=datetime.now().isoformat())
+                return
+        self._local.job_id = job_id
+        self._update(job_id, status=RUNNING, started_at=datetime.now().isoformat())
+        status, status_code, result, error = SUCCEEDED, None, None, None
+        try:
+            status_code, result = handler(payload)
+            if status_code is not None and status_code >= 400:
+                status = FAILED
+        except Exception as e:
+            logger.exception(f"后台任务执行失败 {job_id}")
+            status, error = FAILED, str(e)
+        finally:
+            self._local.job_id = None
+            with self._lock:
+                self._jobs.pop(job_id, None)
+        if running.cancelled.is_set():
+            status = CANCELLED
+        self._update(
+            job_id,
+            status=status,
+            finished_at=datetime.now().isoformat(),
+            status_code=status_code,
+            result=json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+            error=error
+        )
+
+    def resume(self) -> int:
+        """重新提交服务重启前排队中的任务，需要在所有任务处理函数登记后调用"""
+        rows = self._conn().execute(
+            'SELECT id, name, payload FROM jobs WHERE status = ? ORDER BY created_at', (QUEUED,)
+        ).fetchall()
+        count = 0
+        for row in rows:
+            if row['name'] not in self._handlers or row['id'] in self._jobs:
+                continue
+            try:
+                self.submit(row['name'], json.loads(row['payload'] or '{}'), job_id=row['id'])
+                count += 1
+            except JobQueueFull:
+                break
+        if count:
+            logger.info(f"已恢复 {count} 个排队中的后台任务")
+        return count
+
+    def current_job_id(self) -> Optional[str]:
+        """当前线程正在执行的任务 id，不在后台任务中时为 None"""
+        return getattr(self._local, 'job_id', None)
+
+    def track_process(self, process) -> None:
+        """登记当前任务启动的子进程，任务取消时结束该进程；不在后台任务中时不做处理"""
+        job_id = getattr(self._local, 'job_id', None)
+        with self._lock:
+            running = self._jobs.get(job_id) if job_id else None
+            if running is None:
+                return
+            running.processes.append(process)
+            cancelled = running.cancelled.is_set()
+        # 登记前任务已被取消时，cancel 不会再处理该进程，直接结束
+        if cancelled:
+            process.kill()
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        取消任务：排队中的任务直接取消，运行中的任务结束已登记的子进程
+
+        Returns:
+            任务是否处于可取消的状态
+        """
+        with self._lock:
+            running = self._jobs.get(job_id)
+            if running is None:
+                return False
+            running.cancelled.set()
+            if running.future.cancel():
+                self._jobs.pop(job_id, None)
+                self._update(job_id, status=CANCELLED, finished_at=datetime.now().isoformat())
+                return True
+            # 之后登记的子进程由 track_process 结束
+            processes = list(running.processes)
+        for process in processes:
+            if process.poll() is None:
+                process.kill()
+        return True
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row, with_result: bool = True) -> Dict[str, Any]:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload']) if job.get('payload') else None
+        if with_result:
+            job['result'] = json.loads(job['result']) if job.get('result') else None
+        else:
+            job.pop('result', None)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """查询任务状态和结果"""
+        row = self._conn().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list_jobs(self, limit: int = 20, offset: int = 0, status: Optional[str] = None) -> Dict[str, Any]:
+        """分页查询任务列表，不包含任务结果"""
+        where, params = ('WHERE status = ?', [status]) if status and status != 'all' else ('', [])
+        conn = self._conn()
+        total = conn.execute(f'SELECT COUNT(*) FROM jobs {where}', params).fetchone()[0]
+        rows = conn.execute(
+            f'SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ? OFFSET ?', params + [limit, offset]
+        ).fetchall()
+        return {'jobs': [self._to_dict(r, with_result=False) for r in rows], 'total': total}
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+def _wants_async() -> bool:
+    from flask import request
+    if request.args.get('async', '').lower() in ('1', 'true'):
+        return True
+    body = request.get_json(silent=True)
+    return isinstance(body, dict) and body.get('async') in (True, 1, '1', 'true')
+
+
+def background_job(manager: JobManager, app, name: str):
+    """
+    Flask 接口装饰器：请求中带有 async=true（查询参数或 JSON 字段）时，
+    保存请求数据并提交后台任务，立即返回 202 和 job_id；否则按原接口同步执行
+    """
+    def decorator(view):
+        def handler(payload: Dict[str, Any]):
+            with app.test_request_context(
+                    payload['path'],
+                    method=payload['method'],
+                    json=payload.get('json'),
+                    query_string=payload.get('args')):
+                response = app.make_response(view(**payload.get('view_args', {})))
+                result = response.get_json(silent=True)
+                if result is None:
+                    result = response.get_data(as_text=True)[:10000]
+                return response.status_code, result
+
+        manager.register(name, handler)
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            from flask import request, jsonify
+            if not _wants_async():
+                return view(*args, **kwargs)
+            payload = {
+                'path': request.path,
+                'method': request.method,
+                'json': request.get_json(silent=True),
+                'args': request.args.to_dict(flat=False),
+                'view_args': kwargs,
+            }
+            try:
+                job_id = manager.submit(name, payload)
+            except JobQueueFull as e:
+                return jsonify({'success': False, 'error': '任务队列已满', 'message': str(e)}), 429
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'status': QUEUED,
+                'status_url': f'/api/jobs/{job_id}'
+            }), 202
+
+        return wrapper
+    return decorator
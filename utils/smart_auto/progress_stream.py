@@ -0,0 +1,171 @@
+"""
+测试进度推送模块
+
+api_server 启动 pytest 子进程时开启 progress_plugin，用例结果逐条写入 uploads/progress/<run_id>.jsonl，
+SSE 接口增量读取该文件并推送给前端，不需要等子进程结束后再解析 stdout：
+- start_run 在接口开始执行时占用 run_id，同一个 run_id 的进度文件已存在时拒绝执行，避免与之前的执行结果混在一起
+- enable_progress 设置子进程的环境变量，pytest 子进程中再启动的 pytest 同样会上报
+- finish_run 在接口执行完成后写入 run_finished 事件，SSE 流随之结束
+- 进度文件保留 PROGRESS_TTL 秒，供断线重连和汇总接口读取，之后在下一次执行开始时删除
+- stream_events 支持 Last-Event-ID 断线续传，空闲时定时发送心跳
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+from utils.other_tools.progress_plugin import PROGRESS_ENV, read_progress, summarize_progress
+
+PROGRESS_DIR = 'uploads/progress'
+PLUGIN_OPTION = '-p utils.other_tools.progress_plugin'
+RUN_FINISHED = 'run_finished'
+# 进度文件的保留时间（秒）
+PROGRESS_TTL = 24 * 3600
+
+_RUN_ID = re.compile(r'^[\w-]{1,64}$')
+# 执行中的 run_id
+_active_runs = set()
+_active_lock = threading.Lock()
+
+
+def valid_run_id(run_id: Optional[str]) -> bool:
+    return bool(run_id) and bool(_RUN_ID.match(run_id))
+
+
+def progress_path(run_id: str) -> str:
+    """进度文件路径"""
+    return os.path.join(PROGRESS_DIR, f'{run_id}.jsonl')
+
+
+def cleanup_progress(ttl: float = PROGRESS_TTL) -> int:
+    """
+    删除超过保留时间、且不在执行中的进度文件
+
+    Returns:
+        删除的文件数
+    """
+    if not os.path.isdir(PROGRESS_DIR):
+        return 0
+    expire = time.time() - ttl
+    removed = 0
+    with os.scandir(PROGRESS_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.jsonl') or entry.name[:-6] in _active_runs:
+                continue
+            try:
+                if entry.stat().st_mtime < expire:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                continue
+    return removed
+
+
+def start_run(run_id: str) -> bool:
+    """
+    开始一次执行，占用 run_id 并创建空的进度文件
+
+    Returns:
+        run_id 正在执行或进度文件已存在时返回 False
+    """
+    cleanup_progress()
+    path = progress_path(run_id)
+    with _active_lock:
+        if run_id in _active_runs or os.path.exists(path):
+            return False
+        _active_runs.add(run_id)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    open(path, 'w', encoding='utf-8').close()
+    return True
+
+
+def enable_progress(env: Dict[str, str], run_id: str, project_root: Optional[Path] = None) -> str:
+    """
+    为子进程开启进度上报
+
+    Args:
+        env: 子进程环境变量，原地修改
+        run_id: 执行 id
+        project_root: 项目根目录，加入 PYTHONPATH 以便 pytest 加载插件
+
+    Returns:
+        进度文件路径
+    """
+    path = os.path.abspath(progress_path(run_id))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    env[PROGRESS_ENV] = path
+    addopts = env.get('PYTEST_ADDOPTS', '')
+    if PLUGIN_OPTION not in addopts:
+        env['PYTEST_ADDOPTS'] = f'{addopts} {PLUGIN_OPTION}'.strip()
+    root = str(project_root or Path(__file__).resolve().parents[2])
+    pythonpath = env.get('PYTHONPATH', '')
+    if root not in pythonpath.split(os.pathsep):
+        env['PYTHONPATH'] = f'{root}{os.pathsep}{pythonpath}' if pythonpath else root
+    return path
+
+
+def finish_run(run_id: str, **data) -> Optional[Dict[str, Any]]:
+    """
+    接口执行完成，写入 run_finished 事件
+
+    Returns:
+        用例结果汇总，没有用例结果时为 None
+    """
+    path = progress_path(run_id)
+    summary = summarize_progress(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    event = {'event': RUN_FINISHED, 'ts': round(time.time(), 3), **data,
+             'metrics': summary['metrics'] if summary else None}
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(event, ensure_ascii=False, default=str) + '\n')
+    with _active_lock:
+        _active_runs.discard(run_id)
+    return summary
+
+
+def _sse(event_id: int, event: Dict[str, Any]) -> str:
+    return f"id: {event_id}\nevent: {event.get('event', 'message')}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+def stream_events(
+        run_id: str,
+        last_event_id: int = 0,
+        poll_interval: float = 0.25,
+        heartbeat: float = 15.0,
+        idle_timeout: float = 3600.0) -> Iterator[str]:
+    """
+    以 SSE 格式持续输出进度事件，读到 run_finished 或长时间没有新事件时结束
+
+    Args:
+        run_id: 执行 id
+        last_event_id: 已经收到的事件数，断线重连时跳过
+        poll_interval: 读取文件的间隔
+        heartbeat: 心跳间隔
+        idle_timeout: 没有新事件的最长等待时间
+    """
+    path = progress_path(run_id)
+    offset, count = 0, 0
+    last_event = last_beat = time.monotonic()
+    yield 'retry: 3000\n\n'
+    while True:
+        events, offset = read_progress(path, offset)
+        for event in events:
+            count += 1
+            if count <= last_event_id:
+                continue
+            yield _sse(count, event)
+            if event.get('event') == RUN_FINISHED:
+                return
+        now = time.monotonic()
+        if events:
+            last_event = last_beat = now
+        elif now - last_event > idle_timeout:
+            return
+        elif now - last_beat > heartbeat:
+            last_beat = now
+            yield ': heartbeat\n\n'
+        time.sleep(poll_interval)
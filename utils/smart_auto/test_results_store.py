@@ -0,0 +1,596 @@
+"""
+历史测试结果存储模块
+
+将 uploads/results 下的测试结果文件索引到 SQLite 中，替代每次请求都全量读取的 test_results_sync.json：
+- 按文件修改时间和大小增量同步，只解析新增或变化的文件，已删除的文件同步移除
+- 列表、统计和导出都通过带索引的 SQL 查询完成，分页使用 LIMIT/OFFSET，统计使用聚合查询
+- 结果原始内容保存在 data 列中，只有当前页的记录才会读取
+- 仪表板的汇总计数和最近活动在写入结果时增量更新，查询时直接读取
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, Iterable
+
+logger = logging.getLogger(__name__)
+
+# 统计接口计入的执行结果类型
+_STAT_RESULT_TYPES = ('execution', 'test_execution')
+
+# 列表、导出接口展示的记录：测试结果和分析结果，仅用于统计的 results_ 文件不展示
+_LISTED = "(is_test_result = 1 OR result_type = 'analysis')"
+
+# 仪表板最近活动保留的条数
+ACTIVITY_LIMIT = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS test_results (
+    id TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL UNIQUE,
+    file_id TEXT,
+    api_name TEXT,
+    suite_name TEXT,
+    result_type TEXT,
+    status TEXT,
+    timestamp TEXT,
+    total INTEGER DEFAULT 0,
+    passed INTEGER DEFAULT 0,
+    failed INTEGER DEFAULT 0,
+    skipped INTEGER DEFAULT 0,
+    duration REAL,
+    -- 是否属于原有列表接口（非 synced 模式）展示的测试结果
+    is_test_result INTEGER DEFAULT 0,
+    -- 统计接口使用的指标
+    stat_included INTEGER DEFAULT 0,
+    stat_total INTEGER DEFAULT 0,
+    stat_passed INTEGER DEFAULT 0,
+    stat_failed INTEGER DEFAULT 0,
+    coverage REAL,
+    mtime REAL,
+    size INTEGER,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_test_results_timestamp ON test_results (timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_test_results_file_id ON test_results (file_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_test_results_type ON test_results (result_type, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_test_results_status ON test_results (status, timestamp DESC);
+CREATE INDEX IF NOT EXISTS idx_test_results_api ON test_results (api_name, timestamp DESC);
+
+-- 仪表板：每个对象对计数的贡献，更新时按差值调整 dashboard_counters
+CREATE TABLE IF NOT EXISTS dashboard_items (
+    kind TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    metrics TEXT,
+    PRIMARY KEY (kind, item_id)
+);
+CREATE TABLE IF NOT EXISTS dashboard_counters (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL DEFAULT 0,
+    PRIMARY KEY (kind, name)
+);
+-- 最近活动，只保留最新的 ACTIVITY_LIMIT 条
+CREATE TABLE IF NOT EXISTS dashboard_activities (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT,
+    title TEXT,
+    timestamp TEXT,
+    details TEXT
+);
+"""
+
+_COLUMNS = (
+    'id', 'file_name', 'file_id', 'api_name', 'suite_name', 'result_type', 'status', 'timestamp',
+    'total', 'passed', 'failed', 'skipped', 'duration', 'is_test_result',
+    'stat_included', 'stat_total', 'stat_passed', 'stat_failed', 'coverage', 'mtime', 'size', 'data'
+)
+
+
+def _status_of(total: int, passed: int, failed: int) -> str:
+    if failed == 0:
+        return 'passed'
+    if passed > 0:
+        return 'partial'
+    return 'failed'
+
+
+def _stat_metrics(result_data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Any]:
+    """提取统计接口使用的测试指标和覆盖率"""
+    metrics = None
+    for key in ('metrics', 'test_metrics', 'summary'):
+        if isinstance(result_data.get(key), dict):
+            metrics = result_data[key]
+            break
+    if metrics is None and ('total' in result_data or 'passed' in result_data or 'failed' in result_data):
+        metrics = result_data
+
+    coverage = None
+    for key in ('metrics', 'test_metrics', 'summary'):
+        if isinstance(result_data.get(key), dict) and 'coverage' in result_data[key]:
+            coverage = result_data[key]['coverage']
+            break
+    else:
+        coverage = result_data.get('coverage')
+    if not isinstance(coverage, (int, float)):
+        coverage = None
+    return metrics, coverage
+
+
+def build_record(filename: str, result_data: Dict[str, Any], mtime: float, size: int) -> Optional[Dict[str, Any]]:
+    """
+    根据结果文件生成索引记录，不是测试结果的文件返回 None
+
+    Args:
+        filename: 文件名
+        result_data: 文件内容
+        mtime: 文件修改时间
+        size: 文件大小
+    """
+    if not isinstance(result_data, dict):
+        return None
+    has_counts = 'total' in result_data and 'passed' in result_data and 'failed' in result_data
+    is_test_result = (
+        filename.startswith('coverage_') or
+        filename.startswith('test_results_') or
+        'execution_results' in result_data or
+        has_counts
+    )
+    # 统计接口：results_ / coverage_ 开头的执行结果，指标可能在 metrics / test_metrics / summary 中
+    stat_included = (filename.startswith('coverage_') or filename.startswith('results_')) and \
+        result_data.get('result_type', 'execution') in _STAT_RESULT_TYPES
+    if not (is_test_result or stat_included or filename.startswith('suggestions_') or
+            'analysis_results' in result_data):
+        return None
+
+    # 结果类型
+    result_type = 'unknown'
+    if filename.startswith('coverage_'):
+        result_type = 'execution'
+    elif filename.startswith('test_results_'):
+        result_type = 'test'
+    elif filename.startswith('suggestions_'):
+        result_type = 'analysis'
+    elif 'execution_results' in result_data:
+        result_type = 'execution'
+    elif 'analysis_results' in result_data:
+        result_type = 'analysis'
+
+    # 关联的 file_id
+    stem = filename[:-5]
+    file_id = result_data.get('file_id', '')
+    if not file_id:
+        for prefix in ('coverage_', 'test_results_', 'suggestions_'):
+            if stem.startswith(prefix):
+                file_id = stem[len(prefix):]
+                break
+
+    # 用例数量和状态
+    total = passed = failed = skipped = 0
+    exec_results = result_data.get('execution_results')
+    if isinstance(exec_results, dict):
+        total = exec_results.get('total', 0) or 0
+        passed = exec_results.get('passed', 0) or 0
+        failed = exec_results.get('failed', 0) or 0
+        skipped = exec_results.get('skipped', 0) or 0
+    elif 'total' in result_data:
+        total = result_data.get('total', 0) or 0
+        passed = result_data.get('passed', 0) or 0
+        failed = result_data.get('failed', 0) or 0
+        skipped = result_data.get('skipped', 0) or 0
+
+    if 'status' in result_data and isinstance(result_data['status'], str):
+        status = result_data['status']
+    elif isinstance(exec_results, dict) or has_counts:
+        status = _status_of(total, passed, failed)
+    elif result_type == 'analysis':
+        status = 'analysis'
+    else:
+        status = 'unknown'
+
+    timestamp = result_data.get('created_at') or result_data.get('timestamp') or \
+        datetime.fromtimestamp(mtime).isoformat()
+
+    metrics, coverage = _stat_metrics(result_data) if stat_included else (None, None)
+    metrics = metrics or {}
+
+    duration = result_data.get('duration')
+    if not isinstance(duration, (int, float)):
+        duration = exec_results.get('duration') if isinstance(exec_results, dict) else None
+    return {
+        'id': stem,
+        'file_name': filename,
+        'file_id': file_id,
+        'api_name': result_data.get('api_name', ''),
+        'suite_name': result_data.get('suite_name'),
+        'result_type': result_type,
+        'status': status,
+        'timestamp': str(timestamp),
+        'total': total,
+        'passed': passed,
+        'failed': failed,
+        'skipped': skipped,
+        'duration': duration if isinstance(duration, (int, float)) else None,
+        'is_test_result': int(is_test_result),
+        'stat_included': int(stat_included),
+        'stat_total': metrics.get('total', metrics.get('total_tests', 0)) or 0,
+        'stat_passed': metrics.get('passed', metrics.get('passed_tests', 0)) or 0,
+        'stat_failed': metrics.get('failed', metrics.get('failed_tests', 0)) or 0,
+        'coverage': coverage,
+        'mtime': mtime,
+        'size': size,
+        'data': json.dumps(result_data, ensure_ascii=False),
+    }
+
+
+def _result_metrics(record: Dict[str, Any]) -> Dict[str, Any]:
+    """测试结果对仪表板计数的贡献，只统计执行结果"""
+    if not record['stat_included']:
+        return {}
+    return {
+        'count': 1,
+        'tests': record['stat_total'],
+        'passed': record['stat_passed'],
+        'failed': record['stat_failed'],
+    }
+
+
+def dashboard_item(result_data: Any) -> Optional[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+    """
+    save_result 保存的 API 文档、测试用例、覆盖度报告、智能建议对仪表板的贡献
+
+    Returns:
+        (类型, 计数, 活动)，其他数据返回 None
+    """
+    if not isinstance(result_data, dict):
+        return None
+    timestamp = str(result_data.get('updated_at') or result_data.get('created_at') or datetime.now().isoformat())
+    if 'api_data' in result_data and ('filename' in result_data or 'url' in result_data):
+        apis = len((result_data.get('api_data') or {}).get('apis', []))
+        return 'api_doc', {'count': 1, 'apis': apis}, {
+            'type': 'api_doc_parsed',
+            'title': f"解析API文档: {result_data.get('filename') or result_data.get('url')}",
+            'timestamp': timestamp,
+            'details': {'api_count': apis}
+        }
+    if isinstance(result_data.get('test_cases'), dict):
+        cases = sum(len(c) for c in result_data['test_cases'].values())
+        return 'test_cases', {'count': 1, 'cases': cases}, {
+            'type': 'test_cases_generated',
+            'title': '生成测试用例',
+            'timestamp': timestamp,
+            'details': {'test_cases_count': cases}
+        }
+    if isinstance(result_data.get('coverage_report'), dict):
+        coverage = result_data['coverage_report'].get('overall_coverage', 0) or 0
+        return 'coverage', {'count': 1, 'coverage': coverage}, {
+            'type': 'coverage_evaluated',
+            'title': '评估测试覆盖度',
+            'timestamp': timestamp,
+            'details': {'coverage': coverage}
+        }
+    if isinstance(result_data.get('suggestions'), list) or 'analysis_results' in result_data:
+        items = result_data.get('suggestions')
+        if not isinstance(items, list):
+            analysis = result_data.get('analysis_results')
+            items = analysis.get('suggestions') if isinstance(analysis, dict) else None
+        items = items if isinstance(items, list) else []
+        high = sum(1 for i in items if isinstance(i, dict) and i.get('priority') == 'high')
+        return 'suggestions', {'count': 1, 'high_priority': high}, {
+            'type': 'suggestions_generated',
+            'title': '生成智能建议',
+            'timestamp': timestamp,
+            'details': {'suggestions_count': len(items)}
+        }
+    return None
+
+
+class TestResultsStore:
+    """基于 SQLite 的历史测试结果索引"""
+
+    def __init__(self, db_path: str, results_dir: str, min_sync_interval: float = 2.0):
+        """
+        Args:
+            db_path: 数据库文件路径
+            results_dir: 测试结果目录
+            min_sync_interval: 查询时自动增量同步的最小间隔（秒）
+        """
+        self.db_path = db_path
+        self.results_dir = results_dir
+        self.min_sync_interval = min_sync_interval
+        self.last_sync: Optional[str] = None
+        self._last_sync_time = 0.0
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._write_lock:
+            conn = self._conn()
+            conn.executescript(_SCHEMA)
+            self._seed_result_counters(conn)
+
+    def _conn(self) -> sqlite3.Connection:
+        """每个线程使用独立的连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _upsert(self, conn: sqlite3.Connection, records: List[Dict[str, Any]]) -> None:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO test_results ({', '.join(_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+            [tuple(r[c] for c in _COLUMNS) for r in records]
+        )
+        for record in records:
+            self._apply_item(conn, 'test_result', record['file_name'], _result_metrics(record))
+
+    def _delete(self, conn: sqlite3.Connection, file_names: List[str]) -> None:
+        conn.executemany('DELETE FROM test_results WHERE file_name = ?', [(i,) for i in file_names])
+        for file_name in file_names:
+            self._apply_item(conn, 'test_result', file_name, None)
+
+    @staticmethod
+    def _apply_item(conn: sqlite3.Connection, kind: str, item_id: str, metrics: Optional[Dict[str, Any]]) -> None:
+        """更新对象的计数贡献，只把与上次的差值累加到 dashboard_counters，metrics 为 None 表示对象已删除"""
+        row = conn.execute(
+            'SELECT metrics FROM dashboard_items WHERE kind = ? AND item_id = ?', (kind, item_id)
+        ).fetchone()
+        old = json.loads(row[0]) if row and row[0] else {}
+        new = metrics or {}
+        deltas = [(kind, name, (new.get(name) or 0) - (old.get(name) or 0)) for name in set(old) | set(new)]
+        conn.executemany(
+            'INSERT INTO dashboard_counters (kind, name, value) VALUES (?, ?, ?) '
+            'ON CONFLICT (kind, name) DO UPDATE SET value = value + excluded.value',
+            [i for i in deltas if i[2]]
+        )
+        if metrics is None:
+            conn.execute('DELETE FROM dashboard_items WHERE kind = ? AND item_id = ?', (kind, item_id))
+        else:
+            conn.execute(
+                'INSERT OR REPLACE INTO dashboard_items (kind, item_id, metrics) VALUES (?, ?, ?)',
+                (kind, item_id, json.dumps(metrics))
+            )
+
+    @staticmethod
+    def _add_activity(conn: sqlite3.Connection, activity: Dict[str, Any]) -> None:
+        cursor = conn.execute(
+            'INSERT INTO dashboard_activities (type, title, timestamp, details) VALUES (?, ?, ?, ?)',
+            (activity['type'], activity['title'], activity['timestamp'],
+             json.dumps(activity.get('details') or {}, ensure_ascii=False, default=str))
+        )
+        conn.execute('DELETE FROM dashboard_activities WHERE seq <= ?', (cursor.lastrowid - ACTIVITY_LIMIT,))
+
+    def _seed_result_counters(self, conn: sqlite3.Connection) -> None:
+        """数据库中已有测试结果、但还没有仪表板计数时（升级前建立的数据库），按已有结果初始化一次"""
+        if conn.execute("SELECT 1 FROM dashboard_counters WHERE kind = 'seeded' AND name = 'test_result'").fetchone():
+            return
+        with conn:
+            for row in conn.execute('SELECT * FROM test_results WHERE stat_included = 1').fetchall():
+                self._apply_item(conn, 'test_result', row['file_name'], _result_metrics(dict(row)))
+            conn.execute("INSERT INTO dashboard_counters (kind, name, value) VALUES ('seeded', 'test_result', 1)")
+
+    @staticmethod
+    def _load(file_path: str, filename: str, mtime: float, size: int) -> Optional[Dict[str, Any]]:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                result_data = json.load(f)
+        except Exception as e:
+            logger.error(f"处理测试结果文件失败 {filename}: {str(e)}")
+            return None
+        return build_record(filename, result_data, mtime, size)
+
+    def record_file(self, file_path: str) -> None:
+        """结果文件写入后立即更新索引"""
+        filename = os.path.basename(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        record = self._load(file_path, filename, stat.st_mtime, stat.st_size)
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                if record is None:
+                    self._delete(conn, [filename])
+                    return
+                self._upsert(conn, [record])
+                if record['is_test_result']:
+                    self._add_activity(conn, {
+                        'type': 'test_executed',
+                        'title': f"执行测试: {record['api_name'] or record['file_id'] or record['id']}",
+                        'timestamp': record['timestamp'],
+                        'details': {
+                            'file_id': record['file_id'],
+                            'status': record['status'],
+                            'total': record['total'],
+                            'passed': record['passed'],
+                            'failed': record['failed'],
+                        }
+                    })
+
+    def sync(self) -> Dict[str, Any]:
+        """
+        增量同步结果目录，只解析新增或修改过的文件
+
+        Returns:
+            同步信息：total_results、last_sync、changed、removed
+        """
+        with self._write_lock:
+            conn = self._conn()
+            known = {
+                row['file_name']: (row['mtime'], row['size'])
+                for row in conn.execute('SELECT file_name, mtime, size FROM test_results')
+            }
+            seen = set()
+            changed = []
+            if os.path.isdir(self.results_dir):
+                with os.scandir(self.results_dir) as entries:
+                    for entry in entries:
+                        if not entry.name.endswith('.json') or entry.name == 'test_results_sync.json':
+                            continue
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        seen.add(entry.name)
+                        if known.get(entry.name) == (stat.st_mtime, stat.st_size):
+                            continue
+                        record = self._load(entry.path, entry.name, stat.st_mtime, stat.st_size)
+                        if record is not None:
+                            changed.append(record)
+            removed = [name for name in known if name not in seen]
+            with conn:
+                if changed:
+                    self._upsert(conn, changed)
+                if removed:
+                    self._delete(conn, removed)
+            self._last_sync_time = time.monotonic()
+            self.last_sync = datetime.now().isoformat()
+            total = conn.execute(f'SELECT COUNT(*) FROM test_results WHERE {_LISTED}').fetchone()[0]
+        if changed or removed:
+            logger.info(f"测试结果同步完成，新增/更新 {len(changed)} 条，移除 {len(removed)} 条，共 {total} 条结果")
+        return {'total_results': total, 'last_sync': self.last_sync, 'changed': len(changed), 'removed': len(removed)}
+
+    def sync_if_stale(self) -> None:
+        """距离上次同步超过 min_sync_interval 时执行增量同步"""
+        if time.monotonic() - self._last_sync_time >= self.min_sync_interval:
+            self.sync()
+
+    @staticmethod
+    def _where(
+            result_type: Optional[str] = None,
+            file_id: Optional[str] = None,
+            status: Optional[str] = None,
+            api_name: Optional[str] = None,
+            since: Optional[str] = None,
+            test_results_only: bool = False) -> Tuple[str, List[Any]]:
+        clauses, params = [_LISTED], []
+        for column, value in (('result_type', result_type), ('file_id', file_id),
+                              ('status', status), ('api_name', api_name)):
+            if value and value != 'all':
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        if since:
+            clauses.append('timestamp >= ?')
+            params.append(since)
+        if test_results_only:
+            clauses.append('is_test_result = 1')
+        return ' WHERE ' + ' AND '.join(clauses), params
+
+    def query(self, limit: int = 20, offset: int = 0, with_data: bool = True, **filters) -> Dict[str, Any]:
+        """
+        分页查询，按时间倒序
+
+        Args:
+            limit: 每页条数
+            offset: 偏移量
+            with_data: 是否返回结果原始内容
+            filters: result_type / file_id / status / api_name / since / test_results_only
+        """
+        self.sync_if_stale()
+        where, params = self._where(**filters)
+        conn = self._conn()
+        total = conn.execute(f'SELECT COUNT(*) FROM test_results{where}', params).fetchone()[0]
+        columns = [c for c in _COLUMNS if with_data or c != 'data']
+        rows = conn.execute(
+            f"SELECT {', '.join(columns)} FROM test_results{where} ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        results = []
+        for row in rows:
+            item = dict(row)
+            if with_data:
+                item['data'] = json.loads(item['data']) if item['data'] else {}
+            results.append(item)
+        return {'results': results, 'total': total}
+
+    def file_names(self, **filters) -> List[str]:
+        """符合条件的结果文件名，用于导出"""
+        self.sync_if_stale()
+        where, params = self._where(**filters)
+        return [
+            row[0] for row in
+            self._conn().execute(f'SELECT file_name FROM test_results{where} ORDER BY timestamp DESC', params)
+        ]
+
+    def statistics(self) -> Dict[str, Any]:
+        """汇总统计：执行结果的用例数和平均覆盖率"""
+        self.sync_if_stale()
+        row = self._conn().execute(
+            'SELECT COALESCE(SUM(stat_total), 0), COALESCE(SUM(stat_passed), 0), '
+            'COALESCE(SUM(stat_failed), 0), AVG(coverage) '
+            'FROM test_results WHERE stat_included = 1'
+        ).fetchone()
+        return {
+            'total_tests': row[0],
+            'passed_tests': row[1],
+            'failed_tests': row[2],
+            'coverage_percent': round(row[3] or 0, 2),
+        }
+
+    def record_dashboard(self, item_id: str, result_data: Any) -> bool:
+        """
+        save_result 保存 API 文档、测试用例、覆盖度报告、智能建议时更新仪表板计数并记录活动
+
+        Returns:
+            是否是仪表板统计的数据
+        """
+        item = dashboard_item(result_data)
+        if item is None:
+            return False
+        kind, metrics, activity = item
+        activity['details'] = {'task_id': item_id, **activity['details']}
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                self._apply_item(conn, kind, item_id, metrics)
+                self._add_activity(conn, activity)
+        return True
+
+    def remove_dashboard_item(self, kind: str, item_id: str) -> None:
+        """删除 API 文档等对象后，从仪表板计数中减去"""
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                self._apply_item(conn, kind, item_id, None)
+
+    def dashboard_seeded(self, kind: str) -> bool:
+        return self._conn().execute(
+            "SELECT 1 FROM dashboard_counters WHERE kind = 'seeded' AND name = ?", (kind,)
+        ).fetchone() is not None
+
+    def seed_dashboard(self, kind: str, items: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """用已有数据初始化一种对象的计数，只在第一次使用时执行，已记录的对象不会重复计数"""
+        with self._write_lock:
+            conn = self._conn()
+            if self.dashboard_seeded(kind):
+                return
+            with conn:
+                for item_id, metrics in items:
+                    if not conn.execute(
+                            'SELECT 1 FROM dashboard_items WHERE kind = ? AND item_id = ?', (kind, item_id)
+                    ).fetchone():
+                        self._apply_item(conn, kind, item_id, metrics)
+                conn.execute("INSERT INTO dashboard_counters (kind, name, value) VALUES ('seeded', ?, 1)", (kind,))
+
+    def dashboard_counters(self) -> Dict[str, Dict[str, float]]:
+        """仪表板汇总计数 {类型: {名称: 值}}"""
+        counters: Dict[str, Dict[str, float]] = {}
+        for row in self._conn().execute('SELECT kind, name, value FROM dashboard_counters'):
+            counters.setdefault(row['kind'], {})[row['name']] = row['value']
+        return counters
+
+    def recent_activities(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """最近活动，最新的在前"""
+        rows = self._conn().execute(
+            'SELECT type, title, timestamp, details FROM dashboard_activities ORDER BY seq DESC LIMIT ?', (limit,)
+        ).fetchall()
+        return [{**dict(row), 'details': json.loads(row['details']) if row['details'] else {}} for row in rows]